@@ -74,10 +74,14 @@ WSGI_APPLICATION = "LibraryProject.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -0,0 +1,259 @@
+"""
+Connection pooling for Django database backends.
+
+Use a pooled engine in DATABASES, e.g.
+
+    "default": {
+        "ENGINE": "advanced_api_project.db_pool.sqlite3",   # or .postgresql
+        "NAME": ...,
+        "CONN_MAX_AGE": 0,
+        "POOL": {"MAX_SIZE": 8, "TIMEOUT": 5, "MAX_AGE": 600, "CHECK_AFTER": 30},
+    }
+
+With a pooled engine, Django's own "close" at the end of each request hands
+the raw connection back to a per-process pool instead of closing it, so keep
+CONN_MAX_AGE at 0. A pool holds at most MAX_SIZE connections, the sizing
+knob per worker process. When all are in use, callers wait up to TIMEOUT
+seconds and then get PoolTimeout. Connections older than MAX_AGE seconds are
+replaced. A connection idle for more than CHECK_AFTER seconds is pinged
+before reuse, and dropped if the ping fails.
+
+Every pool records lifecycle metrics (see PoolMetrics): how long callers
+waited for a connection, how often the pool was saturated, and how many
+connections were opened and closed, and why. pool_stats() returns them for
+this process. They are also logged every LOG_INTERVAL seconds when that is
+set.
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from django.db import OperationalError
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_SIZE': 8,
+    'TIMEOUT': 5.0,
+    'MAX_AGE': 600.0,
+    'CHECK_AFTER': 30.0,
+    'LOG_INTERVAL': None,
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.acquired = 0
+        self.waited = 0           # acquisitions that found the pool saturated
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connect_total = 0.0  # time spent opening new connections
+        self.timeouts = 0
+        self.opened = 0
+        self.closed = Counter()   # reason -> count
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def snapshot(self, size, idle, max_size):
+        return {
+            'size': size,
+            'idle': idle,
+            'in_use': self.in_use,
+            'max_size': max_size,
+            'peak_in_use': self.peak_in_use,
+            'acquired': self.acquired,
+            'saturated_waits': self.waited,
+            'timeouts': self.timeouts,
+            'wait_avg_ms': round(self.wait_total / self.acquired * 1000, 3) if self.acquired else 0.0,
+            'wait_max_ms': round(self.wait_max * 1000, 3),
+            'connect_avg_ms': round(self.connect_total / self.opened * 1000, 3) if self.opened else 0.0,
+            'opened': self.opened,
+            'closed': dict(self.closed),
+            # connections opened per acquisition; near 0 means the pool is doing its job
+            'churn': round(self.opened / self.acquired, 4) if self.acquired else 0.0,
+        }
+
+
+class ConnectionPool:
+    def __init__(self, name, config):
+        self.name = name
+        self.max_size = config['MAX_SIZE']
+        self.timeout = config['TIMEOUT']
+        self.max_age = config['MAX_AGE']
+        self.check_after = config['CHECK_AFTER']
+        self.log_interval = config['LOG_INTERVAL']
+        self.metrics = PoolMetrics()
+        self._idle = deque()  # (connection, created, last_used); reused LIFO
+        self._created = {}    # id(connection) -> created, for checked-out connections
+        self._size = 0
+        self._cond = threading.Condition()
+        self._next_log = time.monotonic() + (self.log_interval or 0)
+
+    def acquire(self, connect):
+        """Return a raw connection, reusing an idle one or calling `connect()`."""
+        start = time.monotonic()
+        saturated = False
+        while True:
+            with self._cond:
+                candidate = None
+                while candidate is None:
+                    if self._idle:
+                        candidate = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        break
+                    else:
+                        if not saturated:
+                            saturated = True
+                            self.metrics.waited += 1
+                        remaining = self.timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self.metrics.timeouts += 1
+                            raise PoolTimeout(
+                                f'No connection available in pool {self.name!r} '
+                                f'after {self.timeout}s ({self.max_size} in use)'
+                            )
+                        self._cond.wait(remaining)
+
+            if candidate is None:
+                return self._open(connect, start)
+            connection, created, last_used = candidate
+            now = time.monotonic()
+            if now - created > self.max_age:
+                self._discard(connection, 'max_age')
+            elif now - last_used > self.check_after and not self._is_usable(connection):
+                self._discard(connection, 'unusable')
+            else:
+                self._checked_out(connection, created, start)
+                return connection
+
+    def release(self, connection, reusable=True):
+        with self._cond:
+            created = self._created.pop(id(connection), None)
+            if created is None:
+                return
+            self.metrics.in_use -= 1
+        if not reusable:
+            self._discard(connection, 'error')
+        elif time.monotonic() - created > self.max_age:
+            self._discard(connection, 'max_age')
+        else:
+            with self._cond:
+                self._idle.append((connection, created, time.monotonic()))
+                self._cond.notify()
+        self._maybe_log()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _, _ in idle:
+            self._discard(connection, 'shutdown')
+
+    def stats(self):
+        with self._cond:
+            return self.metrics.snapshot(self._size, len(self._idle), self.max_size)
+
+    def _open(self, connect, start):
+        connect_start = time.monotonic()
+        try:
+            connection = connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        now = time.monotonic()
+        with self._cond:
+            self.metrics.opened += 1
+            self.metrics.connect_total += now - connect_start
+        self._checked_out(connection, now, start, wait_end=connect_start)
+        return connection
+
+    def _checked_out(self, connection, created, start, wait_end=None):
+        wait = (wait_end or time.monotonic()) - start
+        with self._cond:
+            self._created[id(connection)] = created
+            metrics = self.metrics
+            metrics.acquired += 1
+            metrics.wait_total += wait
+            metrics.wait_max = max(metrics.wait_max, wait)
+            metrics.in_use += 1
+            metrics.peak_in_use = max(metrics.peak_in_use, metrics.in_use)
+
+    def _discard(self, connection, reason):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.metrics.closed[reason] += 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_usable(connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _maybe_log(self):
+        if not self.log_interval or time.monotonic() < self._next_log:
+            return
+        self._next_log = time.monotonic() + self.log_interval
+        logger.info('Connection pool %s: %s', self.name, self.stats())
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    key = (alias, str(settings_dict['NAME']), settings_dict.get('HOST'), settings_dict.get('PORT'))
+    with _pools_lock:
+        if key not in _pools:
+            config = {**DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(alias, config)
+        return _pools[key]
+
+
+def pool_stats():
+    """Metrics of every pool in this process, by alias and database name."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {f'{alias}:{name}': pool.stats() for (alias, name, _, _), pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """Mixed into a backend's DatabaseWrapper to borrow connections from a pool."""
+
+    def pool_enabled(self):
+        return True
+
+    def get_new_connection(self, conn_params):
+        if not self.pool_enabled():
+            return super().get_new_connection(conn_params)
+        self._pool = get_pool(self.alias, self.settings_dict)
+        return self._pool.acquire(lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params))
+
+    def _close(self):
+        pool = getattr(self, '_pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        self._pool = None
+        # A connection closed mid-transaction or after errors is not trusted.
+        reusable = not self.in_atomic_block and (not self.errors_occurred or self.is_usable())
+        if reusable:
+            try:
+                self.connection.rollback()
+            except Exception:
+                reusable = False
+        pool.release(self.connection, reusable)
@@ -0,0 +1,10 @@
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from advanced_api_project.db_pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+    def pool_enabled(self):
+        # Closing an in-memory database destroys it, so Django never closes
+        # those connections and there is nothing to pool.
+        return not self.is_in_memory_db()
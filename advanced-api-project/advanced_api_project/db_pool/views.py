@@ -0,0 +1,18 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from advanced_api_project.db_pool import pool_stats
+
+
+class PoolStatsView(APIView):
+    """
+    Connection pool metrics of the worker process that serves the request.
+
+    Endpoint: GET /db-pool/
+    Permissions: Staff users only
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(pool_stats())
@@ -44,13 +44,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.tracing.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "advanced_api_project.db_routers.ReplicaRoutingMiddleware",
+    "api.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.throttling.RateLimitHeadersMiddleware",
 ]
 
 ROOT_URLCONF = "advanced_api_project.urls"
@@ -77,11 +81,47 @@ WSGI_APPLICATION = "advanced_api_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are borrowed from a per-process pool (advanced_api_project.db_pool)
+# and returned at the end of each request, hence CONN_MAX_AGE = 0. MAX_SIZE is
+# per worker process; watch saturated_waits and wait_*_ms on /db-pool/ to size it.
+DB_POOL = {
+    "MAX_SIZE": 8,
+    "TIMEOUT": 5,
+    "MAX_AGE": 600,
+    "CHECK_AFTER": 30,
+    "LOG_INTERVAL": 300,
+}
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "advanced_api_project.db_pool.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 0,
+        "POOL": DB_POOL,
+    },
+    # Read replica (see advanced_api_project.db_routers). In development it is the primary's
+    # own file; point it at a real replica and list it in
+    # DATABASE_ROUTING["REPLICAS"] to send reads there.
+    "replica": {
+        "ENGINE": "advanced_api_project.db_pool.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "CONN_MAX_AGE": 0,
+        "POOL": DB_POOL,
+        "TEST": {"NAME": BASE_DIR / "test_replica.sqlite3"},
+    },
+}
+
+DATABASE_ROUTERS = ["advanced_api_project.db_routers.PrimaryReplicaRouter"]
+
+# Aliases that serve reads for safe requests; empty keeps everything on the
+# primary. Clients that just wrote keep reading from the primary for
+# PIN_SECONDS. Replicas are health checked every HEALTH_CHECK_INTERVAL seconds
+# and skipped for RETRY_AFTER seconds after a failure.
+DATABASE_ROUTING = {
+    "REPLICAS": [],
+    "PIN_SECONDS": 5,
+    "HEALTH_CHECK_INTERVAL": 5,
+    "RETRY_AFTER": 30,
 }
 
 
@@ -121,6 +161,9 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -140,4 +183,80 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ClientRateThrottle',
+        'api.throttling.BurstRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'client': '2000/hour',  # sliding window, per token / user / IP
+        'burst': '120/min',     # token bucket
+    },
+    # orjson-backed JSON first; MessagePack is only offered when msgpack is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'api.renderers.ContentNegotiation',
+}
+
+# Tests run with the rate limits off (api.runner); throttling tests set
+# their own rates.
+TEST_RUNNER = "api.runner.TestRunner"
+
+# Bulk book imports (api.importing): rows per batch, worker processes, how many
+# rejected rows to keep on the job, and whether uploads import in a background
+# thread of the web process.
+BOOK_IMPORT = {
+    'BATCH_SIZE': 1000,
+    'WORKERS': 4,
+    'MAX_ERRORS': 100,
+    'UPLOAD_DIR': 'imports',
+    'BACKGROUND': True,
+}
+
+# Book/Author change log (api.outbox): events per page on /api/changes/, how
+# long new events are held back so out-of-order commits are not skipped, and
+# how long compact_outbox keeps them.
+CHANGE_EVENTS = {
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    'SETTLE_SECONDS': 2,
+    'RETENTION_DAYS': 7,
+    'COMPACT_BATCH_SIZE': 10000,
+}
+
+# Request tracing (api.tracing): spans for middleware, views, filter backends,
+# serializers, templates and SQL. EXPORTER is 'console', 'file' (JSON lines in
+# FILE, summarized by `manage.py trace_report`) or a dotted class path.
+TRACING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.01,
+    'EXPORTER': 'file',
+    'FILE': BASE_DIR / 'traces.jsonl',
+    'MAX_SPANS': 2000,
+}
+
+# Idempotency-Key handling for create endpoints (api.idempotency). STORE is
+# 'local', 'cache' (CACHE_ALIAS, shared between nodes) or a dotted class path.
+IDEMPOTENCY = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 10,
+}
+
+# Gzip/brotli for API responses of at least MIN_SIZE bytes (api.compression).
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+}
+
+# Where throttle counters live: 'local' (per process) or 'cache' (the Django
+# cache named by CACHE_ALIAS, shared between nodes).
+RATE_LIMIT = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
 }
@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from advanced_api_project.db_pool.views import PoolStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
+    path("db-pool/", PoolStatsView.as_view(), name="db-pool-stats"),
 ]
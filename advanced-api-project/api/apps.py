@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        # imports signals so Book/Author writes append change events
+        import api.signals  # noqa
+
+        from . import tracing
+        if tracing.get_config()['ENABLED']:
+            tracing.install()
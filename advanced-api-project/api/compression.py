@@ -0,0 +1,151 @@
+"""
+Response compression for API payloads.
+
+CompressionMiddleware compresses JSON and MessagePack responses whose body is
+at least MIN_SIZE bytes. It uses brotli when the client accepts it and the
+brotli package is installed, and gzip otherwise. Streaming responses are
+compressed chunk by chunk as they are sent, so a large list never has to be
+held in memory twice.
+
+Settings (all optional), e.g.:
+
+    RESPONSE_COMPRESSION = {
+        'MIN_SIZE': 1024,            # bytes; smaller bodies are sent as is
+        'GZIP_LEVEL': 6,
+        'BROTLI_QUALITY': 4,         # 0-11; 4-5 is a good speed/size trade-off
+        'CONTENT_TYPES': ['application/json', 'application/msgpack'],
+    }
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+    'CONTENT_TYPES': ['application/json', 'application/msgpack'],
+}
+
+_accept_encoding_re = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def accepted_encodings(header):
+    """Codings from an Accept-Encoding header with a non-zero q-value."""
+    codings = set()
+    for part in header.split(','):
+        match = _accept_encoding_re.match(part)
+        if match:
+            coding, q = match.groups()
+            try:
+                if q is None or float(q) > 0:
+                    codings.add(coding.lower())
+            except ValueError:
+                pass
+    return codings
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self, config):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(config['GZIP_LEVEL'], zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self, config):
+        self._compressor = brotli.Compressor(quality=config['BROTLI_QUALITY'])
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def get_compressor(request, config):
+    codings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if brotli is not None and 'br' in codings:
+        return BrotliCompressor(config)
+    if 'gzip' in codings:
+        return GzipCompressor(config)
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        config = get_config()
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in config['CONTENT_TYPES'] or response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < config['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = get_compressor(request, config)
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                response.streaming_content = self._compress_async_stream(compressor, response.streaming_content)
+            else:
+                response.streaming_content = self._compress_stream(compressor, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            response.content = compressor.compress(response.content) + compressor.finish()
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # The compressed body is a different representation of the resource.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+        return response
+
+    @staticmethod
+    def _compress_stream(compressor, chunks):
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def _compress_async_stream(compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
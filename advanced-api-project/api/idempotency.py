@@ -0,0 +1,162 @@
+"""
+Idempotency-Key support for write endpoints.
+
+Wrap a view method with @idempotent. When a client sends an
+`Idempotency-Key: <unique string>` header, the first request with that key
+runs normally and its response is stored for IDEMPOTENCY['TTL'] seconds.
+Retries with the same key and the same request body get the stored response
+back, marked `Idempotent-Replayed: true`, without running the view again.
+Reusing a key for a different request body is rejected with 422. Requests
+without the header are not affected.
+
+Keys are scoped per user (or per IP address for anonymous clients) and per
+view. Concurrent duplicates are serialized with a lock in the store: the
+second request waits up to LOCK_WAIT seconds for the first one to finish,
+then replays its response, or gets 409 if it is still running. 5xx
+responses, 409 and 429 are not stored, so the client may retry them.
+
+Stores are pluggable: 'local' (per process), 'cache' (a Django cache shared
+between nodes; its `add` must be atomic, as on Redis and Memcached) or the
+dotted path of a class with the same get/set/add/delete methods as
+api.stores.LocalMemoryStore.
+"""
+import functools
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .stores import CacheStore, LocalMemoryStore
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+REPLAYED_RESPONSE_HEADERS = ('Location',)
+NOT_STORED_STATUSES = (status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS)
+
+DEFAULTS = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 10,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'IDEMPOTENCY', {})}
+
+
+_stores = {}
+
+
+def get_store():
+    config = get_config()
+    kind = config['STORE']
+    if kind not in _stores:
+        if kind == 'local':
+            _stores[kind] = LocalMemoryStore()
+        elif kind == 'cache':
+            _stores[kind] = CacheStore(config['CACHE_ALIAS'])
+        else:
+            _stores[kind] = import_string(kind)()
+    return _stores[kind]
+
+
+def fingerprint(request):
+    """Hash of what makes two requests "the same": method, path and parsed body."""
+    data = request.data
+    if hasattr(data, 'lists'):  # QueryDict from form or multipart input
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, cls=JSONEncoder, default=str)
+    return hashlib.sha256(f'{request.method}\n{request.get_full_path()}\n{body}'.encode()).hexdigest()
+
+
+def _client(request):
+    if request.user and request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR")}'
+
+
+def _replay(record):
+    response = Response(record['data'], status=record['status'], headers=record['headers'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _error(message, status_code):
+    return Response({'detail': message}, status=status_code)
+
+
+def idempotent(view_method):
+    """Make a DRF view method honour the Idempotency-Key header."""
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return _error(f'{HEADER} must be 1-{MAX_KEY_LENGTH} characters.', status.HTTP_400_BAD_REQUEST)
+
+        config = get_config()
+        store = get_store()
+        scope = f'{type(self).__module__}.{type(self).__qualname__}.{view_method.__name__}'
+        record_key = 'idem:' + hashlib.sha256(f'{scope}\n{_client(request)}\n{key}'.encode()).hexdigest()
+        lock_key = record_key + ':lock'
+        request_fingerprint = fingerprint(request)
+
+        def stored_response():
+            record = store.get(record_key)
+            if record is None:
+                return None
+            if record['fingerprint'] != request_fingerprint:
+                return _error(
+                    f'{HEADER} was already used for a different request.',
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            return _replay(record)
+
+        response = stored_response()
+        if response is not None:
+            return response
+
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + config['LOCK_WAIT']
+        while not store.add(lock_key, token, config['LOCK_TIMEOUT']):
+            # Another request with this key is running; wait for its result.
+            if time.monotonic() >= deadline:
+                return _error(
+                    f'A request with this {HEADER} is still being processed.', status.HTTP_409_CONFLICT
+                )
+            time.sleep(0.05)
+            response = stored_response()
+            if response is not None:
+                return response
+
+        try:
+            # The request holding the lock before us may have finished just now.
+            response = stored_response()
+            if response is not None:
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code < 500 and response.status_code not in NOT_STORED_STATUSES:
+                store.set(record_key, {
+                    'fingerprint': request_fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                    'headers': {h: response[h] for h in REPLAYED_RESPONSE_HEADERS if response.has_header(h)},
+                }, config['TTL'])
+            return response
+        finally:
+            if store.get(lock_key) == token:
+                store.delete(lock_key)
+
+    return wrapper
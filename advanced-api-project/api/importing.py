@@ -0,0 +1,336 @@
+"""
+Bulk import of books from CSV or NDJSON files.
+
+Each row needs `title`, `publication_year` and `author`, where `author` is
+the author's name. A CSV file starts with a header row naming those columns.
+An NDJSON file has one JSON object per line.
+
+The file is read as a stream and cut into batches of BATCH_SIZE rows, so
+memory stays flat however large the file is. The parent process resolves
+author names to ids through an in-memory map. It creates missing authors in
+bulk, one query per batch; workers never create authors. Imports running at
+the same time take turns at this step (see AuthorMap.resolve), so two
+imports do not both create the same author. Author names are not unique,
+though: an author created through the API at the same moment can still end
+up next to an imported one of the same name. Batches then go to a pool of
+WORKERS processes.
+Each worker validates its rows with BookSerializer's rules and inserts them
+with one bulk_create, along with their change events (api.outbox). No more
+than two batches per worker are queued at a time.
+
+Each worker commits its books together with an ImportBatch row. The parent
+moves ImportJob.offset forward over the batches that are committed without
+gaps. If an import fails, running it again (`import_books --resume <id>`)
+starts from that offset. It skips the batches already committed after it,
+so no book is inserted twice.
+
+Rejected rows do not stop the import. They are counted, and the first
+MAX_ERRORS are kept on the job together with their errors.
+"""
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F, Sum
+from rest_framework import serializers
+
+from . import outbox
+from .models import Author, Book, ImportBatch, ImportJob
+from .serializers import BookSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    'WORKERS': min(4, os.cpu_count() or 1),
+    'MAX_ERRORS': 100,
+    'UPLOAD_DIR': 'imports',
+    'BACKGROUND': True,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BOOK_IMPORT', {})}
+
+
+def save_upload(upload):
+    """Store an uploaded file in chunks and return its path on disk."""
+    extension = os.path.splitext(upload.name)[1].lower()
+    name = default_storage.save(f'{get_config()["UPLOAD_DIR"]}/{uuid.uuid4().hex}{extension}', upload)
+    return default_storage.path(name)
+
+
+class ImportBookSerializer(BookSerializer):
+    """BookSerializer's rules, with the author already resolved to an id."""
+
+    author = serializers.IntegerField(source='author_id')
+
+
+def read_rows(path, format, offset=0):
+    """
+    Yield (row, end_offset) for every row from byte `offset` on.
+
+    `row` is a dict of the row's fields, or an error message if the row could
+    not be parsed. `end_offset` is the byte offset just past the row.
+    """
+    with open(path, 'rb') as f:
+        if format == 'ndjson':
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield f'Invalid JSON: {exc}', offset
+                    continue
+                yield (row if isinstance(row, dict) else 'Expected a JSON object.'), offset
+            return
+
+        header_line = f.readline()
+        header = [name.strip() for name in next(csv.reader([header_line.decode('utf-8-sig')]), [])]
+        offset = max(offset, len(header_line))
+        f.seek(offset)
+
+        def lines():
+            # csv.reader pulls exactly the lines of one record at a time, so
+            # `offset` is just past the record it has returned.
+            nonlocal offset
+            for line in f:
+                offset += len(line)
+                yield line.decode('utf-8')
+
+        for values in csv.reader(lines()):
+            if not values:
+                continue
+            if len(values) != len(header):
+                yield f'Expected {len(header)} columns, got {len(values)}.', offset
+            else:
+                yield dict(zip(header, values)), offset
+
+
+def read_batches(path, format, offset, batch_size):
+    """Yield (start_offset, end_offset, rows) with `batch_size` rows per batch."""
+    rows, start, end = [], offset, offset
+    for row, end in read_rows(path, format, offset):
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield start, end, rows
+            rows, start = [], end
+    if rows:
+        yield start, end, rows
+
+
+def lock_author_creation():
+    """
+    Hold a write lock on the oldest ImportJob row until the transaction ends,
+    so importers look up and create authors one at a time. An UPDATE, unlike
+    select_for_update(), also takes SQLite's database write lock.
+    """
+    while True:
+        pk = ImportJob.objects.order_by('pk').values_list('pk', flat=True).first()
+        if pk is None or ImportJob.objects.filter(pk=pk).update(batch_size=F('batch_size')):
+            return
+
+
+class AuthorMap:
+    """Author name -> id, filled as names are seen. Missing authors are created in bulk."""
+
+    max_length = Author._meta.get_field('name').max_length
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {name for name in names if name not in self.ids}
+        if not missing:
+            return
+        with transaction.atomic():
+            lock_author_creation()
+            # Where several authors share a name, the oldest one wins.
+            for pk, name in Author.objects.filter(name__in=missing).order_by('-pk').values_list('pk', 'name'):
+                self.ids[name] = pk
+            new = [Author(name=name) for name in missing if name not in self.ids]
+            Author.objects.bulk_create(new)
+            outbox.record_created(new)
+        for author in new:
+            self.ids[author.name] = author.pk
+
+    def prepare(self, rows):
+        """
+        Turn parsed rows into (data, errors) pairs for import_batch.
+
+        Author names are replaced by ids. Rows that cannot be imported at all
+        get errors instead of data.
+        """
+        names = []
+        for row in rows:
+            if isinstance(row, dict):
+                name = str(row.get('author') or '').strip()
+                row['author'] = name
+                if name and len(name) <= self.max_length:
+                    names.append(name)
+        self.resolve(names)
+
+        items = []
+        for row in rows:
+            if not isinstance(row, dict):
+                items.append((None, {'non_field_errors': [row]}))
+            elif not row['author']:
+                items.append((None, {'author': ['This field is required.']}))
+            elif row['author'] not in self.ids:
+                items.append((None, {'author': [f'Ensure this field has no more than {self.max_length} characters.']}))
+            else:
+                data = {'title': row.get('title'), 'publication_year': row.get('publication_year')}
+                items.append(({**data, 'author': self.ids[row['author']]}, None))
+        return items
+
+
+def import_batch(job_id, start, end, first_row, items, max_errors):
+    """
+    Validate and insert one batch; runs in a worker process.
+
+    The books and the batch's ImportBatch row are committed together.
+    Returns (start, end, rows, imported, failed, errors).
+    """
+    child = ImportBookSerializer()
+    books, errors, failed = [], [], 0
+    for index, (data, row_errors) in enumerate(items):
+        if row_errors is None:
+            try:
+                books.append(Book(**child.run_validation(data)))
+                continue
+            except serializers.ValidationError as exc:
+                row_errors = json.loads(json.dumps(exc.detail))
+        failed += 1
+        if len(errors) < max_errors:
+            errors.append({'row': first_row + index, 'errors': row_errors})
+
+    with transaction.atomic():
+        Book.objects.bulk_create(books)
+        outbox.record_created(books)
+        ImportBatch.objects.create(
+            job_id=job_id, start_offset=start, end_offset=end,
+            rows=len(items), imported=len(books), failed=failed,
+        )
+    return start, end, len(items), len(books), failed, errors
+
+
+class Importer:
+    """Runs (or resumes) one ImportJob. `progress(job)` is called after every batch."""
+
+    def __init__(self, job, workers=None, progress=None):
+        config = get_config()
+        self.job = job
+        self.workers = config['WORKERS'] if workers is None else workers
+        self.max_errors = config['MAX_ERRORS']
+        self.progress = progress
+        self.finished = {}  # start_offset -> (end_offset, rows) of batches done past job.offset
+
+    def run(self):
+        job = self.job
+        totals = ImportBatch.objects.filter(job=job).aggregate(imported=Sum('imported'), failed=Sum('failed'))
+        committed = set(
+            ImportBatch.objects.filter(job=job, start_offset__gte=job.offset).values_list('start_offset', flat=True)
+        )
+        job.rows_imported = totals['imported'] or 0
+        job.rows_failed = totals['failed'] or 0
+        job.status = ImportJob.RUNNING
+        job.error = ''
+        job.bytes_total = os.path.getsize(job.source)
+        job.save()
+
+        try:
+            self.import_batches(committed)
+        except Exception as exc:
+            job.status = ImportJob.FAILED
+            job.error = f'{type(exc).__name__}: {exc}'
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            raise
+
+        job.status = ImportJob.COMPLETED
+        job.save(update_fields=['status', 'updated_at'])
+        ImportBatch.objects.filter(job=job).delete()
+        return job
+
+    def import_batches(self, committed):
+        job = self.job
+        authors = AuthorMap()
+        batches = read_batches(job.source, job.format, job.offset, job.batch_size)
+        first_row = job.rows_done + 1
+
+        if not self.workers:
+            for start, end, rows in batches:
+                if start in committed:
+                    self.record(start, end, len(rows))
+                else:
+                    self.record(*import_batch(job.pk, start, end, first_row, authors.prepare(rows), self.max_errors))
+                first_row += len(rows)
+            return
+
+        # Spawned workers set Django up from scratch instead of inheriting
+        # this process's database connections.
+        pool = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        )
+        pending = set()
+        try:
+            for start, end, rows in batches:
+                if start in committed:
+                    self.record(start, end, len(rows))
+                else:
+                    items = authors.prepare(rows)
+                    pending.add(pool.submit(import_batch, job.pk, start, end, first_row, items, self.max_errors))
+                first_row += len(rows)
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.record(*future.result())
+            for future in pending:
+                self.record(*future.result())
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def record(self, start, end, rows, imported=0, failed=0, errors=()):
+        job = self.job
+        job.rows_imported += imported
+        job.rows_failed += failed
+        job.errors.extend(errors[:max(self.max_errors - len(job.errors), 0)])
+        self.finished[start] = (end, rows)
+        while job.offset in self.finished:
+            job.offset, rows = self.finished.pop(job.offset)
+            job.rows_done += rows
+        job.save(update_fields=['offset', 'rows_done', 'rows_imported', 'rows_failed', 'errors', 'updated_at'])
+        if self.progress:
+            self.progress(job)
+
+
+def run_import(job, workers=None, progress=None):
+    return Importer(job, workers, progress).run()
+
+
+def start_import(job):
+    """Run an uploaded job, in a background thread unless BOOK_IMPORT['BACKGROUND'] is off."""
+    if not get_config()['BACKGROUND']:
+        run_import(job)
+        return
+
+    def target():
+        try:
+            run_import(ImportJob.objects.get(pk=job.pk))
+        except Exception:
+            logger.exception('Book import %s failed', job.pk)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=target, name=f'book-import-{job.pk}', daemon=True).start()
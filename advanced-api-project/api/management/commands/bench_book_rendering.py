@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api import compression, renderers
+from api.models import Author, Book
+from api.views import BookListView
+
+
+class Command(BaseCommand):
+    help = "Measure bytes on the wire and rendering CPU for a large BookListView response."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000, help='Number of books in the list.')
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per renderer; the best run is reported.')
+
+    def handle(self, *args, **options):
+        # The books only exist for the duration of the benchmark.
+        with transaction.atomic():
+            self.create_books(options['books'])
+            self.run(options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_books(self, count):
+        authors = Author.objects.bulk_create([Author(name=f'Author {i}') for i in range(max(count // 10, 1))])
+        Book.objects.bulk_create(
+            [
+                Book(title=f'Book number {i}', publication_year=1900 + i % 120, author=authors[i % len(authors)])
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+
+    def run(self, repeat):
+        request = APIRequestFactory().get('/api/books/', HTTP_ACCEPT='application/json')
+        view = BookListView.as_view(throttle_classes=[], renderer_classes=[JSONRenderer])
+        start = time.process_time()
+        data = view(request).data
+        self.stdout.write(f'Query + serialize {len(data)} books: {(time.process_time() - start) * 1000:.0f} ms CPU\n')
+
+        candidates = [('DRF JSONRenderer', JSONRenderer()), ('FastJSONRenderer', renderers.FastJSONRenderer())]
+        if renderers.MessagePackRenderer.available:
+            candidates.append(('MessagePackRenderer', renderers.MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack is not installed; skipping MessagePackRenderer.')
+
+        codings = [('gzip', compression.GzipCompressor)]
+        if compression.brotli is not None:
+            codings.append(('br', compression.BrotliCompressor))
+        else:
+            self.stdout.write('brotli is not installed; skipping br.')
+
+        header = f'{"renderer":<22}{"render ms":>10}{"bytes":>12}'
+        header += ''.join(f'{name + " bytes":>14}{name + " ms":>10}' for name, _ in codings)
+        self.stdout.write(header)
+
+        config = compression.get_config()
+        for name, renderer in candidates:
+            render_ms, body = self.best_of(repeat, lambda: renderer.render(data, renderer.media_type, {}))
+            row = f'{name:<22}{render_ms:>10.1f}{len(body):>12,}'
+            for _, compressor_class in codings:
+                def compress():
+                    compressor = compressor_class(config)
+                    return compressor.compress(body) + compressor.finish()
+                compress_ms, compressed = self.best_of(repeat, compress)
+                row += f'{len(compressed):>14,}{compress_ms:>10.1f}'
+            self.stdout.write(row)
+
+    @staticmethod
+    def best_of(repeat, func):
+        best, result = None, None
+        for _ in range(repeat):
+            start = time.process_time()
+            result = func()
+            elapsed = (time.process_time() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
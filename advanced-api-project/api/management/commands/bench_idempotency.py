@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import idempotency
+from api.models import Author
+from api.views import BookCreateView
+
+
+class Command(BaseCommand):
+    help = "Measure the per-write overhead of Idempotency-Key handling on BookCreateView."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writes', type=int, default=1000, help='Books created per variant.')
+
+    def handle(self, *args, **options):
+        writes = options['writes']
+        self.factory = APIRequestFactory()
+        self.view = BookCreateView.as_view(throttle_classes=[])
+        self.user = User(pk=0, username='bench')
+        self.stdout.write(f'Idempotency store: {type(idempotency.get_store()).__name__}')
+
+        # The books only exist for the duration of the benchmark.
+        with transaction.atomic():
+            author = Author.objects.create(name='Bench')
+            data = [{'title': f'Bench {i}', 'publication_year': 2000, 'author': author.pk} for i in range(writes)]
+
+            plain = self.timed(data, key=None)
+            keyed = self.timed(data, key='first')
+            replayed = self.timed(data, key='first')
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{"variant":<28}{"us/request":>12}')
+        self.stdout.write(f'{"without key":<28}{plain:>12.0f}')
+        self.stdout.write(f'{"with key (first request)":<28}{keyed:>12.0f}')
+        self.stdout.write(f'{"with key (replay)":<28}{replayed:>12.0f}')
+        self.stdout.write(f'Overhead per write: {keyed - plain:.0f} us ({(keyed - plain) / plain:.1%})')
+
+    def timed(self, data, key):
+        start = time.perf_counter()
+        for i, item in enumerate(data):
+            extra = {'HTTP_IDEMPOTENCY_KEY': f'{key}-{i}'} if key else {}
+            request = self.factory.post('/api/books/create/', item, format='json', **extra)
+            force_authenticate(request, user=self.user)
+            response = self.view(request)
+            if response.status_code != 201:
+                raise RuntimeError(f'Create failed with {response.status_code}: {response.data}')
+        return (time.perf_counter() - start) / len(data) * 1e6
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api import outbox
+
+
+class Command(BaseCommand):
+    help = "Delete change events older than CHANGE_EVENTS['RETENTION_DAYS']."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep events from the last DAYS days.')
+        parser.add_argument('--batch-size', type=int, help='Events deleted per transaction.')
+
+    def handle(self, *args, **options):
+        deleted = outbox.compact(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} change events; cursors below {outbox.pruned_through()} have expired'
+        ))
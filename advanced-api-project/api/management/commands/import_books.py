@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import importing
+from api.models import ImportJob
+from api.serializers import ImportJobSerializer
+
+
+class Command(BaseCommand):
+    help = "Import books from a CSV or NDJSON file, or resume a failed import."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV or NDJSON file with title, publication_year and author.')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, help='Rows per batch (default BOOK_IMPORT["BATCH_SIZE"]).')
+        parser.add_argument('--workers', type=int, help='Worker processes; 0 imports in this process.')
+        parser.add_argument('--resume', type=int, metavar='JOB_ID', help='Continue an import that stopped.')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                job = ImportJob.objects.get(pk=options['resume'])
+            except ImportJob.DoesNotExist:
+                raise CommandError(f'Import {options["resume"]} does not exist.')
+            if job.status == ImportJob.COMPLETED:
+                raise CommandError(f'Import {job.pk} has already completed.')
+            self.stdout.write(f'Resuming import {job.pk} at row {job.rows_done + 1}')
+        elif options['path']:
+            job = self.create_job(options)
+            self.stdout.write(f'Import {job.pk}; resume with --resume {job.pk} if it stops')
+        else:
+            raise CommandError('Give a file to import or --resume JOB_ID.')
+
+        self.started = time.monotonic()
+        self.start_offset = job.offset
+        self.next_report = 0
+        try:
+            importing.run_import(job, workers=options['workers'], progress=self.report)
+        except Exception as exc:
+            raise CommandError(f'Import {job.pk} failed: {job.error}. Resume with --resume {job.pk}') from exc
+        self.stdout.write(self.style.SUCCESS(
+            f'Import {job.pk} completed: {job.rows_imported} books imported, {job.rows_failed} rows rejected'
+        ))
+        for error in job.errors[:10]:
+            self.stdout.write(f'  row {error["row"]}: {error["errors"]}')
+
+    def create_job(self, options):
+        path = os.path.abspath(options['path'])
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} is not a file.')
+        format = options['format'] or ImportJobSerializer.FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if format is None:
+            raise CommandError('Give --format for files without a .csv or .ndjson extension.')
+        return ImportJob.objects.create(
+            source=path,
+            format=format,
+            batch_size=options['batch_size'] or importing.get_config()['BATCH_SIZE'],
+        )
+
+    def report(self, job):
+        now = time.monotonic()
+        if now < self.next_report:
+            return
+        self.next_report = now + 1
+        rate = (job.offset - self.start_offset) / max(now - self.started, 1e-6) / 2**20
+        self.stdout.write(
+            f'{job.progress:6.1%}  {job.rows_done} rows  {job.rows_imported} imported  '
+            f'{job.rows_failed} rejected  {rate:.1f} MiB/s'
+        )
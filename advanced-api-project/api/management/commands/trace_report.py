@@ -0,0 +1,51 @@
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import tracing
+
+
+class Command(BaseCommand):
+    help = "Summarize spans written by the 'file' trace exporter, hottest first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="Defaults to TRACING['FILE'].")
+        parser.add_argument('--top', type=int, default=25, help='Span names to show.')
+        parser.add_argument('--sort', choices=['self', 'total'], default='self',
+                            help='Rank by time spent in the span itself, or including its children.')
+
+    def handle(self, *args, **options):
+        path = options['file'] or tracing.get_config()['FILE']
+        durations, child_time, names, traces = {}, defaultdict(int), {}, set()
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    span = json.loads(line)
+                    key = (span['traceId'], span['spanId'])
+                    duration = span['endTimeUnixNano'] - span['startTimeUnixNano']
+                    durations[key], names[key] = duration, span['name']
+                    traces.add(span['traceId'])
+                    if span['parentSpanId']:
+                        child_time[(span['traceId'], span['parentSpanId'])] += duration
+        except FileNotFoundError:
+            raise CommandError(f'No trace file at {path}; is TRACING enabled with the file exporter?')
+
+        stats = defaultdict(lambda: {'count': 0, 'total': 0, 'self': 0, 'samples': []})
+        for key, duration in durations.items():
+            row = stats[names[key]]
+            row['count'] += 1
+            row['total'] += duration
+            row['self'] += max(duration - child_time[key], 0)
+            row['samples'].append(duration)
+
+        self.stdout.write(f'{len(traces)} traces, {len(durations)} spans from {path}')
+        self.stdout.write(f'{"span":<48}{"count":>8}{"self ms":>12}{"total ms":>12}{"avg ms":>10}{"p95 ms":>10}')
+        ranked = sorted(stats.items(), key=lambda item: item[1][options['sort']], reverse=True)
+        for name, row in ranked[:options['top']]:
+            samples = sorted(row['samples'])
+            p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+            self.stdout.write(
+                f'{name[:47]:<48}{row["count"]:>8}{row["self"] / 1e6:>12.1f}{row["total"] / 1e6:>12.1f}'
+                f'{row["total"] / row["count"] / 1e6:>10.2f}{p95 / 1e6:>10.2f}'
+            )
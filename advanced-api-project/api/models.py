@@ -1,7 +1,26 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
+from django.utils import timezone
 
 
-class Author(models.Model):
+class ChangeTrackedModel(models.Model):
+    """
+    Abstract base for models whose writes are recorded as ChangeEvents (see api.outbox).
+
+    save() runs in a transaction so the event written by the post_save receiver
+    commits or rolls back together with the row. Deletes are already atomic.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class Author(ChangeTrackedModel):
     """
     Model representing a book author.
     
@@ -14,7 +33,7 @@ class Author(models.Model):
         return self.name
 
 
-class Book(models.Model):
+class Book(ChangeTrackedModel):
     """
     Model representing a book with its basic information and relationship to an author.
     
@@ -33,3 +52,128 @@ class Book(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class ImportJob(models.Model):
+    """
+    A bulk import of books from a CSV or NDJSON file (see api.importing).
+
+    Attributes:
+        source (CharField): Path of the file being imported.
+        format (CharField): 'csv' or 'ndjson'.
+        status (CharField): pending, running, failed or completed.
+        batch_size (PositiveIntegerField): Rows validated and inserted together. Kept with
+                                           the job so a resumed import cuts the same batches.
+        offset (BigIntegerField): Byte offset up to which every batch is committed; a failed
+                                  import resumes from here.
+        bytes_total (BigIntegerField): Size of the source file.
+        rows_done (BigIntegerField): Rows processed before `offset`.
+        rows_imported / rows_failed (BigIntegerField): Books created and rows rejected so far.
+        errors (JSONField): The first rejected rows with their validation errors.
+        error (TextField): Why the import stopped, when it failed.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+        (COMPLETED, 'Completed'),
+    ]
+    FORMAT_CHOICES = [('csv', 'CSV'), ('ndjson', 'NDJSON')]
+
+    source = models.CharField(max_length=500)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    batch_size = models.PositiveIntegerField(default=1000)
+    offset = models.BigIntegerField(default=0)
+    bytes_total = models.BigIntegerField(default=0)
+    rows_done = models.BigIntegerField(default=0)
+    rows_imported = models.BigIntegerField(default=0)
+    rows_failed = models.BigIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='book_imports'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Import {self.pk} ({self.status})'
+
+    @property
+    def progress(self):
+        """Share of the file processed, between 0 and 1."""
+        if self.status == self.COMPLETED:
+            return 1.0
+        return min(self.offset / self.bytes_total, 1.0) if self.bytes_total else 0.0
+
+
+class ImportBatch(models.Model):
+    """
+    A committed batch of an ImportJob, written in the same transaction as its books.
+
+    Batches finish out of order in the worker pool; these rows let a resumed
+    import skip the ones already committed past ImportJob.offset. They are
+    deleted when the job completes.
+    """
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='batches')
+    start_offset = models.BigIntegerField()
+    end_offset = models.BigIntegerField()
+    rows = models.PositiveIntegerField()
+    imported = models.PositiveIntegerField()
+    failed = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'start_offset'], name='unique_import_batch_start'),
+        ]
+
+
+class ChangeEvent(models.Model):
+    """
+    One change to a Book or Author, appended in the transaction that made it.
+
+    Consumers read events in id order from a cursor (see ChangeListView).
+
+    Attributes:
+        model (CharField): 'book' or 'author'.
+        object_id (BigIntegerField): Primary key of the changed row.
+        action (CharField): created, updated or deleted.
+        payload (JSONField): The row as serialized after the change; only the id for deletes.
+        created_at (DateTimeField): When the change was made; used for pruning.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [(CREATED, 'Created'), (UPDATED, 'Updated'), (DELETED, 'Deleted')]
+    MODEL_CHOICES = [('book', 'Book'), ('author', 'Author')]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'id'], name='changeevent_model_id')]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} {self.action}'
+
+
+class ChangeEventCompaction(models.Model):
+    """
+    A pruning run of the change log. Cursors below `pruned_through` can no longer be served.
+
+    Attributes:
+        pruned_through (BigIntegerField): Highest ChangeEvent id deleted by this run.
+        deleted (BigIntegerField): Number of events deleted.
+        created_at (DateTimeField): When the run finished.
+    """
+    pruned_through = models.BigIntegerField()
+    deleted = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
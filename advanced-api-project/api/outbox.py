@@ -0,0 +1,105 @@
+"""
+Transactional outbox of Book and Author changes.
+
+Every create, update or delete of a Book or Author appends a ChangeEvent in
+the same transaction. Model saves and deletes do this through the receivers
+in api.signals. Bulk paths that skip signals, such as api.importing, call
+record_created() themselves. QuerySet.update() is not tracked.
+
+Consumers read events in id order with ChangeListView and keep the id of the
+last event as their cursor. Ids are assigned at insert time, but a
+transaction can commit after a later one. So events younger than
+SETTLE_SECONDS are held back, in case a lower id is still on its way. Keep
+that setting above your longest write transaction.
+
+compact() (the compact_outbox command) deletes events older than
+RETENTION_DAYS and records how far it pruned. A consumer whose cursor is
+below that point gets 410 Gone. It must resync from BookListView: first
+read `?cursor=latest`, then reload the catalog, then continue from that
+cursor.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Author, Book, ChangeEvent, ChangeEventCompaction
+from .serializers import BookSerializer
+
+DEFAULTS = {
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+    'SETTLE_SECONDS': 2,
+    'RETENTION_DAYS': 7,
+    'COMPACT_BATCH_SIZE': 10000,
+}
+
+MODEL_NAMES = {Book: 'book', Author: 'author'}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CHANGE_EVENTS', {})}
+
+
+def payload(instance):
+    if isinstance(instance, Book):
+        return dict(BookSerializer(instance).data)
+    return {'id': instance.pk, 'name': instance.name}
+
+
+def event(instance, action):
+    return ChangeEvent(
+        model=MODEL_NAMES[type(instance)],
+        object_id=instance.pk,
+        action=action,
+        payload={'id': instance.pk} if action == ChangeEvent.DELETED else payload(instance),
+    )
+
+
+def record(instance, action):
+    event(instance, action).save()
+
+
+def record_created(instances):
+    """Append `created` events for rows inserted with bulk_create."""
+    ChangeEvent.objects.bulk_create([event(instance, ChangeEvent.CREATED) for instance in instances])
+
+
+def head():
+    """Cursor of the newest event."""
+    return ChangeEvent.objects.aggregate(head=Max('id'))['head'] or 0
+
+
+def pruned_through():
+    """Highest event id ever pruned; cursors below it cannot be served."""
+    return ChangeEventCompaction.objects.aggregate(pruned=Max('pruned_through'))['pruned'] or 0
+
+
+def visible(queryset):
+    """Events old enough that no lower id can still commit."""
+    return queryset.filter(created_at__lte=timezone.now() - timedelta(seconds=get_config()['SETTLE_SECONDS']))
+
+
+def compact(days=None, batch_size=None):
+    """Delete events older than `days` in batches; return how many were deleted."""
+    config = get_config()
+    days = config['RETENTION_DAYS'] if days is None else days
+    batch_size = batch_size or config['COMPACT_BATCH_SIZE']
+    cutoff = timezone.now() - timedelta(days=days)
+    last = ChangeEvent.objects.filter(created_at__lt=cutoff).aggregate(last=Max('id'))['last']
+    if last is None:
+        return 0
+
+    # Record the horizon before deleting, so no consumer reads past a gap unnoticed.
+    compaction = ChangeEventCompaction.objects.create(pruned_through=last, deleted=0)
+    while True:
+        ids = list(ChangeEvent.objects.filter(id__lte=last).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted, _ = ChangeEvent.objects.filter(id__gte=ids[0], id__lte=ids[-1]).delete()
+        compaction.deleted += deleted
+    compaction.save(update_fields=['deleted'])
+    return compaction.deleted
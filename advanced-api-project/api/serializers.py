@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Author, Book
+from .models import Author, Book, ChangeEvent, ImportJob
 from datetime import datetime
+import os
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -65,4 +66,62 @@ class AuthorSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Author
-        fields = ['id', 'name', 'books']
\ No newline at end of file
+        fields = ['id', 'name', 'books']
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for uploading a book catalog and reporting the import's progress.
+
+    On upload, `file` (CSV or NDJSON) is written to storage in chunks and
+    `format` defaults to the file's extension. Everything else is read-only
+    progress information, see api.importing.
+
+    Attributes:
+        file (FileField): The uploaded catalog; write-only.
+        progress (FloatField): Share of the file processed, between 0 and 1.
+    """
+    file = serializers.FileField(write_only=True)
+    format = serializers.ChoiceField(choices=ImportJob.FORMAT_CHOICES, required=False)
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'file', 'format', 'status', 'progress', 'rows_done', 'rows_imported',
+            'rows_failed', 'errors', 'error', 'created_at', 'updated_at',
+        ]
+        read_only_fields = [
+            'status', 'rows_done', 'rows_imported', 'rows_failed', 'errors', 'error', 'created_at', 'updated_at',
+        ]
+
+    FORMAT_EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+    def validate(self, attrs):
+        """Infer the format from the file name when it is not given."""
+        if 'format' not in attrs:
+            extension = os.path.splitext(attrs['file'].name)[1].lower()
+            attrs['format'] = self.FORMAT_EXTENSIONS.get(extension)
+            if attrs['format'] is None:
+                raise serializers.ValidationError(
+                    {'format': ['This field is required for files without a .csv or .ndjson extension.']}
+                )
+        return attrs
+
+    def create(self, validated_data):
+        """The file itself is not stored on the job; the view saves it and passes `source`."""
+        validated_data.pop('file')
+        return super().create(validated_data)
+
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    """
+    Serializer for change events read by downstream consumers.
+
+    `id` doubles as the cursor: pass the id of the last event seen to get
+    the events after it.
+    """
+
+    class Meta:
+        model = ChangeEvent
+        fields = ['id', 'model', 'object_id', 'action', 'payload', 'created_at']
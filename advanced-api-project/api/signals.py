@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import outbox
+from .models import Author, Book, ChangeEvent
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Author)
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata; fixtures are not changes downstream needs to hear about
+        return
+    outbox.record(instance, ChangeEvent.CREATED if created else ChangeEvent.UPDATED)
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Author)
+def record_delete(sender, instance, **kwargs):
+    outbox.record(instance, ChangeEvent.DELETED)
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from advanced_api_project import db_pool
+from advanced_api_project.db_pool.sqlite3.base import DatabaseWrapper
+
+CONFIG = {**db_pool.DEFAULTS, 'MAX_SIZE': 2, 'TIMEOUT': 0.05}
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    """
+    Unit tests for ConnectionPool.
+
+    Uses plain sqlite3 connections to a temporary file as the pooled resource.
+    """
+
+    def setUp(self):
+        """Create a temporary database file and an empty pool."""
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.pool = db_pool.ConnectionPool('test', CONFIG)
+        self.addCleanup(self.pool.close_all)
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def test_released_connections_are_reused(self):
+        """Test that a released connection is handed out again instead of opening a new one."""
+        first = self.pool.acquire(self.connect)
+        self.pool.release(first)
+        second = self.pool.acquire(self.connect)
+        self.assertIs(first, second)
+
+        stats = self.pool.stats()
+        self.assertEqual((stats['opened'], stats['acquired'], stats['in_use']), (1, 2, 1))
+        self.assertEqual(stats['churn'], 0.5)
+
+    def test_saturated_pool_times_out(self):
+        """
+        Test that callers wait for a free connection and give up after TIMEOUT.
+
+        Verifies that saturation and timeouts are counted.
+        """
+        held = [self.pool.acquire(self.connect) for _ in range(2)]
+        with self.assertRaises(db_pool.PoolTimeout):
+            self.pool.acquire(self.connect)
+
+        # A connection released while a caller waits is handed over to it.
+        self.pool.timeout = 2
+        timer = threading.Timer(0.01, self.pool.release, args=[held[0]])
+        timer.start()
+        self.assertIs(self.pool.acquire(self.connect), held[0])
+        timer.join()
+
+        stats = self.pool.stats()
+        self.assertEqual((stats['saturated_waits'], stats['timeouts'], stats['size']), (2, 1, 2))
+        self.assertGreater(stats['wait_max_ms'], 0)
+
+    def test_old_and_broken_connections_are_replaced(self):
+        """Test MAX_AGE expiry and the health check of idle connections."""
+        connection = self.pool.acquire(self.connect)
+        self.pool.release(connection)
+        with mock.patch.object(db_pool.time, 'monotonic', return_value=db_pool.time.monotonic() + 3600):
+            self.assertIsNot(self.pool.acquire(self.connect), connection)
+        self.assertEqual(self.pool.stats()['closed'], {'max_age': 1})
+
+        pool = db_pool.ConnectionPool('test', {**CONFIG, 'CHECK_AFTER': 0})
+        broken = pool.acquire(self.connect)
+        pool.release(broken)
+        broken.close()
+        self.assertIsNot(pool.acquire(self.connect), broken)
+        self.assertEqual(pool.stats()['closed'], {'unusable': 1})
+
+
+class PooledBackendTestCase(SimpleTestCase):
+    """Integration tests for the pooled SQLite backend."""
+
+    def test_close_returns_connection_to_pool(self):
+        """Test that Django's close() at the end of a request keeps the raw connection for reuse."""
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        settings_dict = {**connections['default'].settings_dict, 'NAME': path, 'POOL': CONFIG}
+        wrapper = DatabaseWrapper(settings_dict, alias='pool_test')
+
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, raw)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        wrapper.close()
+
+        stats = db_pool.pool_stats()[f'pool_test:{path}']
+        self.assertEqual((stats['opened'], stats['acquired'], stats['in_use']), (1, 2, 0))
+        db_pool.get_pool('pool_test', settings_dict).close_all()
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from advanced_api_project import db_routers
+from .models import Author, Book
+
+ROUTING = {'REPLICAS': ['replica'], 'PIN_SECONDS': 5, 'HEALTH_CHECK_INTERVAL': 5, 'RETRY_AFTER': 30}
+
+
+@override_settings(DATABASE_ROUTING=ROUTING)
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    Test suite for PrimaryReplicaRouter and ReplicaRoutingMiddleware.
+
+    The replica is a second SQLite file that is never written to by the
+    primary, so replication lag is total: a book only on the primary shows
+    which database served a read. Reads inside a transaction go to the
+    primary, so these tests run outside the per-test transaction TestCase
+    would wrap them in.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """Put a different book on each database and reset router state."""
+        db_routers.health.reset()
+        for alias, title in (('default', 'Primary Book'), ('replica', 'Replica Book')):
+            author = Author.objects.using(alias).create(name='Author')
+            Book.objects.using(alias).create(title=title, publication_year=2000, author=author)
+        self.url = reverse('book-list')
+        self.client = APIClient()
+
+    def titles(self, response):
+        return [book['title'] for book in response.json()]
+
+    def test_safe_requests_read_from_replica(self):
+        """Test that GET requests are served from the replica."""
+        self.assertEqual(self.titles(self.client.get(self.url)), ['Replica Book'])
+
+    def test_reads_after_write_stick_to_primary(self):
+        """
+        Test read-your-writes for a client that just created a book.
+
+        Verifies the write goes to the primary and the following read, carrying
+        the pin cookie, also reads from the primary.
+        """
+        self.client.force_authenticate(User.objects.create_user('writer', password='pass12345'))
+        author = Author.objects.get()
+        response = self.client.post(
+            reverse('book-create'), {'title': 'New Book', 'publication_year': 2020, 'author': author.pk}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(db_routers.PIN_COOKIE, response.cookies)
+
+        self.assertEqual(self.titles(self.client.get(self.url)), ['New Book', 'Primary Book'])
+
+        self.client.cookies.clear()
+        self.assertEqual(self.titles(self.client.get(self.url)), ['Replica Book'])
+
+    def test_token_clients_are_pinned_without_cookies(self):
+        """Test that API clients are pinned by their Authorization header."""
+        request = mock.Mock(META={'HTTP_AUTHORIZATION': 'Token abc'}, COOKIES={})
+        middleware = db_routers.ReplicaRoutingMiddleware(lambda request: None)
+        self.assertFalse(middleware.is_pinned(request))
+        middleware.pin(request, mock.Mock(), ROUTING)
+        self.assertTrue(middleware.is_pinned(request))
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        """
+        Test that a replica failing its health check is skipped.
+
+        Verifies the failure is remembered instead of re-checked on every request.
+        """
+        with mock.patch.object(db_routers.health, 'check', return_value=False) as check, \
+                self.assertLogs(db_routers.__name__, 'WARNING'):
+            self.assertEqual(self.titles(self.client.get(self.url)), ['Primary Book'])
+            self.assertEqual(self.titles(self.client.get(self.url)), ['Primary Book'])
+        self.assertEqual(check.call_count, 1)
+
+    def test_reads_outside_requests_and_in_transactions_use_primary(self):
+        """Test that shells, commands and atomic blocks read from the primary."""
+        router = db_routers.PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Book), 'default')
+
+        token = db_routers._state.set(db_routers.RequestState(use_replica=True))
+        try:
+            self.assertEqual(router.db_for_read(Book), 'replica')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Book), 'default')
+        finally:
+            db_routers._state.reset(token)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.views import APIView
+
+from . import idempotency
+from .models import Author, Book
+
+
+class IdempotentCreateTestCase(APITestCase):
+    """
+    Test suite for the Idempotency-Key header on BookCreateView.
+
+    Checks replays, key reuse with a different body and per-user scoping.
+    """
+
+    def setUp(self):
+        """Create a user, an author and an empty idempotency store."""
+        idempotency.get_store().clear()
+        self.user = User.objects.create_user('writer', password='pass12345')
+        self.client.force_authenticate(self.user)
+        self.author = Author.objects.create(name='Octavia Butler')
+        self.url = reverse('book-create')
+        self.data = {'title': 'Kindred', 'publication_year': 1979, 'author': self.author.pk}
+
+    def post(self, data, key):
+        return self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_response_without_creating_again(self):
+        """
+        Test that a retried request gets the original response back.
+
+        Verifies only one book exists and the replay is marked as such.
+        """
+        first = self.post(self.data, 'key-1')
+        retry = self.post(self.data, 'key-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertFalse(first.has_header('Idempotent-Replayed'))
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_key_reused_for_different_request_is_rejected(self):
+        """Test that a key cannot be reused with a different request body."""
+        self.post(self.data, 'key-1')
+        response = self.post({**self.data, 'title': 'Dawn'}, 'key-1')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        """Test that two users sending the same key both create a book."""
+        self.post(self.data, 'key-1')
+        self.client.force_authenticate(User.objects.create_user('other', password='pass12345'))
+        self.assertEqual(self.post(self.data, 'key-1').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_requests_without_key_are_unchanged(self):
+        """Test that requests without the header are never deduplicated."""
+        self.client.post(self.url, self.data, format='json')
+        self.client.post(self.url, self.data, format='json')
+        self.assertEqual(Book.objects.count(), 2)
+
+
+class SlowCreateView(APIView):
+    permission_classes = [AllowAny]
+    throttle_classes = []
+    calls = 0
+
+    @idempotency.idempotent
+    def post(self, request):
+        type(self).calls += 1
+        time.sleep(0.2)
+        return Response({'created': type(self).calls}, status=status.HTTP_201_CREATED)
+
+
+class ConcurrentDuplicatesTestCase(SimpleTestCase):
+    """Unit tests for serializing concurrent requests that share a key."""
+
+    def test_concurrent_duplicate_waits_and_replays(self):
+        """
+        Test that a duplicate arriving while the first request runs waits for it.
+
+        Verifies the view body runs once and both clients get the same response.
+        """
+        idempotency.get_store().clear()
+        view = SlowCreateView.as_view()
+        factory = APIRequestFactory()
+        responses = []
+
+        def send():
+            request = factory.post('/', {'title': 'x'}, format='json', HTTP_IDEMPOTENCY_KEY='same')
+            responses.append(view(request))
+
+        threads = [threading.Thread(target=send) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(SlowCreateView.calls, 1)
+        self.assertEqual([r.data for r in responses], [{'created': 1}, {'created': 1}])
+        self.assertEqual(sorted(r.has_header('Idempotent-Replayed') for r in responses), [False, True])
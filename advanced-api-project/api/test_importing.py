@@ -0,0 +1,176 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from . import importing
+from .models import Author, Book, ChangeEvent, ImportBatch, ImportJob
+
+CSV = (
+    'title,publication_year,author\n'
+    'Kindred,1979,Octavia Butler\n'
+    '"Parable of the Sower, Part 1",1993,Octavia Butler\n'
+    'Dune,1965,Frank Herbert\n'
+    'From the Future,3000,Frank Herbert\n'
+    'No Author,1990,\n'
+)
+
+
+class TempFileMixin:
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tempdir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+
+class ImportPipelineTestCase(TempFileMixin, TestCase):
+    """
+    Test suite for the bulk import pipeline in api.importing.
+
+    Runs imports in-process (workers=0), since worker processes cannot see
+    the test database.
+    """
+
+    def job(self, path, format='csv', batch_size=2):
+        return ImportJob.objects.create(source=path, format=format, batch_size=batch_size)
+
+    def test_authors_are_looked_up_under_the_import_lock(self):
+        """Test that resolving authors locks the oldest job row before reading api_author."""
+        self.job('unused.csv')
+        with CaptureQueriesContext(connection) as queries:
+            importing.AuthorMap().resolve(['Ann Leckie'])
+
+        sql = [query['sql'] for query in queries.captured_queries]
+        lock = next(i for i, query in enumerate(sql) if query.startswith('UPDATE "api_importjob"'))
+        lookup = next(i for i, query in enumerate(sql) if 'FROM "api_author"' in query)
+        self.assertLess(lock, lookup)
+        self.assertEqual(Author.objects.filter(name='Ann Leckie').count(), 1)
+
+    def test_csv_import_creates_books_and_reports_rejected_rows(self):
+        """
+        Test that valid rows are imported and invalid ones are reported.
+
+        Verifies that authors are resolved by name (existing ones reused),
+        and that BookSerializer's rules reject the future publication year.
+        """
+        butler = Author.objects.create(name='Octavia Butler')
+        job = importing.run_import(self.job(self.write('books.csv', CSV)), workers=0)
+
+        self.assertEqual(job.status, ImportJob.COMPLETED)
+        self.assertEqual((job.rows_done, job.rows_imported, job.rows_failed), (5, 3, 2))
+        self.assertEqual(
+            sorted(Book.objects.values_list('title', 'author__name')),
+            [('Dune', 'Frank Herbert'), ('Kindred', 'Octavia Butler'),
+             ('Parable of the Sower, Part 1', 'Octavia Butler')],
+        )
+        self.assertEqual(Author.objects.filter(name='Octavia Butler').get(), butler)
+        self.assertEqual([e['row'] for e in job.errors], [4, 5])
+        self.assertIn('publication_year', job.errors[0]['errors'])
+        self.assertEqual(job.errors[1]['errors'], {'author': ['This field is required.']})
+        self.assertFalse(ImportBatch.objects.exists())
+
+    def test_ndjson_import(self):
+        """Test that NDJSON rows are imported and unparsable lines rejected."""
+        lines = [json.dumps({'title': f'Book {i}', 'publication_year': 2000, 'author': 'Anon'}) for i in range(3)]
+        path = self.write('books.ndjson', '\n'.join(lines + ['{broken']) + '\n')
+        job = importing.run_import(self.job(path, format='ndjson'), workers=0)
+
+        self.assertEqual((job.rows_imported, job.rows_failed), (3, 1))
+        self.assertEqual(Author.objects.count(), 1)
+        self.assertEqual(ChangeEvent.objects.filter(model='book', action='created').count(), 3)
+
+    def test_failed_import_resumes_without_duplicates(self):
+        """
+        Test that a failed import resumes where it stopped.
+
+        The second batch is committed but the import dies before recording
+        it; resuming must skip that batch instead of inserting it again.
+        """
+        job = self.job(self.write('books.csv', CSV))
+        record = importing.Importer.record
+        calls = []
+
+        def fail_on_second_batch(importer, *args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('worker lost')
+            return record(importer, *args)
+
+        with mock.patch.object(importing.Importer, 'record', fail_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                importing.run_import(job, workers=0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_done), (ImportJob.FAILED, 2))
+        self.assertEqual(Book.objects.count(), 3)
+
+        job = importing.run_import(job, workers=0)
+        self.assertEqual(job.status, ImportJob.COMPLETED)
+        self.assertEqual((job.rows_done, job.rows_imported, job.rows_failed), (5, 3, 2))
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_rows_are_read_from_an_offset(self):
+        """Test that read_rows restarts mid-file and keeps quoted newlines in one row."""
+        path = self.write('books.csv', 'title,publication_year,author\n"Two\nlines",2000,A\nNext,2001,B\n')
+        rows = list(importing.read_rows(path, 'csv'))
+        self.assertEqual([row['title'] for row, _ in rows], ['Two\nlines', 'Next'])
+        self.assertEqual([row for row, _ in importing.read_rows(path, 'csv', rows[0][1])], [rows[1][0]])
+
+
+@override_settings(BOOK_IMPORT={'BACKGROUND': False, 'WORKERS': 0, 'BATCH_SIZE': 2})
+class BookImportViewTestCase(TempFileMixin, APITestCase):
+    """Test suite for uploading catalogs on BookImportView."""
+
+    def setUp(self):
+        """Store uploads in a temporary MEDIA_ROOT and log in a user."""
+        super().setUp()
+        media = override_settings(MEDIA_ROOT=self.tempdir)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user('importer', password='pass12345')
+        self.client.force_authenticate(self.user)
+
+    def test_upload_imports_file_and_reports_progress(self):
+        """
+        Test that an upload creates a job that imports the file.
+
+        Verifies the 202 response, the inferred format and the progress
+        reported by the detail endpoint.
+        """
+        upload = SimpleUploadedFile('catalog.csv', CSV.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('book-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['format'], 'csv')
+
+        detail = self.client.get(reverse('book-import-detail', args=[response.data['id']]))
+        self.assertEqual(detail.data['status'], ImportJob.COMPLETED)
+        self.assertEqual((detail.data['progress'], detail.data['rows_imported']), (1.0, 3))
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_unknown_extension_requires_format(self):
+        """Test that a file without a known extension needs an explicit format."""
+        upload = SimpleUploadedFile('catalog.txt', CSV.encode())
+        response = self.client.post(reverse('book-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('format', response.data)
+
+    def test_other_users_imports_are_hidden(self):
+        """Test that users only see their own import jobs."""
+        job = ImportJob.objects.create(source='x.csv', format='csv')
+        response = self.client.get(reverse('book-import-detail', args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
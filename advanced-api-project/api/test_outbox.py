@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from . import outbox
+from .models import Author, Book, ChangeEvent
+
+
+class OutboxTestCase(TestCase):
+    """
+    Test suite for recording Book and Author writes as change events.
+
+    Checks the events written for creates, updates and (cascading) deletes,
+    and that events roll back with the write that produced them.
+    """
+
+    def actions(self):
+        return list(ChangeEvent.objects.order_by('id').values_list('model', 'object_id', 'action'))
+
+    def test_writes_append_events(self):
+        """
+        Test that each write appends one event with the row's data.
+
+        Verifies that deleting an author also records its cascaded books.
+        """
+        author = Author.objects.create(name='Ursula K. Le Guin')
+        book = Book.objects.create(title='The Dispossessed', publication_year=1974, author=author)
+        book.title = 'The Dispossessed: An Ambiguous Utopia'
+        book.save()
+        author_id, book_id = author.pk, book.pk
+        author.delete()
+
+        self.assertEqual(self.actions(), [
+            ('author', author_id, 'created'),
+            ('book', book_id, 'created'),
+            ('book', book_id, 'updated'),
+            ('book', book_id, 'deleted'),
+            ('author', author_id, 'deleted'),
+        ])
+        updated = ChangeEvent.objects.get(action='updated')
+        self.assertEqual(updated.payload['title'], 'The Dispossessed: An Ambiguous Utopia')
+        self.assertEqual(updated.payload['author'], author_id)
+
+    def test_events_roll_back_with_the_write(self):
+        """Test that no event survives a rolled back transaction."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Author.objects.create(name='Rolled Back')
+            raise RuntimeError
+        self.assertFalse(ChangeEvent.objects.exists())
+
+    def test_compaction_deletes_old_events_and_records_horizon(self):
+        """Test that compact() prunes events older than the retention period."""
+        author = Author.objects.create(name='Old')
+        ChangeEvent.objects.update(created_at=timezone.now() - timedelta(days=30))
+        Author.objects.create(name='New')
+
+        self.assertEqual(outbox.compact(days=7, batch_size=1), 1)
+        self.assertEqual(list(ChangeEvent.objects.values_list('payload__name', flat=True)), ['New'])
+        self.assertEqual(outbox.pruned_through(), ChangeEvent.objects.get().id - 1)
+        self.assertEqual(outbox.compact(days=7), 0)
+        self.assertTrue(Author.objects.filter(pk=author.pk).exists())
+
+
+@override_settings(CHANGE_EVENTS={'SETTLE_SECONDS': 0, 'PAGE_SIZE': 2})
+class ChangeListViewTestCase(APITestCase):
+    """Test suite for reading change events with ChangeListView."""
+
+    def setUp(self):
+        """Log in a consumer and record a few changes."""
+        self.client.force_authenticate(User.objects.create_user('consumer', password='pass12345'))
+        self.url = reverse('change-list')
+        self.author = Author.objects.create(name='Iain M. Banks')
+        for year in (1987, 1988, 1990):
+            Book.objects.create(title=f'Culture {year}', publication_year=year, author=self.author)
+
+    def test_consumer_pages_through_events_with_cursor(self):
+        """
+        Test that following next_cursor returns every event exactly once.
+
+        Verifies has_more and that a caught-up consumer gets an empty page.
+        """
+        cursor, seen = '0', []
+        while True:
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [event['id'] for event in response.data['results']]
+            cursor = response.data['next_cursor']
+            if not response.data['has_more']:
+                break
+        self.assertEqual(seen, list(ChangeEvent.objects.order_by('id').values_list('id', flat=True)))
+
+        Book.objects.filter(title='Culture 1987').get().delete()
+        response = self.client.get(self.url, {'cursor': cursor})
+        self.assertEqual([e['action'] for e in response.data['results']], ['deleted'])
+        self.assertEqual(self.client.get(self.url, {'cursor': 'latest'}).data['next_cursor'],
+                         response.data['next_cursor'])
+
+    def test_limit_below_one_is_rejected(self):
+        """Test that limit=0 or a negative limit gets 400 instead of an endless empty page."""
+        for limit in ('0', '-1'):
+            response = self.client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(self.client.get(self.url, {'limit': '1'}).data['results']), 1)
+
+    def test_model_filter(self):
+        """Test that ?model= limits the events to one model."""
+        response = self.client.get(self.url, {'model': 'author'})
+        self.assertEqual([e['object_id'] for e in response.data['results']], [self.author.pk])
+
+    @override_settings(CHANGE_EVENTS={'SETTLE_SECONDS': 60})
+    def test_recent_events_are_held_back(self):
+        """Test that events younger than SETTLE_SECONDS are not served yet."""
+        response = self.client.get(self.url)
+        self.assertEqual((response.data['results'], response.data['next_cursor']), ([], '0'))
+
+    def test_pruned_cursor_is_gone(self):
+        """Test that a cursor from before the last compaction gets 410."""
+        ChangeEvent.objects.filter(model='author').update(created_at=timezone.now() - timedelta(days=30))
+        outbox.compact(days=7)
+        response = self.client.get(self.url, {'cursor': '0'})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
@@ -0,0 +1,111 @@
+import gzip
+import json
+import unittest
+
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from . import renderers
+from .compression import CompressionMiddleware, accepted_encodings
+from .models import Author, Book
+
+
+class RendererTestCase(APITestCase):
+    """
+    Test suite for content negotiation on BookListView.
+
+    Checks the compact JSON output, MessagePack when available and the
+    fallback when it is not.
+    """
+
+    def setUp(self):
+        """Create a few books."""
+        author = Author.objects.create(name='Ursula K. Le Guin')
+        Book.objects.bulk_create([
+            Book(title=f'Earthsea {i}', publication_year=1968 + i, author=author) for i in range(3)
+        ])
+        self.url = reverse('book-list')
+
+    def test_json_is_compact(self):
+        """Test that JSON responses carry no whitespace between tokens."""
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = response.content.decode()
+        self.assertNotIn(', ', body)
+        self.assertNotIn(': ', body)
+        self.assertEqual(len(json.loads(body)), 3)
+
+    def test_indent_is_honoured(self):
+        """Test that clients asking for indented JSON still get it."""
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn('\n  ', response.content.decode())
+
+    @unittest.skipIf(renderers.msgpack is None, 'msgpack is not installed')
+    def test_msgpack_is_negotiated(self):
+        """Test that Accept: application/msgpack returns a MessagePack body."""
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(len(renderers.msgpack.unpackb(response.content)), 3)
+
+    @unittest.skipIf(renderers.msgpack is not None, 'msgpack is installed')
+    def test_msgpack_without_library_is_not_acceptable(self):
+        """Test that MessagePack is not offered when msgpack is missing."""
+        response = self.client.get(self.url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+
+@override_settings(RESPONSE_COMPRESSION={'MIN_SIZE': 100})
+class CompressionTestCase(APITestCase):
+    """Test suite for CompressionMiddleware."""
+
+    def setUp(self):
+        """Create enough books for the list to pass the size threshold."""
+        author = Author.objects.create(name='Terry Pratchett')
+        Book.objects.bulk_create([
+            Book(title=f'Discworld {i}', publication_year=1983, author=author) for i in range(20)
+        ])
+        self.url = reverse('book-list')
+
+    def test_large_json_response_is_gzipped(self):
+        """
+        Test that a list above MIN_SIZE is gzip encoded for gzip clients.
+
+        Verifies the headers and that the body decompresses to the same JSON.
+        """
+        plain = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_response_is_left_alone(self):
+        """Test that bodies under MIN_SIZE are sent uncompressed."""
+        url = reverse('book-detail', args=[Book.objects.first().pk])
+        response = self.client.get(url, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class StreamingCompressionTestCase(SimpleTestCase):
+    """Unit tests for compressing streaming responses and parsing Accept-Encoding."""
+
+    def test_streaming_response_is_compressed_incrementally(self):
+        """Test that each chunk is compressed and flushed as it is produced."""
+        chunks = [b'[', b'{"id":1}', b',{"id":2}', b']']
+
+        def view(request):
+            return StreamingHttpResponse(iter(chunks), content_type='application/json')
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware(view)(request)
+        parts = list(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertGreaterEqual(len(parts), len(chunks))
+        self.assertEqual(gzip.decompress(b''.join(parts)), b''.join(chunks))
+
+    def test_zero_quality_codings_are_ignored(self):
+        """Test that q=0 in Accept-Encoding disables a coding."""
+        self.assertEqual(accepted_encodings('gzip;q=0, br, identity;q=0.5'), {'br', 'identity'})
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from . import throttling
+
+
+def rates(client, burst):
+    return {
+        'REST_FRAMEWORK': {
+            'DEFAULT_THROTTLE_RATES': {'client': client, 'burst': burst},
+        }
+    }
+
+
+class ThrottledEndpointTestCase(APITestCase):
+    """
+    Test suite for rate limiting on BookListView.
+
+    Checks rejection once a limit is exhausted, the RateLimit-* headers,
+    per-client keys and the rejection metrics.
+    """
+
+    def setUp(self):
+        """Start every test with empty throttle counters."""
+        throttling.get_store().clear()
+        self.url = reverse('book-list')
+
+    @override_settings(**rates('3/min', '100/min'))
+    def test_sliding_window_rejects_after_limit(self):
+        """
+        Test that the fourth request in a 3/min window is rejected.
+
+        Verifies the 429 status, Retry-After and the remaining-count headers.
+        """
+        remaining = [self.client.get(self.url)['RateLimit-Remaining'] for _ in range(3)]
+        self.assertEqual(remaining, ['2', '1', '0'])
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(response['RateLimit-Limit'], '3')
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+
+    @override_settings(**rates('100/min', '2/min'))
+    def test_token_bucket_limits_bursts(self):
+        """
+        Test that the burst throttle rejects once its bucket is empty.
+
+        Verifies the tighter of the two limits is reported in the headers.
+        """
+        first = self.client.get(self.url)
+        self.assertEqual(first['RateLimit-Limit'], '2')
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(**rates('1/min', '100/min'))
+    def test_limits_are_tracked_per_token(self):
+        """
+        Test that two API tokens get independent limits.
+
+        Verifies requests are keyed by token before falling back to the IP.
+        """
+        alice = Token.objects.create(user=User.objects.create_user('alice', password='pass12345'))
+        bob = Token.objects.create(user=User.objects.create_user('bob', password='pass12345'))
+
+        for token in (alice, bob):
+            self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {alice.key}')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(**rates('1/min', '100/min'))
+    def test_rejections_are_counted(self):
+        """Test that rejected requests show up in the throttle metrics."""
+        before = throttling.metrics.snapshot()['rejected'].get('client', 0)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(throttling.metrics.snapshot()['rejected']['client'], before + 1)
+
+
+class SlidingWindowTestCase(SimpleTestCase):
+    """Unit tests for the sliding window estimate."""
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        """
+        Test that hits from the previous window count in proportion to overlap.
+
+        With 10 hits in the previous window and a quarter of the current window
+        elapsed, 7.5 of them still count, so two more requests are allowed.
+        """
+        throttle = throttling.SlidingWindowThrottle.__new__(throttling.SlidingWindowThrottle)
+        throttle.store = throttling.LocalMemoryStore()
+        for _ in range(10):
+            throttle.store.incr('k:0', ttl=120)
+
+        with mock.patch('api.throttling.time.time', return_value=75.0):
+            results = [throttle.check('k', 10, 60)[0] for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
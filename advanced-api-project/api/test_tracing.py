@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from . import tracing
+from .models import Author, Book
+
+SAMPLED = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+NOT_SAMPLED = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00'
+
+
+class MemoryExporter:
+    traces = []
+
+    def __init__(self, config):
+        pass
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+class BrokenExporter:
+    def __init__(self, config):
+        pass
+
+    def export(self, trace):
+        raise OSError('No space left on device')
+
+
+@override_settings(TRACING={'ENABLED': True, 'SAMPLE_RATE': 0, 'EXPORTER': 'api.test_tracing.MemoryExporter'})
+class TracingMiddlewareTestCase(APITestCase):
+    """
+    Test suite for request tracing.
+
+    Checks sampling, the spans recorded for a DRF list request and their
+    nesting, and the file exporter with the trace_report summary.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Install the instrumentation, which settings leave off."""
+        super().setUpClass()
+        tracing.install()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the instrumentation again, so later tests run unpatched."""
+        tracing.uninstall()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Start with no exported traces and a couple of books."""
+        MemoryExporter.traces.clear()
+        author = Author.objects.create(name='N. K. Jemisin')
+        Book.objects.create(title='The Fifth Season', publication_year=2015, author=author)
+        Book.objects.create(title='The Obelisk Gate', publication_year=2016, author=author)
+
+    def get(self, traceparent=None, **params):
+        headers = {'HTTP_TRACEPARENT': traceparent} if traceparent else {}
+        return self.client.get(reverse('book-list'), params, HTTP_ACCEPT='application/json', **headers)
+
+    @override_settings(TRACING={'ENABLED': True, 'SAMPLE_RATE': 1, 'EXPORTER': 'api.test_tracing.BrokenExporter'})
+    def test_failing_exporter_does_not_fail_the_request(self):
+        """Test that an exporter error is logged and the response still goes out."""
+        with self.assertLogs('api.tracing', 'ERROR'):
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsampled_requests_are_not_traced(self):
+        """Test that SAMPLE_RATE 0 and a traceparent without the sampled flag record nothing."""
+        response = self.get()
+        self.get(NOT_SAMPLED)
+        self.assertEqual(MemoryExporter.traces, [])
+        self.assertNotIn(tracing.TRACE_HEADER, response)
+
+    def test_sampled_request_records_nested_spans(self):
+        """
+        Test the spans of a sampled BookListView request.
+
+        Verifies the trace joins the caller's trace, and that middleware,
+        view, filter backends, serializer and SQL spans are nested under
+        the root span.
+        """
+        response = self.get(SAMPLED, search='Season', ordering='title')
+        self.assertEqual(response[tracing.TRACE_HEADER], '4bf92f3577b34da6a3ce929d0e0e4736')
+
+        (trace,) = MemoryExporter.traces
+        spans = {span.name: span for span in trace.spans}
+        root = trace.spans[0]
+        self.assertEqual(root.name, 'GET /api/books/')
+        self.assertEqual(root.parent_id, '00f067aa0ba902b7')
+        self.assertEqual(root.attributes['http.status_code'], 200)
+        for name in ('middleware SecurityMiddleware', 'view BookListView', 'filter DjangoFilterBackend',
+                     'filter SearchFilter', 'filter OrderingFilter', 'serialize BookSerializer(many=True)'):
+            self.assertIn(name, spans)
+        self.assertEqual(spans['middleware SecurityMiddleware'].parent_id, spans[root.name].span_id)
+
+        # Only the list serializer gets a span, not each book.
+        self.assertEqual(sum(span.name.startswith('serialize') for span in trace.spans), 1)
+        query = next(span for span in trace.spans if span.name == 'SELECT api_book')
+        self.assertEqual(query.attributes['db.system'], 'sqlite')
+        ancestors, parent = [], query.parent_id
+        by_id = {span.span_id: span for span in trace.spans}
+        while parent in by_id:
+            ancestors.append(by_id[parent].name)
+            parent = by_id[parent].parent_id
+        self.assertIn('view BookListView', ancestors)
+
+    def test_file_exporter_and_report(self):
+        """Test that the file exporter writes OTLP-style JSON lines that trace_report reads."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'traces.jsonl')
+            config = {'ENABLED': True, 'SAMPLE_RATE': 1, 'EXPORTER': 'file', 'FILE': path}
+            with override_settings(TRACING=config):
+                self.get()
+                self.get()
+                with open(path) as f:
+                    spans = [json.loads(line) for line in f]
+                out = io.StringIO()
+                call_command('trace_report', stdout=out)
+
+        self.assertEqual(len({span['traceId'] for span in spans}), 2)
+        self.assertTrue(all(span['endTimeUnixNano'] >= span['startTimeUnixNano'] for span in spans))
+        self.assertIn('2 traces', out.getvalue())
+        self.assertIn('view BookListView', out.getvalue())
+
+
+class StatementNameTestCase(SimpleTestCase):
+    """Unit tests for naming SQL spans."""
+
+    def test_statement_names(self):
+        """Test that queries are named by operation and table."""
+        self.assertEqual(tracing.statement_name('SELECT "api_book"."id" FROM "api_book" WHERE 1'), 'SELECT api_book')
+        self.assertEqual(tracing.statement_name('INSERT INTO "api_author" ("name") VALUES (%s)'), 'INSERT api_author')
+        self.assertEqual(tracing.statement_name('UPDATE "api_book" SET x = 1'), 'UPDATE api_book')
+        self.assertEqual(tracing.statement_name('SAVEPOINT "s1"'), 'SAVEPOINT')
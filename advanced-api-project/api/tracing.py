@@ -0,0 +1,419 @@
+"""
+Request tracing with nested spans, shaped like OpenTelemetry's.
+
+TracingMiddleware goes first in MIDDLEWARE. For a sampled request it opens a
+root span, and install() (called from ApiConfig.ready() when tracing is
+enabled) patches Django and DRF to open child spans for:
+
+- every middleware (each span contains the middleware below it),
+- the view,
+- the DRF filter backends (DjangoFilterBackend, SearchFilter, OrderingFilter),
+- serializer to_representation (the outermost serializer only),
+- template rendering,
+- each SQL query, named after its operation and table, e.g. "SELECT api_book".
+
+A request is sampled with probability SAMPLE_RATE. A W3C `traceparent`
+header overrides that, and its trace id and parent span are kept, so traces
+join up with a proxy or client that traces too. Requests that are not
+sampled pay for one context variable lookup per instrumented call.
+
+Finished traces go to an exporter; none needs the network:
+'console' prints each trace as an indented tree to stderr, 'file' appends
+one JSON object per span (OpenTelemetry field names) to FILE, and a dotted
+path names any class with an `export(trace)` method. The trace_report
+command summarizes a file by span name to show the hot paths.
+
+Settings (all optional), e.g.:
+
+    TRACING = {
+        'ENABLED': True,
+        'SAMPLE_RATE': 0.01,
+        'EXPORTER': 'file',
+        'FILE': BASE_DIR / 'traces.jsonl',
+        'MAX_SPANS': 2000,           # per trace; further spans are counted, not kept
+    }
+"""
+import contextvars
+import functools
+import json
+import logging
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.01,
+    'EXPORTER': 'console',
+    'FILE': 'traces.jsonl',
+    'MAX_SPANS': 2000,
+    'MAX_STATEMENT_LENGTH': 1000,
+}
+
+TRACE_HEADER = 'X-Trace-Id'
+
+_traceparent_re = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_table_re = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+["`]?(\w+)', re.IGNORECASE)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'TRACING', {})}
+
+
+class Trace:
+    def __init__(self, trace_id, max_spans):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+
+
+class Span:
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, trace, name, parent_id=None, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.error = None
+        self.start = time.time_ns()
+        self.end = None
+        trace.spans.append(self)
+
+    @property
+    def duration_ms(self):
+        return ((self.end or time.time_ns()) - self.start) / 1e6
+
+    def to_dict(self):
+        return {
+            'traceId': self.trace.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start,
+            'endTimeUnixNano': self.end,
+            'attributes': self.attributes,
+            'status': {'code': 'ERROR', 'message': self.error} if self.error else {'code': 'OK'},
+        }
+
+
+_current = contextvars.ContextVar('tracing_span', default=None)
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def span(name, attributes=None):
+    """Open a child of the current span; does nothing outside a sampled request."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    trace = parent.trace
+    if len(trace.spans) >= trace.max_spans:
+        trace.dropped += 1
+        yield None
+        return
+    child = Span(trace, name, parent.span_id, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = f'{type(exc).__name__}: {exc}'
+        raise
+    finally:
+        child.end = time.time_ns()
+        _current.reset(token)
+
+
+def traced(func, name, attributes=None):
+    """Wrap a sync or async callable in a span called `name`."""
+    if iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return await func(*args, **kwargs)
+            with span(name, attributes):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return func(*args, **kwargs)
+        with span(name, attributes):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def statement_name(sql):
+    words = sql.split(None, 1)
+    if not words:
+        return 'SQL'
+    match = _table_re.search(sql)
+    return f'{words[0].upper()} {match.group(1)}' if match else words[0].upper()
+
+
+class QueryTracer:
+    """connection.execute_wrapper that opens a span per SQL query."""
+
+    def __init__(self, alias, max_length):
+        self.alias = alias
+        self.max_length = max_length
+
+    def __call__(self, execute, sql, params, many, context):
+        if _current.get() is None:
+            return execute(sql, params, many, context)
+        attributes = {
+            'db.system': context['connection'].vendor,
+            'db.alias': self.alias,
+            'db.statement': sql[:self.max_length],
+        }
+        if many:
+            attributes['db.executemany'] = True
+        with span(statement_name(sql), attributes) as query_span:
+            result = execute(sql, params, many, context)
+            if query_span is not None and context['cursor'].rowcount >= 0:
+                query_span.attributes['db.rowcount'] = context['cursor'].rowcount
+            return result
+
+
+def parse_traceparent(header):
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent header, or Nones."""
+    match = _traceparent_re.match((header or '').strip().lower())
+    if not match or match.group(1) == '0' * 32:
+        return None, None, None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class TracingMiddleware:
+    """Opens the root span of sampled requests and hands finished traces to the exporter."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+        trace_id, parent_id, sampled = parse_traceparent(request.META.get('HTTP_TRACEPARENT'))
+        if sampled is None:
+            sampled = random.random() < config['SAMPLE_RATE']
+        if not sampled:
+            return self.get_response(request)
+
+        trace = Trace(trace_id or secrets.token_hex(16), config['MAX_SPANS'])
+        root = Span(trace, request.method, parent_id, {
+            'http.method': request.method,
+            'http.target': request.get_full_path(),
+        })
+        token = _current.set(root)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(QueryTracer(alias, config['MAX_STATEMENT_LENGTH']))
+                    )
+                response = self.get_response(request)
+            root.attributes['http.status_code'] = response.status_code
+            response[TRACE_HEADER] = trace.trace_id
+            return response
+        except BaseException as exc:
+            root.error = f'{type(exc).__name__}: {exc}'
+            raise
+        finally:
+            root.end = time.time_ns()
+            _current.reset(token)
+            match = getattr(request, 'resolver_match', None)
+            if match is not None and match.route:
+                root.name = f'{request.method} /{match.route}'
+                root.attributes['http.route'] = match.route
+            if trace.dropped:
+                root.attributes['tracing.dropped_spans'] = trace.dropped
+            # A failing exporter must not fail the request or hide its exception.
+            try:
+                get_exporter().export(trace)
+            except Exception:
+                logger.exception('Could not export trace %s', trace.trace_id)
+
+
+class ConsoleExporter:
+    """Prints each trace as an indented tree of spans with their durations."""
+
+    def __init__(self, config, stream=None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        children = {}
+        for item in trace.spans:
+            children.setdefault(item.parent_id, []).append(item)
+        span_ids = {item.span_id for item in trace.spans}
+        roots = [item for item in trace.spans if item.parent_id not in span_ids]
+        lines = [f'trace {trace.trace_id}']
+
+        def walk(item, depth):
+            flag = ' !' if item.error else ''
+            lines.append(f'{item.duration_ms:10.2f} ms  {"  " * depth}{item.name}{flag}')
+            for child in children.get(item.span_id, []):
+                walk(child, depth + 1)
+
+        for root in roots:
+            walk(root, 0)
+        with self._lock:
+            self.stream.write('\n'.join(lines) + '\n')
+            self.stream.flush()
+
+
+class FileExporter:
+    """Appends spans as JSON lines, one object per span."""
+
+    def __init__(self, config):
+        self.path = config['FILE']
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        data = ''.join(json.dumps(item.to_dict(), default=str) + '\n' for item in trace.spans)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+
+_exporters = {}
+
+
+def get_exporter():
+    config = get_config()
+    key = (config['EXPORTER'], str(config['FILE']))
+    if key not in _exporters:
+        kind = config['EXPORTER']
+        if kind == 'console':
+            _exporters[key] = ConsoleExporter(config)
+        elif kind == 'file':
+            _exporters[key] = FileExporter(config)
+        else:
+            _exporters[key] = import_string(kind)(config)
+    return _exporters[key]
+
+
+def _view_name(view):
+    view_class = getattr(view, 'view_class', None) or getattr(view, 'cls', None)
+    return (view_class or view).__qualname__
+
+
+# (owner, attribute, original) for every patch install() made, for uninstall().
+_patches = []
+
+
+def _patch(cls, method, wrap):
+    original = getattr(cls, method)
+    _patches.append((cls, method, original))
+    setattr(cls, method, functools.wraps(original)(wrap(original)))
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Patch Django, and DRF and django-filter when installed, to open spans. Safe to call twice."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+
+    from django.core.handlers import base
+    from django.template.base import Template
+
+    # BaseHandler.load_middleware wraps every middleware (and the view
+    # handler at the bottom) with convert_exception_to_response.
+    convert_exception_to_response = base.convert_exception_to_response
+    _patches.append((base, 'convert_exception_to_response', convert_exception_to_response))
+
+    def convert(get_response):
+        handler = convert_exception_to_response(get_response)
+        owner = getattr(get_response, '__self__', get_response)
+        name = 'resolve and call view' if isinstance(owner, base.BaseHandler) else f'middleware {type(owner).__name__}'
+        return traced(handler, name)
+
+    base.convert_exception_to_response = convert
+
+    def make_view_atomic(original):
+        def wrapper(self, view):
+            return traced(original(self, view), f'view {_view_name(view)}')
+        return wrapper
+
+    _patch(base.BaseHandler, 'make_view_atomic', make_view_atomic)
+
+    def render(original):
+        def wrapper(self, context):
+            if _current.get() is None:
+                return original(self, context)
+            with span(f'template {self.origin.template_name or self.name}'):
+                return original(self, context)
+        return wrapper
+
+    _patch(Template, 'render', render)
+
+    try:
+        from rest_framework import filters, serializers
+    except ImportError:
+        return
+
+    def filter_queryset(original, name):
+        def wrapper(self, request, queryset, view):
+            if _current.get() is None:
+                return original(self, request, queryset, view)
+            with span(f'filter {name}'):
+                return original(self, request, queryset, view)
+        return wrapper
+
+    backends = [filters.SearchFilter, filters.OrderingFilter]
+    try:
+        from django_filters.rest_framework import DjangoFilterBackend
+        backends.append(DjangoFilterBackend)
+    except ImportError:
+        pass
+    for backend in backends:
+        _patch(backend, 'filter_queryset', lambda original, name=backend.__name__: filter_queryset(original, name))
+
+    def to_representation(original):
+        def wrapper(self, instance):
+            current = _current.get()
+            # Only the outermost serializer gets a span, or a list of 10,000
+            # books would produce 10,000 of them.
+            if current is None or 'drf.serializer' in current.attributes:
+                return original(self, instance)
+            child = getattr(self, 'child', None)
+            name = type(child).__name__ + '(many=True)' if child is not None else type(self).__name__
+            with span(f'serialize {name}', {'drf.serializer': name}):
+                return original(self, instance)
+        return wrapper
+
+    _patch(serializers.Serializer, 'to_representation', to_representation)
+    _patch(serializers.ListSerializer, 'to_representation', to_representation)
+
+
+def uninstall():
+    """Undo install(). Handlers built while it was installed keep their spans."""
+    global _installed
+    with _install_lock:
+        while _patches:
+            owner, attribute, original = _patches.pop()
+            setattr(owner, attribute, original)
+        _installed = False
@@ -16,4 +16,13 @@ urlpatterns = [
     
     # Book delete view - DELETE /books/delete/
     path('books/delete/', views.BookDeleteView.as_view(), name='book-delete'),
+    
+    # Bulk import upload - POST /books/import/
+    path('books/import/', views.BookImportView.as_view(), name='book-import'),
+    
+    # Bulk import progress - GET /books/import/{id}/
+    path('books/import/<int:pk>/', views.BookImportDetailView.as_view(), name='book-import-detail'),
+    
+    # Change events since a cursor - GET /changes/?cursor=
+    path('changes/', views.ChangeListView.as_view(), name='change-list'),
 ]
\ No newline at end of file
@@ -4,8 +4,12 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticate
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
 import django_filters
-from .models import Book
-from .serializers import BookSerializer
+from django.db import transaction
+from rest_framework.parsers import MultiPartParser
+from . import importing, outbox
+from .idempotency import idempotent
+from .models import Book, ChangeEvent, ImportJob
+from .serializers import BookSerializer, ChangeEventSerializer, ImportJobSerializer
 
 
 class BookFilter(django_filters.FilterSet):
@@ -82,6 +86,8 @@ class BookCreateView(generics.CreateAPIView):
     
     Endpoint: POST /books/create/
     Permissions: Authenticated users only
+    Headers:
+        - Idempotency-Key: optional; makes retries of the same request safe
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -96,12 +102,15 @@ class BookCreateView(generics.CreateAPIView):
         """
         serializer.save()
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Custom create method with enhanced response handling.
         
         Provides detailed success messages and proper error handling
-        for better API user experience.
+        for better API user experience. Retries that send the same
+        Idempotency-Key header get the original response back instead
+        of creating a duplicate book.
         """
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -187,3 +196,107 @@ class BookDeleteView(generics.DestroyAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+
+
+class BookImportView(generics.CreateAPIView):
+    """
+    API view for uploading a book catalog to import in bulk.
+
+    Accepts a multipart upload of a CSV or NDJSON file (see api.importing for
+    the columns). The file is saved and imported in the background; the
+    response is the new import job, whose progress can be followed on
+    BookImportDetailView.
+
+    Endpoint: POST /books/import/
+    Permissions: Authenticated users only
+    Returns: 202 Accepted with the import job
+    """
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def perform_create(self, serializer):
+        """Save the upload, record the job and start it once the job is committed."""
+        job = serializer.save(
+            source=importing.save_upload(serializer.validated_data['file']),
+            batch_size=importing.get_config()['BATCH_SIZE'],
+            created_by=self.request.user,
+        )
+        transaction.on_commit(lambda: importing.start_import(job))
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+
+class BookImportDetailView(generics.RetrieveAPIView):
+    """
+    API view for following the progress of a book import.
+
+    Users see their own imports; staff see all of them.
+
+    Endpoint: GET /books/import/{id}/
+    Permissions: Authenticated users only
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return ImportJob.objects.all()
+        return ImportJob.objects.filter(created_by=self.request.user)
+
+
+class ChangeListView(generics.GenericAPIView):
+    """
+    API view for reading Book and Author changes incrementally (see api.outbox).
+
+    Returns up to `limit` events after `cursor`, oldest first, with the cursor
+    to send next time. Consumers keep calling with `next_cursor` until
+    `has_more` is false, then poll again later.
+
+    Endpoint: GET /changes/
+    Permissions: Authenticated users only
+    Query parameters:
+        - cursor: id of the last event seen; 0 for the start, `latest` for the newest event
+        - limit: events per response, at least 1 (default PAGE_SIZE, at most MAX_PAGE_SIZE)
+        - model: only `book` or only `author` events
+    Returns:
+        200 with {"results": [...], "next_cursor": ..., "has_more": ...}, or
+        410 Gone when events after the cursor were already pruned
+    """
+    serializer_class = ChangeEventSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        config = outbox.get_config()
+        cursor = request.query_params.get('cursor', '0')
+        if cursor == 'latest':
+            return Response({'results': [], 'next_cursor': str(outbox.head()), 'has_more': False})
+        try:
+            cursor = int(cursor)
+            limit = min(int(request.query_params.get('limit', config['PAGE_SIZE'])), config['MAX_PAGE_SIZE'])
+        except ValueError:
+            return Response({'detail': 'cursor and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'detail': 'limit must be at least 1.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if cursor < outbox.pruned_through():
+            return Response({
+                'detail': 'Events after this cursor were pruned. Read ?cursor=latest, '
+                          'reload the catalog from the book list, then continue from that cursor.',
+            }, status=status.HTTP_410_GONE)
+
+        events = outbox.visible(ChangeEvent.objects.filter(id__gt=cursor))
+        if request.query_params.get('model'):
+            events = events.filter(model=request.query_params['model'])
+        events = list(events.order_by('id')[:limit + 1])
+        has_more = len(events) > limit
+        events = events[:limit]
+        return Response({
+            'results': self.get_serializer(events, many=True).data,
+            'next_cursor': str(events[-1].id if events else cursor),
+            'has_more': has_more,
+        })
@@ -0,0 +1,153 @@
+"""
+Content-Security-Policy headers, compiled once at startup.
+
+A policy maps directives to lists of sources. DEFAULT applies to every path,
+and PATHS refines it for URL prefixes. A prefix policy inherits every
+directive of the nearest shorter prefix (or DEFAULT) and replaces the ones it
+names. A directive set to None is dropped, and an empty list gives a bare
+directive such as `sandbox`. Prefixes match whole path segments, so
+'/media/' covers '/media/avatars/x.png' but not '/mediakit/'.
+
+CSPMiddleware builds the header strings for every prefix when it is created
+and keeps them in a trie keyed by path segment. A request costs one walk down
+the trie and one header assignment.
+
+The source "'nonce'" stands for a fresh nonce per request. Templates get it
+as `csp_nonce` (from the `nonce` context processor):
+
+    <script nonce="{{ csp_nonce }}">...</script>
+
+The nonce is only generated if something reads it. A response whose request
+never produced one gets the policy without the nonce source, which is also
+precomputed.
+
+REPORT_ONLY sends Content-Security-Policy-Report-Only instead, so a new
+policy can be tried out without blocking anything. REPORT_URI adds a
+`report-uri` directive to every policy.
+
+Settings (all optional), e.g.:
+
+    CSP = {
+        'DEFAULT': {'default-src': ["'self'"], 'script-src': ["'self'", "'nonce'"]},
+        'PATHS': {'/media/': {'default-src': ["'none'"], 'sandbox': []}},
+        'REPORT_ONLY': False,
+        'REPORT_URI': None,
+    }
+"""
+import secrets
+
+from django.conf import settings
+
+DEFAULTS = {
+    'DEFAULT': {'default-src': ["'self'"]},
+    'PATHS': {},
+    'REPORT_ONLY': False,
+    'REPORT_URI': None,
+}
+
+NONCE = "'nonce'"
+HEADER = 'Content-Security-Policy'
+REPORT_ONLY_HEADER = 'Content-Security-Policy-Report-Only'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CSP', {})}
+
+
+def _segments(path):
+    return [part for part in path.split('/') if part]
+
+
+class Nonce:
+    """A per-request nonce, generated the first time it is rendered."""
+
+    __slots__ = ('_value',)
+
+    def __init__(self):
+        self._value = None
+
+    @property
+    def used(self):
+        return self._value is not None
+
+    def __str__(self):
+        if self._value is None:
+            self._value = secrets.token_urlsafe(16)
+        return self._value
+
+
+class Policy:
+    """One compiled policy: its header with and without the nonce source."""
+
+    __slots__ = ('directives', 'header', 'before_nonce', 'after_nonce')
+
+    def __init__(self, directives, report_uri=None):
+        self.directives = directives
+        if report_uri:
+            directives = {**directives, 'report-uri': [report_uri]}
+        self.header = self.render(directives, nonce=None)
+        marker = '\0'
+        with_nonce = self.render(directives, nonce=marker)
+        if marker in with_nonce:
+            self.before_nonce, self.after_nonce = with_nonce.split(marker, 1)
+        else:
+            self.before_nonce = self.after_nonce = None
+
+    @staticmethod
+    def render(directives, nonce):
+        parts = []
+        for name, sources in directives.items():
+            if sources is None:
+                continue
+            values = []
+            for source in sources:
+                if source == NONCE:
+                    if nonce is None:
+                        continue
+                    source = f"'nonce-{nonce}'"
+                values.append(source)
+            if sources and not values:
+                # Every source was the nonce; an empty source list would
+                # allow nothing, which is what a policy without it means.
+                values = ["'none'"]
+            parts.append(' '.join([name, *values]))
+        return '; '.join(parts)
+
+    def value(self, nonce):
+        if self.before_nonce is not None and nonce is not None and nonce.used:
+            return f'{self.before_nonce}{nonce}{self.after_nonce}'
+        return self.header
+
+
+class PolicyTrie:
+    """Longest-prefix lookup of compiled policies by path segment."""
+
+    def __init__(self, default, paths=(), report_uri=None):
+        self.root = [Policy(dict(default), report_uri), {}]
+        # Shorter prefixes first, so each one can inherit from its parent.
+        for prefix, directives in sorted(paths.items(), key=lambda item: len(_segments(item[0]))):
+            node = self.root
+            inherited = node[0]
+            for segment in _segments(prefix):
+                node = node[1].setdefault(segment, [None, {}])
+                inherited = node[0] or inherited
+            node[0] = Policy({**inherited.directives, **directives}, report_uri)
+
+    def lookup(self, path):
+        node = self.root
+        policy = node[0]
+        if not node[1]:
+            return policy
+        for segment in path.split('/'):
+            if not segment:
+                continue
+            node = node[1].get(segment)
+            if node is None:
+                break
+            policy = node[0] or policy
+        return policy
+
+
+def nonce(request):
+    """Context processor exposing the request's CSP nonce as `csp_nonce`."""
+    return {'csp_nonce': getattr(request, 'csp_nonce', '')}
@@ -1,11 +1,23 @@
-class SimpleCSPMiddleware:
+from .csp import HEADER, REPORT_ONLY_HEADER, Nonce, PolicyTrie, get_config
+
+
+class CSPMiddleware:
     """
-    Minimal CSP – allows only same-origin assets. Extend as needed.
+    Adds the Content-Security-Policy configured in settings.CSP (see csp.py).
+    Policies are compiled when the middleware is created.
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        config = get_config()
+        self.policies = PolicyTrie(config['DEFAULT'], config['PATHS'], config['REPORT_URI'])
+        self.header = REPORT_ONLY_HEADER if config['REPORT_ONLY'] else HEADER
 
     def __call__(self, request):
+        nonce = request.csp_nonce = Nonce()
         resp = self.get_response(request)
-        resp.headers["Content-Security-Policy"] = "default-src 'self'"
-        return resp
\ No newline at end of file
+        resp.headers[self.header] = self.policies.lookup(request.path_info).value(nonce)
+        return resp
+
+
+# The original name, kept for settings that still refer to it.
+SimpleCSPMiddleware = CSPMiddleware
@@ -48,9 +48,22 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = "bookshelf.CustomUser"
 
+# ModelBackend with permission sets cached across requests (bookshelf.auth_backends),
+# which also loads the user's UserProfile with the user for role checks.
+# Sessions logged in with an earlier backend are moved to it by migration
+# relationship_app 0003.
+AUTHENTICATION_BACKENDS = ["relationship_app.auth_backends.RoleBackend"]
+
+# Where the permission cache lives. The default cache is per process; use a
+# shared cache when running several processes.
+PERMISSION_CACHE = {
+    "CACHE_ALIAS": "default",
+    "TIMEOUT": 3600,
+}
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "LibraryProject.middleware.SimpleCSPMiddleware",
+    "LibraryProject.middleware.CSPMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -72,6 +85,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "LibraryProject.csp.nonce",
             ],
         },
     },
@@ -79,13 +93,32 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "LibraryProject.wsgi.application"
 
+# Content-Security-Policy (LibraryProject.csp). "'nonce'" stands for the
+# per-request nonce templates use as {{ csp_nonce }}. Uploaded media may not
+# run anything. REPORT_ONLY reports violations instead of blocking them.
+CSP = {
+    "DEFAULT": {
+        "default-src": ["'self'"],
+        "script-src": ["'self'", "'nonce'"],
+    },
+    "PATHS": {
+        "/media/": {"default-src": ["'none'"], "script-src": None, "sandbox": []},
+    },
+    "REPORT_ONLY": False,
+    "REPORT_URI": None,
+}
+
 
 # Database
 # Use SQLite for development
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -107,6 +140,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (relationship_app.hashers): PBKDF2 at the iteration count
+# found by `manage.py calibrate_hasher` for TIME_BUDGET seconds per hash,
+# never below MIN_ITERATIONS. Hashes with another count are upgraded at
+# login.
+PASSWORD_HASHERS = [
+    "relationship_app.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_HASHING = {
+    "ITERATIONS": None,
+    "MIN_ITERATIONS": 600000,
+    "TIME_BUDGET": 0.25,
+}
+
+
 # Internationalization
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
@@ -121,6 +173,22 @@ STATICFILES_DIRS = [BASE_DIR / "static"]  # optional, if you have a static folde
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Profile photo variants (bookshelf.avatars). SYNC processes uploads inline
+# instead of in the worker pool.
+AVATAR_PROCESSING = {
+    "WORKERS": 2,
+    "SYNC": False,
+}
+
+# Admin changelists (bookshelf.changelist): tables over ESTIMATE_ABOVE rows
+# show the database's row estimate, filtered lists count up to COUNT_LIMIT
+# rows, and filter choices are cached for CACHE_TIMEOUT seconds.
+ADMIN_CHANGELIST = {
+    "ESTIMATE_ABOVE": 100000,
+    "COUNT_LIMIT": 100000,
+    "CACHE_TIMEOUT": 300,
+}
+
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
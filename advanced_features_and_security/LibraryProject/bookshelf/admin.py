@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from .changelist import CachedValuesListFilter, FastChangeListMixin
 from .models import CustomUser, Book
 
 
@@ -21,8 +22,8 @@ admin.site.register(CustomUser, CustomUserAdmin)
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ("id", "title", "author", "publication_year")
     search_fields = ("title", "author")
-    list_filter = ("publication_year",)
+    list_filter = (("publication_year", CachedValuesListFilter),)
     ordering = ("title",)
\ No newline at end of file
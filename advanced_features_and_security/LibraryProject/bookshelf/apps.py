@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookshelfConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookshelf"
+
+    def ready(self):
+        # imports signals so the profile photo, permission cache and search index receivers register
+        import bookshelf.signals  # noqa
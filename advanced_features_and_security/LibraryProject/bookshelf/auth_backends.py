@@ -0,0 +1,95 @@
+"""
+Permission checks that skip the database on repeat requests.
+
+ModelBackend loads a user's permission set with two joined queries, once per
+request, the first time `has_perm` is called. CachedPermissionBackend keeps
+that set in the Django cache instead. The cache key holds two version
+numbers:
+
+- the user's own version, bumped when the user's groups or direct
+  permissions change;
+- a global version, bumped when a group's permissions change, or when a
+  Group or Permission is saved or deleted.
+
+The receivers in bookshelf.signals bump these versions, so a change applies
+from the next request on. Entries that are no longer current are never read
+again and expire after TIMEOUT.
+
+Each process has its own local-memory cache, so a version bumped in one
+process is not seen by the others. With more than one process, point
+CACHE_ALIAS at a shared cache (Redis or Memcached).
+
+Settings (all optional), e.g.:
+
+    PERMISSION_CACHE = {
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': 3600,
+    }
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60,
+}
+
+GLOBAL_VERSION_KEY = 'perms:version'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'PERMISSION_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def user_version_key(user_id):
+    return f'perms:version:user:{user_id}'
+
+
+def _new_version():
+    # Unique rather than incremented, so a version key that was evicted and
+    # recreated cannot bring back entries cached under its old value.
+    return time.time_ns()
+
+
+def bump_global_version():
+    get_cache().set(GLOBAL_VERSION_KEY, _new_version(), None)
+
+
+def bump_user_versions(user_ids):
+    get_cache().set_many({user_version_key(pk): _new_version() for pk in user_ids}, None)
+
+
+def _versions(cache, user_id):
+    keys = [GLOBAL_VERSION_KEY, user_version_key(user_id)]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions[keys[0]], versions[keys[1]]
+
+
+class CachedPermissionBackend(ModelBackend):
+    """ModelBackend whose permission sets live in the cache between requests."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            cache = get_cache()
+            global_version, user_version = _versions(cache, user_obj.pk)
+            # Superusers get every permission, so their flag is part of the key.
+            key = f'perms:{user_obj.pk}:{int(user_obj.is_superuser)}:{global_version}:{user_version}'
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, get_config()['TIMEOUT'])
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
@@ -0,0 +1,119 @@
+"""
+Admin changelists that stay fast on large tables.
+
+A stock changelist runs a COUNT(*) of the filtered rows and another of the
+whole table, and each plain list_filter runs a SELECT DISTINCT over its
+column. All of these read every row of a big table on every page view.
+FastChangeListMixin replaces them:
+
+- EstimatedCountPaginator counts an unfiltered table from the database's
+  statistics once it has more than ESTIMATE_ABOVE rows, and stops counting
+  a filtered one at COUNT_LIMIT rows. Without statistics (SQLite before
+  ANALYZE) every table gets the capped count. The full count next to the
+  search box is turned off.
+- CachedValuesListFilter is AllValuesFieldListFilter with its distinct
+  values kept in the cache for CACHE_TIMEOUT seconds. New values show up
+  once that has passed.
+
+Cached filter choices are shared by every user, so the ModelAdmin's
+get_queryset() must not depend on the request. Pages past COUNT_LIMIT rows
+of a filtered list cannot be reached; narrow the filter.
+
+Settings (all optional), e.g.:
+
+    ADMIN_CHANGELIST = {
+        'ESTIMATE_ABOVE': 100000,
+        'COUNT_LIMIT': 100000,
+        'CACHE_TIMEOUT': 300,
+    }
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+DEFAULTS = {
+    'ESTIMATE_ABOVE': 100000,
+    'COUNT_LIMIT': 100000,
+    'CACHE_TIMEOUT': 300,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'ADMIN_CHANGELIST', {})}
+
+
+def cache_key(*parts):
+    return 'changelist:' + hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def estimate_count(model, using):
+    """
+    Rows in `model`'s table according to the database statistics, or None
+    when there are none (e.g. SQLite before ANALYZE) or the backend is not
+    supported.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute(
+                    'SELECT table_rows FROM information_schema.tables '
+                    'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+                )
+            elif connection.vendor == 'sqlite':
+                # sqlite_stat1 only exists once ANALYZE has run; its `stat`
+                # column starts with the number of rows.
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for tables that were never vacuumed or analyzed.
+    return count if count >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count is estimated for big tables and capped for filtered ones."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        config = get_config()
+        if not queryset.query.where and not queryset.query.distinct:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > config['ESTIMATE_ABOVE']:
+                return estimate
+        # The count stops at COUNT_LIMIT rows; further pages are not reachable.
+        return queryset.order_by()[:config['COUNT_LIMIT']].count()
+
+
+class CachedValuesListFilter(admin.AllValuesFieldListFilter):
+    """AllValuesFieldListFilter whose distinct values are cached."""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        key = cache_key('values', model._meta.label, field_path)
+        choices = self.lookup_choices
+        self.lookup_choices = cache.get_or_set(key, lambda: list(choices), get_config()['CACHE_TIMEOUT'])
+
+
+class FastChangeListMixin:
+    """ModelAdmin mixin: estimated and capped counts."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
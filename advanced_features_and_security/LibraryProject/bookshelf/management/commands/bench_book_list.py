@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.shortcuts import render
+from django.test import RequestFactory
+
+from bookshelf import views
+from bookshelf.models import Book, CustomUser
+
+
+def render_all(request):
+    # What book_list did: the whole table in one page.
+    return render(request, 'bookshelf/book_list.html', {'books': Book.objects.all()})
+
+
+class Command(BaseCommand):
+    help = "Measure time to first byte and peak memory of book_list as the table grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        # The user and books only exist for the duration of the benchmark.
+        with transaction.atomic():
+            user = CustomUser.objects.create_user('bench', email='bench@example.com', password='bench-pass-123')
+            user.user_permissions.add(Permission.objects.get(codename='view_book', content_type__app_label='bookshelf'))
+            cases = {
+                'one page (before)': (render_all, {}),
+                'paginated': (views.book_list, {}),
+                'streamed': (views.book_list, {'stream': '1'}),
+            }
+            self.stdout.write(f'{"books":>8}  {"mode":<20}{"first byte ms":>14}{"total ms":>10}{"peak KiB":>10}')
+            total = 0
+            for size in options['sizes']:
+                Book.objects.bulk_create(
+                    [Book(title=f'Book {n:07d}', author=f'Author {n % 500}', publication_year=2000)
+                     for n in range(total, size)],
+                    batch_size=1000,
+                )
+                total = size
+                for mode, (view, params) in cases.items():
+                    request = factory.get('/bookshelf/books/', params)
+                    request.user = user
+                    first, elapsed, peak = self.measure(view, request)
+                    self.stdout.write(f'{size:>8}  {mode:<20}{first:>14.1f}{elapsed:>10.1f}{peak / 1024:>10.0f}')
+            transaction.set_rollback(True)
+
+    def measure(self, view, request):
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = view(request)
+        chunks = iter(response.streaming_content if response.streaming else [response.content])
+        next(chunks)
+        first = time.perf_counter() - start
+        for _ in chunks:
+            pass
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return first * 1e3, elapsed * 1e3, peak
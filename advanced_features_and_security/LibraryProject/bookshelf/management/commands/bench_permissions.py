@@ -0,0 +1,54 @@
+import copy
+import time
+
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from bookshelf import auth_backends, views
+from bookshelf.models import CustomUser
+
+BACKENDS = {
+    'ModelBackend': 'django.contrib.auth.backends.ModelBackend',
+    'CachedPermissionBackend': 'bookshelf.auth_backends.CachedPermissionBackend',
+}
+
+
+class Command(BaseCommand):
+    help = "Measure authorization overhead per request of a permission_required view."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per backend.')
+
+    def handle(self, *args, **options):
+        # The user and group only exist for the duration of the benchmark.
+        with transaction.atomic():
+            user = CustomUser.objects.create_user('bench', email='bench@example.com', password='bench-pass-123')
+            group = Group.objects.create(name='bench readers')
+            group.permissions.add(Permission.objects.get(codename='can_view', content_type__app_label='bookshelf'))
+            user.groups.add(group)
+
+            self.stdout.write(f'{"backend":<26}{"us/request":>12}{"queries/request":>18}')
+            for name, path in BACKENDS.items():
+                with override_settings(AUTHENTICATION_BACKENDS=[path]):
+                    auth_backends.bump_user_versions([user.pk])
+                    micros, queries = self.run(user, options['requests'])
+                self.stdout.write(f'{name:<26}{micros:>12.1f}{queries:>18.2f}')
+            transaction.set_rollback(True)
+
+    def run(self, user, count):
+        factory = RequestFactory()
+        elapsed, queries = 0.0, 0
+        for _ in range(count):
+            request = factory.get('/bookshelf/list/')
+            # A fresh user object per request, as AuthenticationMiddleware loads it.
+            request.user = copy.copy(user)
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = views.list_books_secure(request)
+                elapsed += time.perf_counter() - start
+            assert response.status_code == 200, response.status_code
+            queries += len(captured)
+        return elapsed / count * 1e6, queries / count
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from bookshelf import search
+from bookshelf.models import Book
+
+SYLLABLES = "ka lo mi ren tor sa vel dun ar is el mor tha quin bra ost wen gal fir dor".split()
+NAMES = "austen tolstoy morrison achebe murakami atwood orwell woolf borges dickens".split()
+
+
+def vocabulary(rng, size=4000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = "Compare full-text search with icontains over a synthetic book table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=50000, help='Synthetic books to search.')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query.')
+
+    def handle(self, *args, **options):
+        if not search.available():
+            self.stdout.write("No full-text index on this database; nothing to compare.")
+            return
+        rng = random.Random(0)
+        words = vocabulary(rng)
+        titles = [rng.sample(words, 3) for _ in range(options['books'])]
+        # Two words from one title, so that query has hits.
+        word, other = next(title for title in titles if len(title[0]) >= 6)[:2]
+        queries = {
+            "word": word,
+            "two words": f"{word} {other}",
+            "prefix": word[:4],
+            "author": "atwood",
+            # Two letters swapped, which icontains cannot find.
+            "typo": word[:2] + word[3] + word[2] + word[4:],
+        }
+        # The books only exist for the duration of the benchmark.
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                [
+                    Book(
+                        title=" ".join(title).title(),
+                        author=f"{rng.choice(NAMES).title()} {rng.randrange(1000)}",
+                        publication_year=rng.randrange(1800, 2025),
+                    )
+                    for title in titles
+                ],
+                batch_size=1000,
+            )
+            search.rebuild()
+
+            self.stdout.write(f'{"query":<38}{"icontains ms":>14}{"hits":>8}{"fts ms":>10}{"hits":>8}')
+            for label, query in queries.items():
+                scan_ms, scan_hits = self.time(lambda: self.icontains(query), options['repeat'])
+                fts_ms, fts_hits = self.time(lambda: search.search_ids(query), options['repeat'])
+                label = f'{label} ({query})'
+                self.stdout.write(f'{label:<38}{scan_ms:>14.2f}{scan_hits:>8}{fts_ms:>10.2f}{fts_hits:>8}')
+            transaction.set_rollback(True)
+
+    def icontains(self, query):
+        # What book_search did: a scan of every row, here over both columns.
+        filters = Q()
+        for word in query.split():
+            filters &= Q(title__icontains=word) | Q(author__icontains=word)
+        return list(Book.objects.filter(filters).values_list('pk', flat=True)[:search.get_config()['MAX_RESULTS']])
+
+    def time(self, func, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            hits = len(func())
+        return (time.perf_counter() - start) / repeat * 1e3, hits
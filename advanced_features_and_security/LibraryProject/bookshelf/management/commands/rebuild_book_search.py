@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from bookshelf import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of books (after bulk writes that send no signals)."
+
+    def handle(self, *args, **options):
+        if not search.available():
+            self.stdout.write("No full-text index on this database; search uses icontains filters.")
+            return
+        self.stdout.write(f"Indexed {search.rebuild()} books.")
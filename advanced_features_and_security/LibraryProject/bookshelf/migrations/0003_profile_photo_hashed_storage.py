@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-19 09:41
+
+import bookshelf.avatars
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookshelf", "0002_alter_book_options"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customuser",
+            name="profile_photo",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=bookshelf.avatars.get_avatar_storage,
+                upload_to="profiles/",
+            ),
+        ),
+    ]
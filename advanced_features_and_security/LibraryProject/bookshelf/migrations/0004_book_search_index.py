@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-19 10:22
+
+from django.db import migrations
+
+from bookshelf import search
+
+
+def create_index(apps, schema_editor):
+    search.create_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookshelf", "0003_profile_photo_hashed_storage"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-19 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookshelf", "0004_book_search_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="publication_year",
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="title",
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+    ]
@@ -2,14 +2,16 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from .avatars import avatar_url, get_avatar_storage
+
 
 # -----------------------------
 # Book model 
 # -----------------------------
 class Book(models.Model):
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, db_index=True)
     author = models.CharField(max_length=100)
-    publication_year = models.IntegerField()
+    publication_year = models.IntegerField(db_index=True)
 
     def __str__(self) -> str:
         return f"{self.title} by {self.author} ({self.publication_year})"
@@ -64,10 +66,16 @@ class CustomUserManager(BaseUserManager):
 # -----------------------------
 class CustomUser(AbstractUser):
     date_of_birth = models.DateField(null=True, blank=True)
-    profile_photo = models.ImageField(upload_to="profiles/", null=True, blank=True)
+    profile_photo = models.ImageField(
+        upload_to="profiles/", storage=get_avatar_storage, null=True, blank=True
+    )
 
     # Tell Django to use our custom manager
     objects = CustomUserManager()
 
     def __str__(self) -> str:
-        return self.username
\ No newline at end of file
+        return self.username
+
+    def avatar_url(self, size: str = "medium", fmt: str = "webp"):
+        """URL of a resized profile photo variant (see bookshelf.avatars)."""
+        return avatar_url(self.profile_photo, size, fmt)
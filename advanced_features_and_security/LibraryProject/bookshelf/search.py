@@ -0,0 +1,229 @@
+"""
+Full-text search over Book title and author.
+
+On SQLite the books are indexed in an FTS5 table, bookshelf_book_fts, whose
+rowid is the book's id. Migration 0004 creates and fills it, and the
+receivers in bookshelf.signals keep it current as books are saved and
+deleted. Bulk writes (bulk_create, QuerySet.update) send no signals; run
+`manage.py rebuild_book_search` after them.
+
+A query is split into words, and a book must match every word in its title
+or author. The last word also matches as a prefix, so results show up while
+a word is still being typed. A word that matches nothing in the index is
+replaced by the indexed words closest to it (one edit for words of 4 to 7
+letters, two from 8 on, same first letter). Results are ranked by BM25, with
+title matches weighted above author matches.
+
+Other databases, or an SQLite build without FTS5, fall back to `icontains`
+filters, one per word.
+
+Settings (all optional), e.g.:
+
+    BOOK_SEARCH = {
+        'PAGE_SIZE': 20,
+        'MAX_RESULTS': 1000,
+        'MAX_CORRECTIONS': 5,   # per misspelled word
+    }
+"""
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.models import Q
+
+from .models import Book
+
+DEFAULTS = {
+    'PAGE_SIZE': 20,
+    'MAX_RESULTS': 1000,
+    'MAX_CORRECTIONS': 5,
+}
+
+TABLE = 'bookshelf_book_fts'
+VOCAB_TABLE = 'bookshelf_book_fts_vocab'
+# Column weights for bm25(): title, author.
+WEIGHTS = (10.0, 5.0)
+
+_word_re = re.compile(r'[^\W_]+')
+_available = {}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BOOK_SEARCH', {})}
+
+
+def create_index(schema_editor):
+    """Create and fill the FTS5 tables; does nothing where FTS5 is missing."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+            f"title, author, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except OperationalError:  # no FTS5 in this SQLite build
+        return
+    schema_editor.execute(f"CREATE VIRTUAL TABLE {VOCAB_TABLE} USING fts5vocab({TABLE}, 'row')")
+    schema_editor.execute(f'INSERT INTO {TABLE} (rowid, title, author) SELECT id, title, author FROM bookshelf_book')
+
+
+def drop_index(schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {VOCAB_TABLE}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+def available():
+    """Whether this database has the FTS5 index."""
+    key = connection.settings_dict['NAME']
+    if key not in _available:
+        _available[key] = connection.vendor == 'sqlite' and TABLE in connection.introspection.table_names()
+    return _available[key]
+
+
+def index_book(book):
+    if available():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {TABLE} (rowid, title, author) VALUES (%s, %s, %s)',
+                [book.pk, book.title, book.author],
+            )
+
+
+def unindex_book(book_id):
+    if available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [book_id])
+
+
+def rebuild():
+    """Reindex every book; returns how many were indexed."""
+    if not available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(f'INSERT INTO {TABLE} (rowid, title, author) SELECT id, title, author FROM bookshelf_book')
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {TABLE}')
+        return cursor.fetchone()[0]
+
+
+def words(query):
+    """Lowercased words of `query`, with accents removed as the index does."""
+    folded = unicodedata.normalize('NFKD', query.lower())
+    return _word_re.findall(''.join(c for c in folded if not unicodedata.combining(c)))
+
+
+def max_distance(word):
+    return 0 if len(word) < 4 else 1 if len(word) < 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (adjacent swaps count as one edit),
+    or limit + 1 once it exceeds `limit`. Only cells within `limit` of the
+    diagonal are computed.
+    """
+    n, m = len(a), len(b)
+    over = limit + 1
+    if abs(n - m) > limit:
+        return over
+    before = None
+    previous = [j if j <= limit else over for j in range(m + 1)]
+    for i in range(1, n + 1):
+        current = [over] * (m + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - limit), min(m, i + limit) + 1):
+            value = previous[j - 1] + (ai != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1] and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            current[j] = value if value < over else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        before, previous = previous, current
+    return previous[m]
+
+
+def _known(cursor, word, prefix):
+    if prefix:
+        cursor.execute(f'SELECT 1 FROM {VOCAB_TABLE} WHERE term >= %s AND term < %s LIMIT 1', [word, word + '\uffff'])
+    else:
+        cursor.execute(f'SELECT 1 FROM {VOCAB_TABLE} WHERE term = %s', [word])
+    return cursor.fetchone() is not None
+
+
+def corrections(cursor, word, prefix, limit):
+    """The indexed words (or prefixes) closest to `word`, most common first."""
+    distance = max_distance(word)
+    if not distance:
+        return []
+    cursor.execute(
+        f'SELECT term, doc FROM {VOCAB_TABLE} WHERE term >= %s AND term < %s AND length(term) >= %s'
+        + ('' if prefix else ' AND length(term) <= %s'),
+        [word[0], word[0] + '\uffff', len(word) - distance] + ([] if prefix else [len(word) + distance]),
+    )
+    found, distances = {}, {}
+    for term, docs in cursor.fetchall():
+        candidate = term[:len(word)] if prefix else term
+        if candidate not in distances:
+            distances[candidate] = edit_distance(word, candidate, distance)
+        if distances[candidate] <= distance:
+            # A prefix shared by several terms counts the documents of all of them.
+            d, count = found.get(candidate, (distances[candidate], 0))
+            found[candidate] = (d, count - docs)
+    return sorted(found, key=found.get)[:limit]
+
+
+def match_expression(cursor, query):
+    """The FTS5 MATCH expression for `query`, or None if nothing could match."""
+    terms = words(query)
+    if not terms:
+        return None
+    limit = get_config()['MAX_CORRECTIONS']
+    parts = []
+    for i, word in enumerate(terms):
+        prefix = i == len(terms) - 1
+        options = [word] if _known(cursor, word, prefix) else corrections(cursor, word, prefix, limit)
+        if not options:
+            return None
+        star = '*' if prefix else ''
+        parts.append('(' + ' OR '.join(f'"{option}"{star}' for option in options) + ')')
+    return ' AND '.join(parts)
+
+
+def search_ids(query):
+    """Ids of the books matching `query`, best first, at most MAX_RESULTS."""
+    max_results = get_config()['MAX_RESULTS']
+    if not available():
+        filters = Q()
+        for word in query.split():
+            filters &= Q(title__icontains=word) | Q(author__icontains=word)
+        if not filters:
+            return []
+        return list(Book.objects.filter(filters).order_by('title', 'pk').values_list('pk', flat=True)[:max_results])
+
+    with connection.cursor() as cursor:
+        expression = match_expression(cursor, query)
+        if expression is None:
+            return []
+        cursor.execute(
+            f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY bm25({TABLE}, %s, %s) LIMIT %s',
+            [expression, *WEIGHTS, max_results],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def books_for(ids):
+    """The books with `ids`, in that order; ids deleted since are skipped."""
+    books = Book.objects.in_bulk(ids)
+    return [books[pk] for pk in ids if pk in books]
@@ -0,0 +1,62 @@
+# advanced_features_and_security/LibraryProject/bookshelf/signals.py
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import auth_backends, avatars, search
+from .models import Book, CustomUser
+
+
+@receiver(pre_save, sender=CustomUser)
+def note_new_profile_photo(sender, instance, **kwargs):
+    photo = instance.profile_photo
+    instance._new_profile_photo = bool(photo) and not photo._committed
+
+
+@receiver(post_save, sender=CustomUser)
+def process_profile_photo(sender, instance, **kwargs):
+    if instance.__dict__.pop("_new_profile_photo", False):
+        name = instance.profile_photo.name
+        transaction.on_commit(lambda: avatars.schedule_variants(name))
+
+
+# Permission cache versions (bookshelf.auth_backends). Bumped on commit, so a
+# request cannot cache the old permissions under the new version.
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == 'post_clear':
+        # group.user_set.clear() / permission.user_set.clear(): members are gone already
+        transaction.on_commit(auth_backends.bump_global_version)
+        return
+    else:
+        user_ids = list(pk_set)
+    transaction.on_commit(lambda: auth_backends.bump_user_versions(user_ids))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def group_permissions_changed(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        transaction.on_commit(auth_backends.bump_global_version)
+
+
+# Full-text index (bookshelf.search), written in the same transaction as the book.
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    search.index_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.unindex_book(instance.pk)
@@ -0,0 +1,49 @@
+"""
+Streamed rendering of long lists.
+
+stream_template() renders the page template once, with `streaming` set and
+`stream_rows` holding a marker where the rows go. It sends everything before
+the marker straight away. The rows template then renders chunk_size rows at
+a time, and the rest of the page follows the last chunk. The first byte does
+not wait for the list, and with rows from queryset.iterator() memory holds
+one chunk, however long the list is.
+
+The page template includes the same rows template when it is not streaming:
+
+    <ul>
+      {% if streaming %}{{ stream_rows }}{% else %}{% include "app/rows.html" %}{% endif %}
+    </ul>
+
+The rows template loops over `rows_name` and has its `{% empty %}` text. A
+stream with no rows at all renders it once with an empty list.
+"""
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.utils.safestring import mark_safe
+
+MARKER = '<!-- stream rows -->'
+
+
+def stream_template(request, template_name, rows_template_name, context, rows, rows_name, chunk_size=200):
+    page = loader.render_to_string(
+        template_name, {**context, 'streaming': True, 'stream_rows': mark_safe(MARKER)}, request
+    )
+    head, _, tail = page.partition(MARKER)
+    rows_template = loader.get_template(rows_template_name)
+
+    def render(chunk):
+        return rows_template.render({**context, rows_name: chunk})
+
+    def content():
+        yield head
+        chunk, sent = [], False
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield render(chunk)
+                chunk, sent = [], True
+        if chunk or not sent:
+            yield render(chunk)
+        yield tail
+
+    return StreamingHttpResponse(content(), content_type='text/html; charset=utf-8')
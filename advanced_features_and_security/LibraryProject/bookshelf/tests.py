@@ -1,3 +1,269 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.template import RequestContext, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from LibraryProject.csp import PolicyTrie
+from LibraryProject.middleware import CSPMiddleware
+
+from . import avatars, search
+from .changelist import EstimatedCountPaginator
+from .models import Book, CustomUser
+
+
+def make_upload(name="me.png"):
+    out = BytesIO()
+    Image.new("RGB", (640, 480), "green").save(out, "PNG")
+    return SimpleUploadedFile(name, out.getvalue(), content_type="image/png")
+
+
+class ProfilePhotoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, AVATAR_PROCESSING={"SYNC": True})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def create_user(self, username, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CustomUser.objects.create_user(
+                username, email=f"{username}@example.com", password="pass12345",
+                profile_photo=make_upload(**kwargs),
+            )
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.create_user("alice")
+        second = self.create_user("bob", name="copy.png")
+        self.assertEqual(first.profile_photo.name, second.profile_photo.name)
+
+    def test_variants_are_generated(self):
+        user = self.create_user("alice")
+        for size, pixels in avatars.VARIANT_SIZES.items():
+            name = avatars.variant_name(user.profile_photo.name, size, "jpg")
+            with user.profile_photo.storage.open(name) as fh:
+                self.assertEqual(Image.open(fh).size, (pixels, pixels))
+        self.assertTrue(user.avatar_url("large", "jpg").endswith("_256.jpg"))
+
+    def test_avatar_url_reads_ready_mark_not_storage(self):
+        user = self.create_user("alice")
+        with mock.patch.object(type(user.profile_photo.storage), "exists") as exists:
+            self.assertTrue(user.avatar_url().endswith("_128.webp"))
+        exists.assert_not_called()
+
+
+class PermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user("reader", email="reader@example.com", password="pass12345")
+        self.group = Group.objects.create(name="readers")
+        self.can_view = Permission.objects.get(codename="can_view", content_type__app_label="bookshelf")
+
+    def fresh_user(self):
+        # A new object per check, like a new request.
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def change(self, func, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            func(*args)
+
+    def test_repeat_checks_skip_permission_queries(self):
+        self.change(self.group.permissions.add, self.can_view)
+        self.change(self.user.groups.add, self.group)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("bookshelf.can_view"))
+            self.assertFalse(user.has_perm("bookshelf.can_edit"))
+
+    def test_group_membership_change_is_seen(self):
+        self.change(self.group.permissions.add, self.can_view)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.change(self.group.user_set.add, self.user)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.change(self.user.groups.remove, self.group)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+
+    def test_group_permission_change_is_seen(self):
+        self.change(self.user.groups.add, self.group)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.change(self.group.permissions.add, self.can_view)
+        self.assertTrue(self.fresh_user().has_perm("bookshelf.can_view"))
+        self.change(self.group.delete)
+        self.assertFalse(self.fresh_user().has_perm("bookshelf.can_view"))
+
+    def test_direct_permission_guards_view(self):
+        self.client.force_login(self.user)
+        url = reverse("list_books_secure")
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+        self.change(self.user.user_permissions.add, self.can_view)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+
+
+@override_settings(CSP={
+    "DEFAULT": {"default-src": ["'self'"], "script-src": ["'self'", "'nonce'"]},
+    "PATHS": {"/media/": {"default-src": ["'none'"], "script-src": None, "sandbox": []}},
+})
+class CSPTests(SimpleTestCase):
+    def get(self, path, body=""):
+        def view(request):
+            return HttpResponse(Template(body).render(RequestContext(request)))
+        return CSPMiddleware(view)(RequestFactory().get(path))
+
+    def test_nonce_only_when_rendered(self):
+        response = self.get("/bookshelf/list/")
+        self.assertEqual(response["Content-Security-Policy"], "default-src 'self'; script-src 'self'")
+
+        response = self.get("/bookshelf/list/", "{{ csp_nonce }}")
+        nonce = response.content.decode()
+        self.assertTrue(nonce)
+        self.assertEqual(
+            response["Content-Security-Policy"], f"default-src 'self'; script-src 'self' 'nonce-{nonce}'"
+        )
+        self.assertNotEqual(self.get("/", "{{ csp_nonce }}").content.decode(), nonce)
+
+    def test_prefix_policy(self):
+        self.assertEqual(self.get("/media/avatars/a.png")["Content-Security-Policy"], "default-src 'none'; sandbox")
+        self.assertEqual(self.get("/mediakit/")["Content-Security-Policy"], "default-src 'self'; script-src 'self'")
+
+    @override_settings(CSP={"REPORT_ONLY": True, "REPORT_URI": "/csp-report/"})
+    def test_report_only(self):
+        response = self.get("/")
+        self.assertNotIn("Content-Security-Policy", response)
+        self.assertEqual(
+            response["Content-Security-Policy-Report-Only"], "default-src 'self'; report-uri /csp-report/"
+        )
+
+    def test_nested_prefixes_inherit(self):
+        trie = PolicyTrie(
+            {"default-src": ["'self'"]},
+            {
+                "/a/b/": {"img-src": ["data:"]},
+                "/a/": {"script-src": ["'nonce'"]},
+            },
+        )
+        self.assertEqual(trie.lookup("/a/b/c").header, "default-src 'self'; script-src 'none'; img-src data:")
+        self.assertEqual(trie.lookup("/a/x").header, "default-src 'self'; script-src 'none'")
+        self.assertEqual(trie.lookup("/b/").header, "default-src 'self'")
+
+
+@override_settings(BOOK_SEARCH={"PAGE_SIZE": 2})
+class BookSearchTests(TestCase):
+    def setUp(self):
+        self.dune = Book.objects.create(title="Dune", author="Frank Herbert", publication_year=1965)
+        self.emma = Book.objects.create(title="Emma", author="Jane Austen", publication_year=1815)
+        self.persuasion = Book.objects.create(title="Persuasion", author="Jane Austen", publication_year=1817)
+        self.cafe = Book.objects.create(title="Café Society", author="Élodie Martin", publication_year=2001)
+
+    def test_words_prefixes_and_accents(self):
+        self.assertTrue(search.available())
+        self.assertEqual(search.search_ids("dune"), [self.dune.pk])
+        self.assertCountEqual(search.search_ids("jane aus"), [self.emma.pk, self.persuasion.pk])
+        self.assertEqual(search.search_ids("austen persu"), [self.persuasion.pk])
+        self.assertEqual(search.search_ids("cafe elodie"), [self.cafe.pk])
+        self.assertEqual(search.search_ids("dune austen"), [])
+
+    def test_typos(self):
+        self.assertEqual(search.search_ids("persuaison"), [self.persuasion.pk])
+        self.assertCountEqual(search.search_ids("austne"), [self.emma.pk, self.persuasion.pk])
+        self.assertEqual(search.search_ids("xyzzy"), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.dune.title = "Children of Dune"
+        self.dune.save()
+        self.assertEqual(search.search_ids("children"), [self.dune.pk])
+        self.emma.delete()
+        self.assertEqual(search.search_ids("emma"), [])
+        Book.objects.filter(pk=self.persuasion.pk).update(title="Sense and Sensibility")
+        self.assertEqual(search.search_ids("sensibility"), [])
+        self.assertEqual(search.rebuild(), 3)
+        self.assertEqual(search.search_ids("sensibility"), [self.persuasion.pk])
+
+    def test_view_pages_results(self):
+        user = CustomUser.objects.create_user("reader", email="reader@example.com", password="pass12345")
+        user.user_permissions.add(Permission.objects.get(codename="view_book", content_type__app_label="bookshelf"))
+        self.client.force_login(user)
+        url = reverse("book_search")
+        for extra in range(3):
+            Book.objects.create(title=f"Jane Austen Reader {extra}", author="Editors", publication_year=2000)
+
+        first = self.client.get(url, {"q": "austen"}, secure=True)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.context["results"]), 2)
+        self.assertEqual(first.context["page"].paginator.count, 5)
+        last = self.client.get(url, {"q": "austen", "page": 3}, secure=True)
+        self.assertEqual(len(last.context["results"]), 1)
+        self.assertContains(self.client.post(url, {"q": "dune"}, secure=True), "Dune by Frank Herbert")
+
+
+class BookListTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user("reader", email="reader@example.com", password="pass12345")
+        user.user_permissions.add(Permission.objects.get(codename="view_book", content_type__app_label="bookshelf"))
+        self.client.force_login(user)
+        self.url = reverse("book_list")
+
+    def test_pages(self):
+        Book.objects.bulk_create(
+            [Book(title=f"Book {n:03d}", author="Anon", publication_year=2000) for n in range(120)]
+        )
+        response = self.client.get(self.url, {"page": 3}, secure=True)
+        self.assertEqual([b.title for b in response.context["books"]], [f"Book {n:03d}" for n in range(100, 120)])
+        self.assertContains(response, "Page 3 of 3")
+
+    def test_stream(self):
+        Book.objects.bulk_create(
+            [Book(title=f"Book {n:03d}", author="Anon", publication_year=2000) for n in range(450)]
+        )
+        response = self.client.get(self.url, {"stream": "1"}, secure=True)
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 5)  # head, 200 + 200 + 50 rows, tail
+        content = b"".join(chunks).decode()
+        self.assertEqual(content.count("<li>"), 450)
+        self.assertTrue(content.rstrip().endswith("</html>"))
+
+    def test_empty_stream(self):
+        response = self.client.get(self.url, {"stream": "1"}, secure=True)
+        self.assertIn("No books yet.", b"".join(response.streaming_content).decode())
+
+
+class BookAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = CustomUser.objects.create_superuser("admin", "admin@example.com", "pass12345")
+        self.client.force_login(admin)
+        for year in (1813, 1965, 1965):
+            Book.objects.create(title=f"Book {year}", author="Someone", publication_year=year)
+        self.url = reverse("admin:bookshelf_book_changelist")
+
+    @override_settings(ADMIN_CHANGELIST={"ESTIMATE_ABOVE": 1, "COUNT_LIMIT": 1})
+    def test_counts_are_estimated_or_capped(self):
+        Book.objects.filter(publication_year=1813).delete()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(EstimatedCountPaginator(Book.objects.order_by("pk"), 10).count, 2)
+        self.assertEqual(EstimatedCountPaginator(Book.objects.filter(publication_year=1965).order_by("pk"), 10).count, 1)
+
+    def test_year_choices_are_cached(self):
+        self.client.get(self.url, secure=True)
+        Book.objects.create(title="Book 2001", author="Someone", publication_year=2001)
+
+        # Session, user, row estimate, capped count, page; no SELECT DISTINCT.
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url, secure=True)
+        self.assertContains(response, "?publication_year=1965")
+        self.assertNotContains(response, "?publication_year=2001")
+        self.assertContains(response, "Book 2001")
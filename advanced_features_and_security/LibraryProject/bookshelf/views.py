@@ -1,9 +1,12 @@
 # advanced_features_and_security/LibraryProject/bookshelf/views.py
 from django.http import HttpResponse
 from django.contrib.auth.decorators import permission_required
+from django.core.paginator import Paginator
 from django.shortcuts import render  
 from .models import Book      
-from .forms import ExampleForm
+from .forms import ExampleForm, SearchForm
+from . import search
+from .streaming import stream_template
 
 @permission_required('bookshelf.can_create', raise_exception=True)
 def create_book(request):
@@ -21,29 +24,35 @@ def delete_book(request, pk):
 def list_books_secure(request):
     return HttpResponse("List books (requires bookshelf.can_view)")
 
+BOOKS_PER_PAGE = 50
+
 @permission_required('bookshelf.view_book', raise_exception=True)
 def book_list(request):
-    books = Book.objects.all()
-    return render(request, 'bookshelf/book_list.html', {'books': books})
+    books = Book.objects.order_by('title', 'pk')
+    if request.GET.get('stream'):
+        # The whole list, sent while it is read; see bookshelf.streaming.
+        return stream_template(
+            request, 'bookshelf/book_list.html', 'bookshelf/book_rows.html', {},
+            books.iterator(chunk_size=1000), 'books',
+        )
+    page = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'bookshelf/book_list.html', {'books': page.object_list, 'page': page})
 
 @permission_required("bookshelf.view_book", raise_exception=True)
 def book_search(request):
-    results = None
-    if request.method == "POST":
-        form = SearchForm(request.POST)
-        if form.is_valid():
-            q = form.cleaned_data["q"]
-            if q:
-                results = Book.objects.filter(title__icontains=q)
-            else:
-                results = Book.objects.none()
-    else:
-        form = SearchForm()
+    # Searches are GET requests so result pages can be linked; POST still works.
+    form = SearchForm(request.POST if request.method == "POST" else request.GET or None)
+    results = page = None
+    if form.is_valid():
+        q = form.cleaned_data["q"]
+        ids = search.search_ids(q) if q else []
+        page = Paginator(ids, search.get_config()["PAGE_SIZE"]).get_page(request.GET.get("page"))
+        results = search.books_for(page.object_list)
 
     return render(
         request,
         "bookshelf/form_example.html",
-        {"form": form, "results": results},
+        {"form": form, "results": results, "page": page},
     )
 
 
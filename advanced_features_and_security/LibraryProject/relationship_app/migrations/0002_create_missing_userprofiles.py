@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-19 10:18
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # The post_save handler was registered for auth.User, which is swapped out
+    # for bookshelf.CustomUser here, so existing users never got a profile.
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserProfile = apps.get_model("relationship_app", "UserProfile")
+    db = schema_editor.connection.alias
+    missing = User.objects.using(db).filter(profile__isnull=True).values_list("pk", flat=True)
+    UserProfile.objects.using(db).bulk_create(
+        [UserProfile(user_id=pk) for pk in missing.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("relationship_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,12 @@
+from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.contrib.auth.models import User
 from .models import UserProfile
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    # ensure profile exists; then save
-    UserProfile.objects.get_or_create(user=instance)
-    instance.userprofile.save()
\ No newline at end of file
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_profile(sender, instance, created, raw, **kwargs):
+    # Only new users need a profile; saving an existing user (every login
+    # updates last_login) no longer writes to the profile too.
+    # Fixtures (raw saves) bring their own profiles.
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
\ No newline at end of file
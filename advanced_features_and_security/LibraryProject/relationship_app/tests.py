@@ -1,3 +1,118 @@
-from django.test import TestCase
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as global_apps
+from django.contrib.auth import BACKEND_SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from . import views
+from .models import Author, Book, Library, UserProfile
+
+
+class RoleTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("member", email="member@example.com", password="pass12345")
+
+    def test_new_user_gets_profile(self):
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, "Member")
+
+    def test_saving_user_does_not_touch_profile(self):
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_role_comes_with_request_user(self):
+        self.client.force_login(self.user)
+        # Session and user (with its profile) are two queries; nothing is
+        # left for the role check itself.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("relationship_app:member_view"), secure=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_sessions_from_the_previous_backend_are_moved_to_role_backend(self):
+        self.client.force_login(self.user)
+        session = Session.objects.get()
+        data = session.get_decoded()
+        data[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+        session.session_data = SessionStore().encode(data)
+        session.save()
+
+        migration = import_module("relationship_app.migrations.0003_rewrite_session_backends")
+        migration.rewrite_session_backends(global_apps, mock.Mock(connection=connection))
+        self.assertEqual(self.client.get(reverse("relationship_app:member_view"), secure=True).status_code, 200)
+
+    def test_other_roles_are_refused(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("relationship_app:admin_view"), secure=True).status_code, 302)
+        UserProfile.objects.filter(user=self.user).update(role="Admin")
+        self.assertEqual(self.client.get(reverse("relationship_app:admin_view"), secure=True).status_code, 200)
+
+    def test_user_without_profile_is_refused(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("relationship_app:member_view"), secure=True).status_code, 302)
+
+
+class ListBooksTests(TestCase):
+    # bookshelf's "books/" route comes first in the URLconf, so the view is
+    # called directly.
+    def setUp(self):
+        author = Author.objects.create(name="Anon")
+        Book.objects.bulk_create([Book(title=f"Book {n:03d}", author=author) for n in range(60)])
+        self.factory = RequestFactory()
+
+    def test_page_reads_authors_with_books(self):
+        # The count, then one page of books with their authors.
+        with self.assertNumQueries(2):
+            response = views.list_books(self.factory.get("/books/", {"page": 2}))
+        self.assertEqual(response.content.decode().count("<li>"), 10)
+        self.assertContains(response, "Book 059 by Anon")
+
+    def test_stream(self):
+        response = views.list_books(self.factory.get("/books/", {"stream": "1"}))
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.count("<li>"), 60)
+        self.assertIn("Book 000 by Anon", content)
+
+
+class LibraryDetailTests(TestCase):
+    def setUp(self):
+        authors = Author.objects.bulk_create([Author(name=f"Author {n}") for n in range(5)])
+        books = Book.objects.bulk_create(
+            [Book(title=f"Book {n:03d}", author=authors[n % 5]) for n in range(120)]
+        )
+        self.library = Library.objects.create(name="Central")
+        self.library.books.set(books)
+        self.url = reverse("relationship_app:library_detail", args=[self.library.pk])
+
+    def test_fixed_number_of_queries(self):
+        # Library, count of its books, page of books with their authors.
+        for page in (1, 3):
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url, {"page": page}, secure=True)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["books"]), 20)
+        self.assertContains(response, "Book 119 by Author 4")
+        self.assertContains(response, "Page 3 of 3")
+
+    def test_invalid_pages(self):
+        for page in (0, 4, "x"):
+            self.assertEqual(self.client.get(self.url, {"page": page}, secure=True).status_code, 404)
+
+
+@override_settings(PASSWORD_HASHING={"ITERATIONS": 1000, "MIN_ITERATIONS": 1000})
+class PasswordHashingTests(TestCase):
+    def test_login_upgrades_hash_to_current_iterations(self):
+        user = get_user_model().objects.create_user("reader", email="reader@example.com", password="pass12345")
+
+        with self.settings(PASSWORD_HASHING={"ITERATIONS": 2000, "MIN_ITERATIONS": 1000}):
+            response = self.client.post(
+                reverse("relationship_app:login"), {"username": "reader", "password": "pass12345"}, secure=True
+            )
+
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
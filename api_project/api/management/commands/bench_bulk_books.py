@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import BookViewSet
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of the bulk book endpoints with one request per book."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Books created, updated and deleted per run.')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.factory = APIRequestFactory()
+        # An unsaved user is enough for IsAuthenticated; throttles would only
+        # measure themselves, so the views run without them.
+        self.user = User(username='bench')
+        view = lambda actions: BookViewSet.as_view(actions, throttle_classes=[])  # noqa: E731
+        self.single = {
+            'create': view({'post': 'create'}),
+            'update': view({'patch': 'partial_update'}),
+            'delete': view({'delete': 'destroy'}),
+        }
+        self.bulk = view({'post': 'bulk_create', 'patch': 'bulk_partial_update', 'delete': 'bulk_destroy'})
+
+        self.stdout.write(f'{"operation":<10}{"single rows/s":>16}{"bulk rows/s":>16}{"speedup":>10}')
+        single, bulk = self.run_single(rows), self.run_bulk(rows)
+        for operation in ('create', 'update', 'delete'):
+            single_rate, bulk_rate = rows / single[operation], rows / bulk[operation]
+            self.stdout.write(
+                f'{operation:<10}{single_rate:>16,.0f}{bulk_rate:>16,.0f}{bulk_rate / single_rate:>9.1f}x'
+            )
+
+    def request(self, view, method, data, **kwargs):
+        request = getattr(self.factory, method)('/books_all/', data, format='json')
+        force_authenticate(request, user=self.user)
+        response = view(request, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method.upper()} failed with {response.status_code}: {response.data}')
+        return response
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def run_single(self, rows):
+        ids = []
+        timings = {}
+        timings['create'] = self.timed(lambda: ids.extend(
+            self.request(self.single['create'], 'post', {'title': f'Bench {i}', 'author': 'Bench'}).data['id']
+            for i in range(rows)
+        ))
+        timings['update'] = self.timed(lambda: [
+            self.request(self.single['update'], 'patch', {'title': f'Bench {pk}!'}, pk=pk) for pk in ids
+        ])
+        timings['delete'] = self.timed(lambda: [
+            self.request(self.single['delete'], 'delete', None, pk=pk) for pk in ids
+        ])
+        return timings
+
+    def run_bulk(self, rows):
+        ids = []
+        timings = {}
+        size = BookViewSet.bulk_max_items
+        chunks = lambda items: [items[i:i + size] for i in range(0, len(items), size)]  # noqa: E731
+
+        books = [{'title': f'Bench {i}', 'author': 'Bench'} for i in range(rows)]
+        timings['create'] = self.timed(lambda: [
+            ids.extend(item['id'] for item in self.request(self.bulk, 'post', part).data)
+            for part in chunks(books)
+        ])
+        timings['update'] = self.timed(lambda: [
+            self.request(self.bulk, 'patch', [{'id': pk, 'title': f'Bench {pk}!'} for pk in part])
+            for part in chunks(ids)
+        ])
+        timings['delete'] = self.timed(lambda: [self.request(self.bulk, 'delete', part) for part in chunks(ids)])
+        return timings
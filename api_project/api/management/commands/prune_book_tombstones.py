@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api import sync
+
+
+class Command(BaseCommand):
+    help = "Delete book tombstones older than BOOK_SYNC['TOMBSTONE_DAYS']; older sync tokens start over."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep tombstones from the last DAYS days.')
+
+    def handle(self, *args, **options):
+        deleted = sync.prune_tombstones(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} book tombstones'))
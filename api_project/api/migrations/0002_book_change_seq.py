@@ -0,0 +1,64 @@
+# Generated by Django 4.2.23 on 2026-10-19 10:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def number_existing_books(apps, schema_editor):
+    # Existing books get distinct change numbers so a first sync sees them all.
+    Book = apps.get_model("api", "Book")
+    ChangeSequence = apps.get_model("api", "ChangeSequence")
+    Book.objects.update(change_seq=models.F("id"))
+    last = Book.objects.aggregate(last=models.Max("id"))["last"] or 0
+    ChangeSequence.objects.create(name="book", value=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeSequence",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+                ("pruned_through", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="change_seq",
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="BookTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("book_id", models.BigIntegerField()),
+                ("change_seq", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["change_seq", "book_id"], name="booktombstone_seq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(number_existing_books, migrations.RunPython.noop),
+    ]
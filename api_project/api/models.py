@@ -1,8 +1,103 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+class ChangeSequence(models.Model):
+    """
+    A named counter handing out monotonic change numbers (see api.sync).
+
+    allocate() must run inside the transaction that makes the change: the
+    counter row stays locked until that transaction ends, so numbers become
+    visible to readers in the order they were handed out.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    # Tombstones at or below this number were pruned; older sync tokens must start over.
+    pruned_through = models.BigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, name, count=1):
+        """Reserve `count` consecutive numbers and return the first."""
+        using = router.db_for_write(cls)
+        with transaction.atomic(using=using, savepoint=False):
+            if not cls.objects.using(using).filter(name=name).update(value=F('value') + count):
+                cls.objects.using(using).get_or_create(name=name)
+                cls.objects.using(using).filter(name=name).update(value=F('value') + count)
+            value = cls.objects.using(using).filter(name=name).values_list('value', flat=True).get()
+        return value - count + 1
+
+class BookTombstone(models.Model):
+    """Left behind by a deleted Book so sync clients learn about the delete."""
+    book_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['change_seq', 'book_id'], name='booktombstone_seq')]
+
+    @classmethod
+    def record(cls, ids):
+        if not ids:
+            return
+        first = ChangeSequence.allocate(Book.SEQUENCE, len(ids))
+        cls.objects.bulk_create([cls(book_id=pk, change_seq=first + i) for i, pk in enumerate(ids)])
+
+class BookQuerySet(models.QuerySet):
+    """Keeps Book.change_seq and the tombstones current on bulk writes too."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=router.db_for_write(Book), savepoint=False):
+            if objs:
+                first = ChangeSequence.allocate(Book.SEQUENCE, len(objs))
+                for i, book in enumerate(objs):
+                    book.change_seq = first + i
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=router.db_for_write(Book), savepoint=False):
+            if objs:
+                first = ChangeSequence.allocate(Book.SEQUENCE, len(objs))
+                for i, book in enumerate(objs):
+                    book.change_seq = first + i
+            return super().bulk_update(objs, {*fields, 'change_seq'}, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if 'change_seq' in kwargs:  # bulk_update() numbered the rows already
+            return super().update(**kwargs)
+        # Every row gets the same number; sync tokens break ties by id.
+        with transaction.atomic(using=router.db_for_write(Book), savepoint=False):
+            return super().update(change_seq=ChangeSequence.allocate(Book.SEQUENCE), **kwargs)
+
+    def delete(self):
+        with transaction.atomic(using=router.db_for_write(Book), savepoint=False):
+            BookTombstone.record(list(self.order_by('pk').values_list('pk', flat=True)))
+            return super().delete()
 
 class Book(models.Model):
+    SEQUENCE = 'book'
+
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
+    # Number of the last change to this row, from ChangeSequence; drives /books/sync/.
+    change_seq = models.BigIntegerField(default=0, db_index=True, editable=False)
+
+    objects = BookQuerySet.as_manager()
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Book, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            self.change_seq = ChangeSequence.allocate(self.SEQUENCE)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(Book, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            BookTombstone.record([self.pk])
+            return super().delete(*args, **kwargs)
@@ -0,0 +1,89 @@
+"""
+Pagination for the book endpoints.
+
+IdCursorPagination is the default: it pages on `id`, so every page is an
+index range scan no matter how deep the client goes, and the response
+carries no total. Clients that want a total ask for it with
+`?count=estimate` (read from the database's planner statistics, with no
+table scan) or `?count=exact` (a COUNT(*)).
+"""
+from django.conf import settings
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+
+
+def estimate_count(queryset):
+    """
+    Row count of the table behind an unfiltered `queryset`, read from the
+    database statistics, or None when there are none (the table was never
+    analyzed, the queryset is filtered, or the backend is not supported).
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+            )
+        elif connection.vendor == 'sqlite':
+            # sqlite_stat1 only exists once ANALYZE has run; its `stat` column
+            # starts with the number of rows.
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if row is None or row[0] is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for tables that were never vacuumed or analyzed.
+    return count if count >= 0 else None
+
+
+class IdCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'API_PAGINATION', {}).get('MAX_PAGE_SIZE', 1000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count, self.count_is_estimate = self.get_count(queryset, request.query_params.get(self.count_query_param))
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset, mode):
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate, True
+            mode = 'exact'
+        if mode == 'exact':
+            return queryset.count(), False
+        return None, False
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data['count'] = self.count
+            response.data['count_is_estimate'] = self.count_is_estimate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count'] = {
+            'type': 'integer',
+            'description': f'Only present with ?{self.count_query_param}=estimate or exact.',
+        }
+        schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return schema
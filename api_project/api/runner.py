@@ -0,0 +1,24 @@
+"""
+Test runner for the API.
+
+Rate limits are off for the whole run: every throttle scope in
+REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] is set to None, which lets each
+request through without touching the throttle store. Tests of rate limiting
+set the rates they need with override_settings.
+"""
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        rest_framework = getattr(settings, 'REST_FRAMEWORK', {})
+        rates = dict.fromkeys(rest_framework.get('DEFAULT_THROTTLE_RATES', {}))
+        self._unthrottled = override_settings(REST_FRAMEWORK={**rest_framework, 'DEFAULT_THROTTLE_RATES': rates})
+        self._unthrottled.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._unthrottled.disable()
+        super().teardown_test_environment(**kwargs)
@@ -1,7 +1,41 @@
 from rest_framework import serializers
 from .models import Book
 
+class BookListSerializer(serializers.ListSerializer):
+    """
+    Used for many=True. Writes go through bulk_create/bulk_update in chunks of
+    `batch_size` instead of one query per book. For updates, `instance` is the
+    list of books being changed and every item must carry its `id`.
+    """
+    batch_size = 500
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            self.child.instance = self._instances_by_id.get(data.get('id'))
+        return super().run_child_validation(data)
+
+    @property
+    def _instances_by_id(self):
+        if not hasattr(self, '_instance_map'):
+            self._instance_map = {book.pk: book for book in self.instance}
+        return self._instance_map
+
+    def create(self, validated_data):
+        books = [Book(**attrs) for attrs in validated_data]
+        return Book.objects.bulk_create(books, batch_size=self.batch_size)
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for book, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(book, attr, value)
+            fields.update(attrs)
+        if fields:
+            Book.objects.bulk_update(instances, sorted(fields), batch_size=self.batch_size)
+        return instances
+
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
\ No newline at end of file
+        fields = ['id', 'title', 'author']
+        list_serializer_class = BookListSerializer
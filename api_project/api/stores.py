@@ -0,0 +1,114 @@
+"""
+Key/value stores with per-key expiry, shared by throttling and idempotency.
+
+LocalMemoryStore keeps its data in this process. CacheStore uses a Django
+cache (e.g. Redis or Memcached) that several nodes share. Both implement the
+same interface; a custom store only needs the methods its user calls.
+"""
+import threading
+import time
+
+from django.core.cache import caches
+
+
+class LocalMemoryStore:
+    """Per-process store. Expired keys are swept every `sweep_every` writes."""
+
+    def __init__(self, sweep_every=10000):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._sweep_every = sweep_every
+
+    def _live(self, key, now):
+        entry = self._data.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    def _put(self, key, value, ttl, now):
+        self._data[key] = (value, now + ttl)
+        self._writes += 1
+        if self._writes >= self._sweep_every:
+            self._writes = 0
+            self._data = {k: v for k, v in self._data.items() if v[1] > now}
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._live(key, time.monotonic())
+            return default if value is None else value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._put(key, value, ttl, time.monotonic())
+
+    def add(self, key, value, ttl):
+        """Set `key` only if it is absent; return whether it was set."""
+        with self._lock:
+            now = time.monotonic()
+            if self._live(key, now) is not None:
+                return False
+            self._put(key, value, ttl, now)
+            return True
+
+    def incr(self, key, ttl):
+        with self._lock:
+            now = time.monotonic()
+            value = (self._live(key, now) or 0) + 1
+            self._put(key, value, ttl, now)
+            return value
+
+    def update(self, key, func, ttl):
+        """Atomically replace the value of `key` with func(old_value)[0]."""
+        with self._lock:
+            now = time.monotonic()
+            value, result = func(self._live(key, now))
+            self._put(key, value, ttl, now)
+            return result
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheStore:
+    """
+    Store backed by a Django cache shared between nodes. `add` and `incr` are
+    atomic on Redis and Memcached; `update` is a plain get/set, so two nodes
+    racing on the same key may both act on the old value.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def get(self, key, default=None):
+        return self.cache.get(key, default)
+
+    def set(self, key, value, ttl):
+        self.cache.set(key, value, ttl)
+
+    def add(self, key, value, ttl):
+        return self.cache.add(key, value, ttl)
+
+    def incr(self, key, ttl):
+        self.cache.add(key, 0, ttl)
+        try:
+            return self.cache.incr(key)
+        except ValueError:  # expired between add() and incr()
+            self.cache.set(key, 1, ttl)
+            return 1
+
+    def update(self, key, func, ttl):
+        value, result = func(self.cache.get(key))
+        self.cache.set(key, value, ttl)
+        return result
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
@@ -0,0 +1,123 @@
+"""
+Delta sync for the book list (/books/sync/).
+
+Every write to a Book stamps it with the next number from
+ChangeSequence('book'), and every delete leaves a BookTombstone numbered the
+same way (see api.models). A sync token is a signed (change_seq, id) position.
+A sync from a token returns the books changed and the ids deleted after that
+position, ordered by it, BOOK_SYNC['PAGE_SIZE'] at a time. A sync without a
+token lists every book and no deletes.
+
+Tombstones older than BOOK_SYNC['TOMBSTONE_DAYS'] are pruned by
+prune_book_tombstones. A token from before the pruned range cannot be
+answered with a delta. The sync then starts over with `reset: true`, and the
+client drops its local copy first.
+
+Tokens issued during a full listing also carry the change number the listing
+started at. Tombstones from before that number are for books the client never
+got, so pruning them does not expire the token, and a full listing larger
+than a page finishes even when old tombstones have been pruned.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Book, BookTombstone, ChangeSequence
+
+SALT = 'api.sync'
+
+DEFAULTS = {
+    'PAGE_SIZE': 1000,
+    'TOMBSTONE_DAYS': 90,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BOOK_SYNC', {})}
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def make_token(position, listing_start=0):
+    return signing.dumps([*position, listing_start], salt=SALT, compress=True)
+
+
+def read_token(token):
+    """Return (position, listing_start); listing_start is 0 for delta tokens."""
+    try:
+        seq, pk, *rest = signing.loads(token, salt=SALT)
+        return (int(seq), int(pk)), int(rest[0]) if rest else 0
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidToken('Invalid sync token.')
+
+
+def _sequence(field):
+    return ChangeSequence.objects.filter(name=Book.SEQUENCE).values_list(field, flat=True).first() or 0
+
+
+def pruned_through():
+    return _sequence('pruned_through')
+
+
+def after(position, seq_field, id_field):
+    seq, pk = position
+    return Q(**{f'{seq_field}__gt': seq}) | Q(**{seq_field: seq, f'{id_field}__gt': pk})
+
+
+def changes(token=None, limit=None):
+    """
+    Return (books, deleted_ids, next_token, has_more, reset) after `token`.
+
+    Books and tombstones are merged in (change_seq, id) order and cut at
+    `limit` together, so a page never skips a change of either kind.
+    """
+    limit = limit or get_config()['PAGE_SIZE']
+    position, listing_start, reset = (0, 0), 0, False
+    if token:
+        position, listing_start = read_token(token)
+        # A delta needs every tombstone after its position; a full listing
+        # only those after the number it started at.
+        if position != (0, 0) and max(position[0], listing_start) < pruned_through():
+            position, listing_start, reset = (0, 0), 0, True
+    if position == (0, 0):
+        listing_start = _sequence('value')
+
+    books = list(
+        Book.objects.filter(after(position, 'change_seq', 'id')).order_by('change_seq', 'id')[:limit + 1]
+    )
+    entries = [((book.change_seq, book.pk), book) for book in books]
+    if position != (0, 0):
+        tombstones = (
+            BookTombstone.objects.filter(after(position, 'change_seq', 'book_id'))
+            .order_by('change_seq', 'book_id')
+            .values_list('change_seq', 'book_id')[:limit + 1]
+        )
+        entries += [((seq, pk), None) for seq, pk in tombstones]
+        entries.sort(key=lambda entry: entry[0])
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if entries:
+        position = entries[-1][0]
+    changed = [book for _, book in entries if book is not None]
+    deleted = [pk for (_, pk), book in entries if book is None]
+    return changed, deleted, make_token(position, listing_start), has_more, reset
+
+
+def prune_tombstones(days=None):
+    """Delete tombstones older than `days`; return how many were deleted."""
+    days = get_config()['TOMBSTONE_DAYS'] if days is None else days
+    old = BookTombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days))
+    last = old.aggregate(last=Max('change_seq'))['last']
+    if last is None:
+        return 0
+    # Expire the tokens first, so none is answered with a delta that has a hole in it.
+    ChangeSequence.objects.get_or_create(name=Book.SEQUENCE)
+    ChangeSequence.objects.filter(name=Book.SEQUENCE, pruned_through__lt=last).update(pruned_through=last)
+    deleted, _ = BookTombstone.objects.filter(change_seq__lte=last).delete()
+    return deleted
@@ -1,3 +1,238 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import idempotency, sync, throttling
+from .models import Book, BookTombstone
+
+
+@override_settings(REST_FRAMEWORK={
+    'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework.authentication.TokenAuthentication'],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_THROTTLE_RATES': {'client': '2/min', 'burst': '100/min'},
+})
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        throttling.get_store().clear()
+        user = User.objects.create_user('reader', password='pass12345')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+
+    def test_viewset_list_is_throttled_per_token(self):
+        url = reverse('book_all-list')
+        responses = [self.client.get(url) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 429])
+        self.assertEqual(responses[0]['RateLimit-Limit'], '2')
+        self.assertEqual(responses[0]['RateLimit-Remaining'], '1')
+
+    def test_limit_is_shared_across_book_endpoints(self):
+        self.client.get(reverse('book-list'))
+        self.client.get(reverse('book_all-list'))
+        self.assertEqual(self.client.get(reverse('book-list')).status_code, 429)
+
+
+class BulkBookTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('editor', password='pass12345'))
+        self.url = reverse('book_all-bulk')
+
+    def test_bulk_create_uses_one_insert_per_chunk(self):
+        books = [{'title': f'Book {i}', 'author': 'Anon'} for i in range(20)]
+        # savepoint, reserve 20 change numbers (UPDATE + SELECT), INSERT, release
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, books, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Book.objects.count(), 20)
+        self.assertTrue(all(item['id'] for item in response.data))
+
+    def test_bulk_create_reports_invalid_items_and_writes_nothing(self):
+        books = [{'title': 'Fine', 'author': 'Anon'}, {'title': '', 'author': 'Anon'}]
+        response = self.client.post(self.url, books, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1])
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertFalse(Book.objects.exists())
+
+    def test_bulk_partial_update(self):
+        first, second = Book.objects.create(title='A', author='X'), Book.objects.create(title='B', author='Y')
+        response = self.client.patch(
+            self.url, [{'id': first.pk, 'title': 'A2'}, {'id': second.pk, 'author': 'Z'}], format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(Book.objects.order_by('pk').values_list('title', 'author')), [('A2', 'X'), ('B', 'Z')]
+        )
+
+    def test_bulk_partial_update_reports_unknown_ids(self):
+        book = Book.objects.create(title='A', author='X')
+        response = self.client.patch(
+            self.url, [{'id': book.pk, 'title': 'A2'}, {'id': 999, 'title': 'Nope'}, {'title': 'No id'}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2])
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'A')
+
+    def test_bulk_destroy(self):
+        books = [Book.objects.create(title=str(i), author='X') for i in range(3)]
+        response = self.client.delete(self.url, [books[0].pk, books[2].pk], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Book.objects.all()), [books[1]])
+
+        response = self.client.delete(self.url, [books[1].pk, books[0].pk], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], [{'index': 1, 'errors': {'id': ['Book not found.']}}])
+        self.assertTrue(Book.objects.exists())
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('reader', password='pass12345'))
+        Book.objects.bulk_create([Book(title=f'Book {i}', author='Anon') for i in range(25)])
+
+    def test_cursor_pages_cover_every_book_once(self):
+        url, titles = reverse('book-list') + '?page_size=10', []
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn('count', response.data)
+            titles += [book['title'] for book in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, [f'Book {i}' for i in range(25)])
+
+    @override_settings(API_PAGINATION={'MAX_PAGE_SIZE': 5})
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('book_all-list'), {'page_size': 500})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_estimated_count_uses_table_statistics(self):
+        url = reverse('book-list')
+        # Without statistics the estimate falls back to an exact count.
+        response = self.client.get(url, {'count': 'estimate'})
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (25, False))
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Book.objects.create(title='Not yet analyzed', author='Anon')
+        response = self.client.get(url, {'count': 'estimate'})
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (25, True))
+
+        response = self.client.get(url, {'count': 'exact'})
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (26, False))
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        idempotency.get_store().clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('editor', password='pass12345'))
+
+    def post(self, url, data, key):
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_create_is_replayed(self):
+        url, book = reverse('book_all-list'), {'title': 'Once', 'author': 'Anon'}
+        first = self.post(url, book, 'k1')
+        retry = self.post(url, book, 'k1')
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_retried_bulk_create_is_replayed(self):
+        url = reverse('book_all-bulk')
+        books = [{'title': f'Book {i}', 'author': 'Anon'} for i in range(3)]
+        self.post(url, books, 'batch-1')
+        self.assertEqual(self.post(url, books, 'batch-1').status_code, 201)
+        self.assertEqual(Book.objects.count(), 3)
+
+    def test_key_reused_for_different_body_is_rejected(self):
+        url = reverse('book_all-list')
+        self.post(url, {'title': 'One', 'author': 'Anon'}, 'k1')
+        self.assertEqual(self.post(url, {'title': 'Two', 'author': 'Anon'}, 'k1').status_code, 422)
+        self.assertEqual(Book.objects.count(), 1)
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('mobile', password='pass12345'))
+        self.url = reverse('book-sync')
+        self.books = Book.objects.bulk_create([Book(title=f'Book {i}', author='Anon') for i in range(5)])
+
+    def sync(self, token=None):
+        response = self.client.get(self.url, {'token': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_first_sync_lists_everything_then_only_changes(self):
+        first = self.sync()
+        self.assertEqual(len(first['books']), 5)
+        self.assertEqual((first['deleted'], first['has_more'], first['reset']), ([], False, False))
+
+        self.assertEqual(self.sync(first['token'])['books'], [])
+
+        self.books[1].title = 'Renamed'
+        self.books[1].save()
+        Book.objects.filter(pk=self.books[2].pk).delete()
+        Book.objects.create(title='New', author='Anon')
+        delta = self.sync(first['token'])
+        self.assertEqual([b['title'] for b in delta['books']], ['Renamed', 'New'])
+        self.assertEqual(delta['deleted'], [self.books[2].pk])
+
+    def test_bulk_writes_are_synced(self):
+        token = self.sync()['token']
+        self.client.patch(reverse('book_all-bulk'), [{'id': self.books[0].pk, 'title': 'Bulk'}], format='json')
+        self.client.delete(reverse('book_all-bulk'), [self.books[3].pk], format='json')
+        Book.objects.filter(pk=self.books[4].pk).update(author='Someone')
+        delta = self.sync(token)
+        self.assertEqual([b['id'] for b in delta['books']], [self.books[0].pk, self.books[4].pk])
+        self.assertEqual(delta['deleted'], [self.books[3].pk])
+
+    @override_settings(BOOK_SYNC={'PAGE_SIZE': 2})
+    def test_changes_come_in_pages(self):
+        token, ids = self.sync()['token'], [book.pk for book in self.books]
+        for book in self.books:
+            book.delete()
+        deleted, has_more = [], True
+        while has_more:
+            page = self.sync(token)
+            deleted += page['deleted']
+            token, has_more = page['token'], page['has_more']
+        self.assertEqual(deleted, ids)
+
+    def test_tampered_token_is_rejected(self):
+        token = self.sync()['token']
+        self.assertEqual(self.client.get(self.url, {'token': token[:-1] + 'x'}).status_code, 400)
+
+    def test_token_older_than_pruned_tombstones_resets(self):
+        token = self.sync()['token']
+        self.books[0].delete()
+        BookTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        self.assertEqual(sync.prune_tombstones(days=90), 1)
+        data = self.sync(token)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['books']), 4)
+
+    @override_settings(BOOK_SYNC={'PAGE_SIZE': 3})
+    def test_full_listing_after_prune_finishes(self):
+        Book.objects.bulk_create([Book(title=f'More {i}', author='Anon') for i in range(5)])
+        self.books[0].delete()
+        BookTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        self.assertEqual(sync.prune_tombstones(days=90), 1)
+
+        ids, token, has_more, pages = [], None, True, 0
+        while has_more and pages < 10:
+            page = self.sync(token)
+            self.assertFalse(page['reset'])
+            ids += [book['id'] for book in page['books']]
+            token, has_more, pages = page['token'], page['has_more'], pages + 1
+        self.assertEqual(sorted(ids), sorted(Book.objects.values_list('pk', flat=True)))
+        self.assertEqual(pages, 3)
@@ -0,0 +1,204 @@
+"""
+Rate limiting for the API.
+
+Throttles identify the client by API token, then user, then IP address, and
+keep their state in a store from api.stores: LocalMemoryStore for a single
+process, or CacheStore (any Django cache backend, e.g. Redis or Memcached) when
+several nodes must share one limit. On CacheStore, two nodes racing on one
+token bucket may let one extra request through. Both algorithms do a constant
+amount of work per check, independent of the request rate:
+
+* SlidingWindowThrottle approximates a true sliding window from two fixed
+  window counters, weighting the previous window by how much of it still
+  overlaps the sliding window.
+* TokenBucketThrottle refills its bucket continuously and allows bursts up
+  to the configured number of requests.
+
+RateLimitHeadersMiddleware copies the tightest limit seen while handling a
+request onto the response as RateLimit-Limit/-Remaining/-Reset headers.
+Rejected requests are logged and counted in `metrics`.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .stores import CacheStore, LocalMemoryStore
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+_stores = {}
+
+
+def get_store():
+    config = getattr(settings, 'RATE_LIMIT', {})
+    kind = config.get('STORE', 'local')
+    if kind not in _stores:
+        if kind == 'local':
+            _stores[kind] = LocalMemoryStore()
+        elif kind == 'cache':
+            _stores[kind] = CacheStore(config.get('CACHE_ALIAS', 'default'))
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT['STORE']: {kind!r}")
+    return _stores[kind]
+
+
+class RateLimitMetrics:
+    """In-process counters of throttle decisions, per scope."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = Counter()
+        self.rejected = Counter()
+
+    def record(self, scope, allowed):
+        with self._lock:
+            self.checked[scope] += 1
+            if not allowed:
+                self.rejected[scope] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'checked': dict(self.checked), 'rejected': dict(self.rejected)}
+
+
+metrics = RateLimitMetrics()
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Base class for the throttles below. Subclasses set `scope` (looked up in
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], e.g. '100/min') and implement
+    `check(key, num_requests, duration)` returning (allowed, remaining, reset).
+    """
+    scope = None
+    rate = None
+
+    def __init__(self):
+        if self.rate is None:
+            self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.store = get_store()
+        self._wait = None
+
+    @staticmethod
+    def parse_rate(rate):
+        if rate is None:
+            return None, None
+        num, period = rate.split('/')
+        return int(num), DURATIONS[period[0]]
+
+    def get_client_key(self, request):
+        token = getattr(request.auth, 'key', None)
+        if token:
+            return 'token:' + hashlib.sha256(token.encode()).hexdigest()[:32]
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+
+        key = f'rl:{self.scope}:{self.get_client_key(request)}'
+        allowed, remaining, reset = self.check(key, self.num_requests, self.duration)
+        self._record_headers(request, remaining, reset)
+        metrics.record(self.scope, allowed)
+        if not allowed:
+            self._wait = reset
+            logger.info('Rate limit %s exceeded by %s', self.scope, key)
+        return allowed
+
+    def _record_headers(self, request, remaining, reset):
+        # Keep the tightest limit when several throttles apply to one view.
+        django_request = getattr(request, '_request', request)
+        current = getattr(django_request, 'rate_limit', None)
+        if current is None or remaining < current['remaining']:
+            django_request.rate_limit = {
+                'limit': self.num_requests,
+                'remaining': remaining,
+                'reset': math.ceil(reset),
+            }
+
+    def wait(self):
+        return self._wait
+
+    def check(self, key, num_requests, duration):
+        raise NotImplementedError
+
+
+class SlidingWindowThrottle(RateLimitThrottle):
+    def check(self, key, num_requests, duration):
+        now = time.time()
+        window = int(now // duration)
+        elapsed = now - window * duration
+        overlap = (duration - elapsed) / duration
+
+        previous = self.store.get(f'{key}:{window - 1}', 0)
+        current = self.store.get(f'{key}:{window}', 0)
+        estimate = previous * overlap + current
+        if estimate + 1 > num_requests:
+            # Time until enough of the previous window has slid out of range,
+            # or until the next window if the current one alone is full.
+            wait = duration - elapsed
+            if previous and current < num_requests:
+                wait -= (num_requests - 1 - current) * duration / previous
+            return False, 0, max(wait, 0)
+
+        current = self.store.incr(f'{key}:{window}', ttl=2 * duration)
+        remaining = max(0, math.floor(num_requests - (previous * overlap + current)))
+        return True, remaining, duration - elapsed
+
+
+class TokenBucketThrottle(RateLimitThrottle):
+    def check(self, key, num_requests, duration):
+        refill_per_second = num_requests / duration
+        now = time.time()
+
+        def take(state):
+            tokens, updated = state or (num_requests, now)
+            tokens = min(num_requests, tokens + (now - updated) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            return (tokens, now), (allowed, tokens)
+
+        allowed, tokens = self.store.update(key, take, ttl=duration)
+        if not allowed:
+            return False, 0, (1 - tokens) / refill_per_second
+        return True, math.floor(tokens), (num_requests - tokens) / refill_per_second
+
+
+class ClientRateThrottle(SlidingWindowThrottle):
+    """Sustained request rate per client."""
+    scope = 'client'
+
+
+class BurstRateThrottle(TokenBucketThrottle):
+    """Short bursts per client on top of the sustained rate."""
+    scope = 'burst'
+
+
+class RateLimitHeadersMiddleware:
+    """Adds RateLimit-* headers for requests that went through a throttle."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        state = getattr(request, 'rate_limit', None)
+        if state is not None:
+            response.headers['RateLimit-Limit'] = str(state['limit'])
+            response.headers['RateLimit-Remaining'] = str(state['remaining'])
+            response.headers['RateLimit-Reset'] = str(state['reset'])
+        return response
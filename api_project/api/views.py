@@ -1,4 +1,10 @@
-from rest_framework import generics, viewsets, permissions
+from django.db import transaction
+from rest_framework import generics, viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from . import sync
+from .idempotency import idempotent
 from .models import Book
 from .serializers import BookSerializer
 
@@ -6,7 +12,110 @@ class BookList(generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
+class BookSync(generics.GenericAPIView):
+    # GET /books/sync/?token=...  ->  {"books": [...], "deleted": [ids], "token": ...,
+    #                                   "has_more": bool, "reset": bool}
+    # Without a token every book is listed. Keep calling with the returned
+    # token while has_more is true; on reset, drop the local copy first.
+    serializer_class = BookSerializer
+    pagination_class = None
+
+    def get(self, request):
+        try:
+            books, deleted, token, has_more, reset = sync.changes(request.query_params.get('token'))
+        except sync.InvalidToken as exc:
+            raise ValidationError({'token': [str(exc)]})
+        return Response({
+            'books': self.get_serializer(books, many=True).data,
+            'deleted': deleted,
+            'token': token,
+            'has_more': has_more,
+            'reset': reset,
+        })
+
 class BookViewSet(viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    # Bulk endpoints on /books_all/bulk/, all or nothing:
+    #   POST   [{"title": ..., "author": ...}, ...]   create
+    #   PATCH  [{"id": 1, "title": ...}, ...]         partial update
+    #   DELETE [1, 2, 3]                              destroy
+    # Invalid requests get 400 with {"errors": [{"index": i, "errors": {...}}]}
+    # listing only the items that failed.
+    bulk_max_items = 1000
+
+    def get_bulk_data(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError({'non_field_errors': [f'At most {self.bulk_max_items} items per request.']})
+        return request.data
+
+    def bulk_error_response(self, errors):
+        failed = [{'index': index, 'errors': error} for index, error in enumerate(errors) if error]
+        return Response({'errors': failed}, status=status.HTTP_400_BAD_REQUEST)
+
+    def get_bulk_books(self, ids, errors):
+        """Lock and return the books for `ids`, recording unknown and repeated ids in `errors`."""
+        books = self.get_queryset().select_for_update().in_bulk([pk for pk in ids if pk is not None])
+        seen = set()
+        for index, pk in enumerate(ids):
+            if errors[index]:
+                continue
+            if pk not in books:
+                errors[index] = {'id': ['Book not found.']}
+            elif pk in seen:
+                errors[index] = {'id': ['Duplicate id.']}
+            seen.add(pk)
+        return books
+
+    @staticmethod
+    def parse_id(value):
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        # Retries carrying the same Idempotency-Key get the first response back.
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk')
+    @idempotent
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=self.get_bulk_data(request), many=True)
+        if not serializer.is_valid():
+            return self.bulk_error_response(serializer.errors)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_partial_update(self, request):
+        data = self.get_bulk_data(request)
+        ids = [self.parse_id(item.get('id')) if isinstance(item, dict) else None for item in data]
+        errors = [{} if pk is not None else {'id': ['A book id is required.']} for pk in ids]
+
+        with transaction.atomic():
+            books = self.get_bulk_books(ids, errors)
+            if any(errors):
+                return self.bulk_error_response(errors)
+            serializer = self.get_serializer([books[pk] for pk in ids], data=data, many=True, partial=True)
+            if not serializer.is_valid():
+                return self.bulk_error_response(serializer.errors)
+            serializer.save()
+        return Response(serializer.data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        ids = [self.parse_id(item) for item in self.get_bulk_data(request)]
+        errors = [{} if pk is not None else {'id': ['A book id is required.']} for pk in ids]
+
+        with transaction.atomic():
+            self.get_bulk_books(ids, errors)
+            if any(errors):
+                return self.bulk_error_response(errors)
+            chunk = BookSerializer.Meta.list_serializer_class.batch_size
+            for start in range(0, len(ids), chunk):
+                self.get_queryset().filter(pk__in=ids[start:start + chunk]).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,181 @@
+"""
+Primary/replica database routing.
+
+Writes always go to the primary ('default'). Reads go to a replica listed in
+DATABASE_ROUTING['REPLICAS'] only while ReplicaRoutingMiddleware is handling
+a safe (GET/HEAD/OPTIONS) request from a client that is not pinned. Every
+other read goes to the primary: management commands and shells, unsafe
+requests, and reads inside a transaction on the primary. A request sticks
+to the replica it picked first, so it never mixes two replicas' lag.
+
+Read-your-writes: once a request writes, the rest of it reads from the
+primary. The client is then pinned to the primary for PIN_SECONDS (about
+the worst replication lag you expect). The pin is a cookie for browser
+sessions, plus a cache entry keyed by the Authorization header for API
+clients.
+
+Replicas get a `SELECT 1` at most every HEALTH_CHECK_INTERVAL seconds per
+process. A replica that fails is skipped for RETRY_AFTER seconds; with no
+healthy replica left, reads fall back to the primary.
+"""
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+PIN_COOKIE = 'db_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+DEFAULTS = {
+    'REPLICAS': [],
+    'PIN_SECONDS': 5,
+    'HEALTH_CHECK_INTERVAL': 5,
+    'RETRY_AFTER': 30,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'DATABASE_ROUTING', {})}
+
+
+class RequestState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.replica = None
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+class ReplicaHealth:
+    """Per-process cache of replica health, refreshed lazily."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}  # alias -> (healthy, monotonic time of next check)
+
+    def is_healthy(self, alias, config):
+        now = time.monotonic()
+        healthy, next_check = self._status.get(alias, (True, 0))
+        if now < next_check:
+            return healthy
+
+        healthy = self.check(alias)
+        interval = config['HEALTH_CHECK_INTERVAL'] if healthy else config['RETRY_AFTER']
+        with self._lock:
+            self._status[alias] = (healthy, now + interval)
+        if not healthy:
+            logger.warning('Replica %s failed its health check; reading from the primary instead', alias)
+        return healthy
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except DatabaseError:
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._status.clear()
+
+
+health = ReplicaHealth()
+
+
+def _in_primary_transaction():
+    return connections[PRIMARY].in_atomic_block
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Follow relations from the database the instance came from.
+            return instance._state.db
+
+        state = _state.get()
+        if state is None or not state.use_replica or _in_primary_transaction():
+            return PRIMARY
+        if state.replica is None:
+            config = get_config()
+            healthy = [alias for alias in config['REPLICAS'] if health.is_healthy(alias, config)]
+            state.replica = random.choice(healthy) if healthy else PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.use_replica = False
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *get_config()['REPLICAS']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas share the primary's schema.
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Decides per request whether reads may use a replica, and pins clients after writes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_config()
+        state = RequestState(
+            use_replica=bool(config['REPLICAS'])
+            and request.method in SAFE_METHODS
+            and not self.is_pinned(request)
+        )
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote:
+            self.pin(request, response, config)
+        return response
+
+    @staticmethod
+    def client_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return 'db-pin:' + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+    def is_pinned(self, request):
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        key = self.client_key(request)
+        return key is not None and cache.get(key) is not None
+
+    def pin(self, request, response, config):
+        seconds = config['PIN_SECONDS']
+        response.set_cookie(
+            PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax'
+        )
+        key = self.client_key(request)
+        if key is not None:
+            cache.set(key, 1, seconds)
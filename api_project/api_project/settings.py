@@ -44,12 +44,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api_project.db_routers.ReplicaRoutingMiddleware",
+    "api.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.throttling.RateLimitHeadersMiddleware",
 ]
 
 ROOT_URLCONF = "api_project.urls"
@@ -76,11 +79,38 @@ WSGI_APPLICATION = "api_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+    },
+    # Read replica (see api_project.db_routers). In development it is the primary's
+    # own file; point it at a real replica and list it in
+    # DATABASE_ROUTING["REPLICAS"] to send reads there.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"NAME": BASE_DIR / "test_replica.sqlite3"},
+    },
+}
+
+DATABASE_ROUTERS = ["api_project.db_routers.PrimaryReplicaRouter"]
+
+# Aliases that serve reads for safe requests; empty keeps everything on the
+# primary. Clients that just wrote keep reading from the primary for
+# PIN_SECONDS. Replicas are health checked every HEALTH_CHECK_INTERVAL seconds
+# and skipped for RETRY_AFTER seconds after a failure.
+DATABASE_ROUTING = {
+    "REPLICAS": [],
+    "PIN_SECONDS": 5,
+    "HEALTH_CHECK_INTERVAL": 5,
+    "RETRY_AFTER": 30,
 }
 
 
@@ -133,4 +163,61 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ClientRateThrottle',
+        'api.throttling.BurstRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'client': '2000/hour',  # sliding window, per token / user / IP
+        'burst': '120/min',     # token bucket
+    },
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+    # orjson-backed JSON first; MessagePack is only offered when msgpack is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'api.renderers.ContentNegotiation',
+}
+
+# Tests run with the rate limits off (api.runner); throttling tests set
+# their own rates.
+TEST_RUNNER = "api.runner.TestRunner"
+
+# /books/sync/ (api.sync): changes per response, and how long delete
+# tombstones are kept; older sync tokens start over with a full list.
+BOOK_SYNC = {
+    'PAGE_SIZE': 1000,
+    'TOMBSTONE_DAYS': 90,
+}
+
+# Idempotency-Key handling for create endpoints (api.idempotency). STORE is
+# 'local', 'cache' (CACHE_ALIAS, shared between nodes) or a dotted class path.
+IDEMPOTENCY = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
+    'TTL': 24 * 60 * 60,
+    'LOCK_TIMEOUT': 30,
+    'LOCK_WAIT': 10,
+}
+
+# Gzip/brotli for API responses of at least MIN_SIZE bytes (api.compression).
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+}
+
+# Clients may ask for up to MAX_PAGE_SIZE books per page with ?page_size=.
+API_PAGINATION = {
+    'MAX_PAGE_SIZE': 1000,
+}
+
+# Where throttle counters live: 'local' (per process) or 'cache' (the Django
+# cache named by CACHE_ALIAS, shared between nodes).
+RATE_LIMIT = {
+    'STORE': 'local',
+    'CACHE_ALIAS': 'default',
 }
@@ -77,10 +77,14 @@ WSGI_APPLICATION = "LibraryProject.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -104,6 +108,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (relationship_app.hashers): PBKDF2 at the iteration count
+# found by `manage.py calibrate_hasher` for TIME_BUDGET seconds per hash,
+# never below MIN_ITERATIONS. Hashes with another count are upgraded at
+# login.
+PASSWORD_HASHERS = [
+    "relationship_app.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_HASHING = {
+    "ITERATIONS": None,
+    "MIN_ITERATIONS": 600000,
+    "TIME_BUDGET": 0.25,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -126,5 +149,17 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-LOGIN_REDIRECT_URL = "list_books"    # where to land after login
-LOGOUT_REDIRECT_URL = "login"        # where to go after logout
+LOGIN_REDIRECT_URL = "relationship_app:list_books"    # where to land after login
+LOGOUT_REDIRECT_URL = "relationship_app:login"        # where to go after logout
+
+# RoleBackend loads the user's UserProfile along with the user, so role
+# checks (relationship_app.views.is_admin etc.) need no query of their own.
+# Sessions logged in with ModelBackend are moved to it by migration
+# relationship_app 0005.
+AUTHENTICATION_BACKENDS = ["relationship_app.auth_backends.RoleBackend"]
+
+# Memoized batched lookups in relationship_app.query_samples, per process.
+QUERY_MEMO = {
+    "MAX_ENTRIES": 10000,
+    "TIMEOUT": 300,
+}
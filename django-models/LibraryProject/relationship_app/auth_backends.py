@@ -0,0 +1,33 @@
+"""
+Authentication backend that loads the user's role with the user.
+
+AuthenticationMiddleware calls get_user() once per request to turn the
+session into request.user. RoleBackend adds the UserProfile to that query as
+a join, so the role checks in views (is_admin, is_librarian, is_member) read
+it from memory rather than running a second query on every guarded request.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+
+PROFILE = "userprofile"
+
+
+def get_role(user):
+    """The user's role, or None for anonymous users and users without a profile."""
+    try:
+        return getattr(user, PROFILE).role
+    except (AttributeError, ObjectDoesNotExist):
+        return None
+
+
+class RoleBackend(ModelBackend):
+    """ModelBackend whose users come with their UserProfile already loaded."""
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(PROFILE).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from relationship_app import hashers
+
+
+class Command(BaseCommand):
+    help = "Measure PBKDF2 on this host and print the iteration count for PASSWORD_HASHING['TIME_BUDGET']."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=float, default=None,
+                            help='Seconds one hash may take (default: TIME_BUDGET).')
+        parser.add_argument('--runs', type=int, default=3,
+                            help='Timings per measurement; the fastest is used.')
+
+    def handle(self, *args, **options):
+        config = hashers.get_config()
+        budget = options['budget'] or config['TIME_BUDGET']
+        count, seconds = hashers.calibrate(budget, runs=options['runs'])
+        current = hashers.current_iterations()
+        current_seconds = hashers.measure(current, options['runs'])
+
+        self.stdout.write(f'current: {current} iterations, {current_seconds * 1000:.0f} ms per hash')
+        self.stdout.write(f'budget:  {budget * 1000:.0f} ms -> {count} iterations, {seconds * 1000:.0f} ms per hash')
+        if count == config['MIN_ITERATIONS'] and seconds > budget:
+            self.stdout.write(self.style.WARNING(
+                f"MIN_ITERATIONS ({config['MIN_ITERATIONS']}) alone takes longer than the budget on this host."
+            ))
+        cores = os.cpu_count() or 1
+        self.stdout.write(f'logins per second on {cores} cores: about {cores / seconds:.0f}')
+        self.stdout.write(self.style.SUCCESS(f"Set PASSWORD_HASHING['ITERATIONS'] = {count}"))
+
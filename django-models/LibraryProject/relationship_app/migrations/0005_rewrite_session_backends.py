@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.db import migrations
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+OLD_BACKENDS = ("django.contrib.auth.backends.ModelBackend",)
+NEW_BACKEND = "relationship_app.auth_backends.RoleBackend"
+
+
+def rewrite_session_backends(apps, schema_editor):
+    # Django logs out a session whose backend is not in AUTHENTICATION_BACKENDS,
+    # so move sessions logged in before RoleBackend over to it.
+    Session = apps.get_model("sessions", "Session")
+    store = import_string(settings.SESSION_ENGINE + ".SessionStore")()
+    db = schema_editor.connection.alias
+    batch = []
+    for session in Session.objects.using(db).filter(expire_date__gt=timezone.now()).iterator():
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) in OLD_BACKENDS:
+            data[BACKEND_SESSION_KEY] = NEW_BACKEND
+            session.session_data = store.encode(data)
+            batch.append(session)
+        if len(batch) >= 1000:
+            Session.objects.using(db).bulk_update(batch, ["session_data"])
+            batch = []
+    Session.objects.using(db).bulk_update(batch, ["session_data"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sessions", "0001_initial"),
+        ("relationship_app", "0004_create_missing_userprofiles"),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite_session_backends, migrations.RunPython.noop),
+    ]
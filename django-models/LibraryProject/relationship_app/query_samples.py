@@ -1,5 +1,47 @@
+"""
+Relationship lookups by name.
+
+The first three functions look up one name with two queries each. The
+batched variants take any number of names and answer them with one query,
+returned as a dict keyed by name. Their results are memoized in this process
+(see QueryMemo), so a report that asks about the same authors and libraries
+again and again only queries for names it has not seen yet.
+
+Any save or delete of an Author, Book, Library or Librarian, and any change
+to a library's books, clears the memo (receivers in relationship_app.signals).
+Changes made by other processes are not seen; entries expire after TIMEOUT
+seconds to bound that. Memoized model instances are shared between callers
+and must not be modified.
+
+Settings (all optional), e.g.:
+
+    QUERY_MEMO = {
+        'MAX_ENTRIES': 10000,   # names per lookup kind; least recently used go first
+        'TIMEOUT': 300,
+    }
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+
 from relationship_app.models import Author, Book, Library, Librarian
 
+DEFAULTS = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 300,
+}
+
+# Names per query, well under SQLite's limit on query parameters.
+BATCH_SIZE = 500
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_MEMO', {})}
+
+
 # 1) All books by a specific author
 def books_by_author(author_name: str):
     author = Author.objects.get(name=author_name)
@@ -13,4 +55,99 @@ def books_in_library(library_name: str):
 # 3) The librarian for a library
 def librarian_for_library(library_name: str):
     library = Library.objects.get(name=library_name)
-    return Librarian.objects.get(library=library)
\ No newline at end of file
+    return Librarian.objects.get(library=library)
+
+
+class QueryMemo:
+    """Lookup results by (kind, name), cleared as a whole when the data changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.generation = 0
+
+    def get_many(self, kind, names):
+        """Return (found, missing, generation) for `names`."""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            entries = self._entries.get(kind, {})
+            for name in names:
+                entry = entries.get(name)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(name)
+                    found[name] = entry[1]
+                else:
+                    missing.append(name)
+            return found, missing, self.generation
+
+    def set_many(self, kind, values, generation):
+        """Store `values`, unless the memo was cleared since `generation` was read."""
+        config = get_config()
+        expires = time.monotonic() + config['TIMEOUT']
+        with self._lock:
+            if generation != self.generation:
+                return
+            entries = self._entries.setdefault(kind, OrderedDict())
+            for name, value in values.items():
+                entries[name] = (expires, value)
+                entries.move_to_end(name)
+            while len(entries) > config['MAX_ENTRIES']:
+                entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self.generation += 1
+
+
+memo = QueryMemo()
+
+
+def _memoized(kind, names, load):
+    names = list(dict.fromkeys(names))
+    found, missing, generation = memo.get_many(kind, names)
+    if missing:
+        loaded = {}
+        for start in range(0, len(missing), BATCH_SIZE):
+            loaded.update(load(missing[start:start + BATCH_SIZE]))
+        memo.set_many(kind, loaded, generation)
+        found.update(loaded)
+    return {name: found[name] for name in names}
+
+
+def _load_books_by_authors(names):
+    result = {name: [] for name in names}
+    for book in Book.objects.filter(author__name__in=names).select_related('author').order_by('pk'):
+        result[book.author.name].append(book)
+    return result
+
+
+def _load_books_in_libraries(names):
+    result = {name: [] for name in names}
+    books = Book.objects.filter(library__name__in=names).annotate(library_name=F('library__name')).order_by('pk')
+    for book in books:
+        result[book.library_name].append(book)
+    return result
+
+
+def _load_librarians_for_libraries(names):
+    result = dict.fromkeys(names)
+    for librarian in Librarian.objects.filter(library__name__in=names).select_related('library'):
+        result[librarian.library.name] = librarian
+    return result
+
+
+# Batched variants: one query for all the names not memoized yet.
+
+def books_by_authors(author_names):
+    """{name: [books]} for every name; authors sharing a name share the list, unknown names get []."""
+    return _memoized('books_by_author', author_names, _load_books_by_authors)
+
+def books_in_libraries(library_names):
+    """{name: [books]} for every name; unknown libraries get []."""
+    return _memoized('books_in_library', library_names, _load_books_in_libraries)
+
+def librarians_for_libraries(library_names):
+    """{name: librarian} for every name; None where the library or its librarian is missing."""
+    return _memoized('librarian_for_library', library_names, _load_librarians_for_libraries)
@@ -1,15 +1,30 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from . import query_samples
+from .models import Author, Book, Library, Librarian, UserProfile
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, raw, **kwargs):
+    # Only new users need a profile; saving an existing user (every login
+    # updates last_login) no longer writes to the profile too.
+    # Fixtures (raw saves) bring their own profiles.
+    if created and not raw:
         UserProfile.objects.create(user=instance)
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    # ensure profile exists; then save
-    UserProfile.objects.get_or_create(user=instance)
-    instance.userprofile.save()
\ No newline at end of file
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Library)
+@receiver(post_delete, sender=Library)
+@receiver(post_save, sender=Librarian)
+@receiver(post_delete, sender=Librarian)
+@receiver(m2m_changed, sender=Library.books.through)
+def clear_query_memo(sender, **kwargs):
+    # Cleared now, so this transaction sees its own change, and again on
+    # commit, in case another thread memoized the old data in between.
+    if kwargs.get('action', 'post_').startswith('post_'):
+        query_samples.memo.clear()
+        transaction.on_commit(query_samples.memo.clear)
\ No newline at end of file
@@ -1,19 +1,29 @@
 from django.contrib import admin
-from .models import Post, Comment
+from .changelist import AutocompleteFilter, FastChangeListMixin
+from .models import Post, Comment, ArchivedPost
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ['title', 'author', 'published_date']
-    list_filter = ['published_date', 'author']
+    list_filter = ['published_date', ('author', AutocompleteFilter)]
+    list_select_related = ['author']
     search_fields = ['title', 'content']
     date_hierarchy = 'published_date'
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ['post', 'author', 'created_at', 'content_preview']
-    list_filter = ['created_at', 'author']
+    list_filter = ['created_at', ('author', AutocompleteFilter)]
+    list_select_related = ['post', 'author']
     search_fields = ['content', 'post__title']
     
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content Preview'
+
+@admin.register(ArchivedPost)
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ['title', 'author', 'published_date']
+    list_filter = ['month']
+    search_fields = ['title']
+    readonly_fields = ['month', 'published_date']
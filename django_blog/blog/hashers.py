@@ -0,0 +1,77 @@
+"""
+PBKDF2 password hashing with a cost calibrated for the host.
+
+TunedPBKDF2PasswordHasher is Django's PBKDF2PasswordHasher under the same
+algorithm name ("pbkdf2_sha256"), with the iteration count taken from
+PASSWORD_HASHING['ITERATIONS']. `manage.py calibrate_hasher` measures PBKDF2
+on the host it runs on and prints the count that takes TIME_BUDGET seconds
+there. The count never goes below MIN_ITERATIONS, whatever the budget; the
+default floor is Django's own count.
+
+Existing hashes keep verifying whatever their count. After a successful
+login Django rehashes the password with the current count and saves it
+(must_update), so a new setting reaches each user the next time they log in.
+
+Hashing runs in the request's thread. hashlib releases the GIL while it
+hashes, so other threads of the worker keep running; what a login storm
+costs is set by the iteration count, which is why it is calibrated.
+
+Settings (all optional), e.g.:
+
+    PASSWORD_HASHERS = ['blog.hashers.TunedPBKDF2PasswordHasher', ...]
+    PASSWORD_HASHING = {
+        'ITERATIONS': 720000,       # from calibrate_hasher; None for the floor
+        'MIN_ITERATIONS': 600000,
+        'TIME_BUDGET': 0.25,        # seconds per hash, for calibrate_hasher
+    }
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+DEFAULTS = {
+    'ITERATIONS': None,
+    'MIN_ITERATIONS': PBKDF2PasswordHasher.iterations,
+    'TIME_BUDGET': 0.25,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+def current_iterations():
+    """The iteration count new hashes get."""
+    config = get_config()
+    return max(config['ITERATIONS'] or 0, config['MIN_ITERATIONS'])
+
+
+def measure(iterations, runs=3, digest_name='sha256'):
+    """Seconds one hash with `iterations` takes in this process (best of `runs`)."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac(digest_name, b'calibration password', b'calibrationsalt', iterations)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate(budget, runs=3, probe=100000):
+    """
+    Return (iterations, seconds): the count whose hash takes about `budget`
+    seconds here, rounded to 10000 and not below MIN_ITERATIONS, and the time
+    one hash with that count takes.
+    """
+    rate = probe / measure(probe, runs)
+    count = int(max(round(budget * rate, -4), get_config()['MIN_ITERATIONS']))
+    return count, measure(count, runs)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2PasswordHasher with the iteration count from PASSWORD_HASHING."""
+
+    @property
+    def iterations(self):
+        return current_iterations()
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import archive
+
+
+class Command(BaseCommand):
+    help = "Move posts from months older than BLOG_ARCHIVE['HOT_DAYS'] out of the hot Post table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive months that started more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of posts moved per transaction.')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches, to spread the load.')
+
+    def handle(self, *args, **options):
+        cutoff = archive.archive_cutoff(options['days'])
+        batch_size = options['batch_size'] or archive.get_config()['BATCH_SIZE']
+
+        moved = 0
+        while True:
+            count = archive.archive_batch(cutoff, batch_size)
+            if not count:
+                break
+            moved += count
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} posts published before {cutoff}.'))
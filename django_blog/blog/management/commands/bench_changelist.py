@@ -0,0 +1,81 @@
+import time
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin import PostAdmin
+from blog.models import Post
+
+
+class StockPostAdmin(admin.ModelAdmin):
+    """PostAdmin as it was before blog.changelist."""
+    list_display = ['title', 'author', 'published_date']
+    list_filter = ['published_date', 'author']
+    search_fields = ['title', 'content']
+    date_hierarchy = 'published_date'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Time the Post changelist, stock and with blog.changelist, over generated posts (rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--authors', type=int, default=2000)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The row generator is written for SQLite.')
+        try:
+            with transaction.atomic():
+                self.bench(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def bench(self, options):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                "INSERT INTO auth_user (username, password, first_name, last_name, email, "
+                "is_superuser, is_staff, is_active, date_joined) "
+                "SELECT 'bench' || i, '!', '', '', '', 0, 0, 1, datetime('now') FROM n",
+                [options['authors']],
+            )
+            cursor.execute('SELECT min(id), max(id) FROM auth_user WHERE username LIKE %s', ['bench%'])
+            first, last = cursor.fetchone()
+            cursor.execute(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) "
+                "INSERT INTO blog_post (title, content, published_date, author_id) "
+                "SELECT 'Post ' || i, '', datetime('2015-01-01', '+' || (i * 7 %% 3650) || ' days'), "
+                "%s + i %% %s FROM n",
+                [options['posts'], first, last - first + 1],
+            )
+        self.stdout.write(f"{Post.objects.count()} posts, {options['authors']} authors")
+
+        user = User.objects.create_superuser('bench-admin', 'bench@example.com', 'x')
+        factory = RequestFactory()
+        pages = [('unfiltered', {}), ('by author', {'author__id__exact': str(first)}),
+                 ('by year', {'published_date__year': '2020'})]
+        for label, model_admin in (('stock', StockPostAdmin(Post, admin.site)), ('fast', PostAdmin(Post, admin.site))):
+            for page, params in pages:
+                cache.clear()
+                best = float('inf')
+                for _ in range(options['runs']):
+                    request = factory.get('/admin/blog/post/', params)
+                    request.user = user
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        model_admin.changelist_view(request).render()
+                        best = min(best, time.perf_counter() - start)
+                # Queries of the last, warm-cache run.
+                self.stdout.write(f'{label:6} {page:11} {best * 1000:8.1f} ms {len(queries):3} queries')
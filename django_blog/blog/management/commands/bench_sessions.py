@@ -0,0 +1,90 @@
+import random
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from blog import sessions
+
+ENGINES = [
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+    'blog.sessions',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare session engines on a mix of reads, no-op writes and real writes (rolled back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--sessions', type=int, default=200)
+        parser.add_argument('--touch-ratio', type=float, default=0.2,
+                            help='Share of requests that assign a session value without changing it.')
+        parser.add_argument('--write-ratio', type=float, default=0.05,
+                            help='Share of requests that change the session.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{options['requests']} requests over {options['sessions']} sessions, "
+                          f"{options['touch_ratio']:.0%} touch, {options['write_ratio']:.0%} write, "
+                          f"cache {type(caches[settings.SESSION_CACHE_ALIAS]).__name__}")
+        self.stdout.write(f"{'engine':48} {'us/request':>10} {'queries':>8} {'saves':>6} {'db writes':>9}")
+        for engine in ENGINES:
+            caches[settings.SESSION_CACHE_ALIAS].clear()
+            sessions.local.clear()
+            try:
+                with transaction.atomic():
+                    self.bench(import_module(engine).SessionStore, options)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def bench(self, store_class, options):
+        keys = []
+        for i in range(options['sessions']):
+            store = store_class()
+            store.update({'_auth_user_id': str(i), '_auth_user_backend': 'django.contrib.auth.backends.ModelBackend',
+                          '_auth_user_hash': 'x' * 64, 'cart': []})
+            store.save()
+            keys.append(store.session_key)
+
+        rng = random.Random(options['seed'])
+        saves = 0
+        statements = []
+
+        def count(execute, sql, params, many, context):
+            statements.append(sql.split(None, 1)[0].upper())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            for _ in range(options['requests']):
+                index = rng.randrange(len(keys))
+                store = store_class(keys[index])
+                store.get('_auth_user_id')
+                roll = rng.random()
+                if roll < options['write_ratio']:
+                    store['cart'] = store['cart'] + [roll]
+                elif roll < options['write_ratio'] + options['touch_ratio']:
+                    store['cart'] = store['cart']
+                # What SessionMiddleware does at the end of the request.
+                if store.modified:
+                    store.save()
+                    saves += 1
+                    keys[index] = store.session_key  # signed cookies: the cookie is the key
+            elapsed = time.perf_counter() - start
+
+        writes = sum(1 for statement in statements if statement in ('INSERT', 'UPDATE'))
+        name = store_class.__module__
+        self.stdout.write(f"{name:48} {elapsed / options['requests'] * 1e6:10.1f} "
+                          f"{len(statements) / options['requests']:8.2f} {saves:6} {writes:9}")
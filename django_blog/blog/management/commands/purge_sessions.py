@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in batches of SESSION_STORE['CLEANUP_BATCH_SIZE']."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of sessions deleted per transaction.')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches, to spread the load.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            count = sessions.SessionStore.clear_expired_batch(options['batch_size'], now)
+            if not count:
+                break
+            deleted += count
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} sessions that expired before {now}.'))
@@ -5,7 +5,7 @@ from taggit.managers import TaggableManager
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
-    published_date = models.DateTimeField(auto_now_add=True)
+    published_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts')
     tags = TaggableManager()
 
@@ -19,7 +19,7 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
@@ -27,3 +27,40 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+
+class ArchivedPost(models.Model):
+    """
+    A post moved out of the hot Post table by the archive_posts command, with
+    its id and a snapshot of its tag names. `month` (first day of the
+    publication month) is the partition key; see blog.archive.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    month = models.DateField()
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    published_date = models.DateTimeField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_posts')
+    tag_names = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-published_date']
+        indexes = [
+            models.Index(fields=['month', '-published_date'], name='archivedpost_month_date'),
+        ]
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_comments')
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'Comment by {self.author.username} on {self.post.title}'
+
+    class Meta:
+        ordering = ['created_at']
\ No newline at end of file
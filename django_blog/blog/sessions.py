@@ -0,0 +1,162 @@
+"""
+Session engine: cached_db with a per-process tier and no idle writes.
+
+Use it with SESSION_ENGINE = 'blog.sessions'. Reads go through three tiers:
+
+1. a dict in this process, holding each session for LOCAL_TIMEOUT seconds;
+2. the SESSION_CACHE_ALIAS cache, as with Django's cached_db engine;
+3. the django_session table.
+
+A request for a session read in the last few seconds costs no cache round
+trip and no query. Writes go to the table and both caches, as with
+cached_db. Another process's writes and logouts show up here once the local
+entry expires, so keep LOCAL_TIMEOUT short; 0 turns the tier off.
+
+A session with a fixed expiry date (set_expiry() with a datetime) is only
+written when its data changed since it was loaded: assigning a value equal
+to the one already stored marks it modified but does not write it. Sessions
+with a sliding expiry are always written when saved, so the stored expiry
+follows the cookie's, and SESSION_SAVE_EVERY_REQUEST writes every session.
+
+clear_expired(), and so `manage.py clearsessions`, deletes expired rows
+CLEANUP_BATCH_SIZE at a time, each batch in its own short transaction.
+`manage.py purge_sessions` does the same with progress and a pause between
+batches.
+
+Settings (all optional), e.g.:
+
+    SESSION_STORE = {
+        'LOCAL_TIMEOUT': 2,
+        'LOCAL_MAX_ENTRIES': 10000,
+        'CLEANUP_BATCH_SIZE': 1000,
+    }
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+DEFAULTS = {
+    'LOCAL_TIMEOUT': 2,
+    'LOCAL_MAX_ENTRIES': 10000,
+    'CLEANUP_BATCH_SIZE': 1000,
+}
+
+KEY_PREFIX = 'blog.sessions'
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'SESSION_STORE', {})}
+
+
+class LocalTier:
+    """Pickled session data by cache key, least recently used dropped first."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        config = get_config()
+        if config['LOCAL_TIMEOUT'] <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + config['LOCAL_TIMEOUT'], value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > config['LOCAL_MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local = LocalTier()
+
+
+def _dumps(data):
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Pickled data as loaded, or None for a session not loaded from storage.
+        self._loaded = None
+
+    def load(self):
+        pickled = local.get(self.cache_key)
+        if pickled is not None:
+            data = pickle.loads(pickled)
+        else:
+            data = super().load()
+            pickled = _dumps(data)
+            if self.session_key is not None:
+                local.set(self.cache_key, pickled)
+        if self.session_key is not None:
+            self._loaded = pickled
+        return data
+
+    def _expiry_is_fixed(self):
+        # set_expiry() stores a datetime as a string, and ages as ints.
+        return isinstance(self._get_session().get('_session_expiry'), str)
+
+    def save(self, must_create=False):
+        if (
+            not must_create and self.session_key is not None and self._loaded is not None
+            and not settings.SESSION_SAVE_EVERY_REQUEST and self._expiry_is_fixed()
+        ):
+            # Same data means the same expiry date; the stored row is current.
+            pickled = _dumps(self._get_session())
+            if pickled == self._loaded:
+                return
+        super().save(must_create)
+        self._loaded = _dumps(self._get_session())
+        local.set(self.cache_key, self._loaded)
+
+    def delete(self, session_key=None):
+        key = self.session_key if session_key is None else session_key
+        if key is not None:
+            local.delete(self.cache_key_prefix + key)
+            if key == self.session_key:
+                self._loaded = None
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired_batch(cls, batch_size=None, now=None):
+        """Delete up to `batch_size` sessions expired before `now`; returns how many."""
+        model = cls.get_model_class()
+        keys = list(
+            model.objects.filter(expire_date__lt=now or timezone.now())
+            .values_list('session_key', flat=True)[:batch_size or get_config()['CLEANUP_BATCH_SIZE']]
+        )
+        if keys:
+            model.objects.filter(session_key__in=keys).delete()
+        return len(keys)
+
+    @classmethod
+    def clear_expired(cls):
+        now = timezone.now()
+        while cls.clear_expired_batch(now=now):
+            pass
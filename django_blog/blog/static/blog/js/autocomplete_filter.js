@@ -0,0 +1,15 @@
+'use strict';
+// Reloads the changelist when an AutocompleteFilter (blog.changelist) changes.
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('select.admin-autocomplete-filter').on('change', function() {
+            const select = $(this);
+            const params = new URLSearchParams(select.data('query-string'));
+            if (select.val()) {
+                params.set(select.data('parameter'), select.val());
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
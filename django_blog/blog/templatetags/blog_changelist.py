@@ -0,0 +1,28 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.changelist import cache_key, get_config
+
+register = template.Library()
+
+
+def cached_date_hierarchy(cl):
+    """admin_list.date_hierarchy(), cached per model, query string and time zone."""
+    if not cl.date_hierarchy:
+        return {}
+    key = cache_key('date_hierarchy', cl.model._meta.label, cl.get_query_string(), timezone.get_current_timezone_name())
+    return cache.get_or_set(key, lambda: date_hierarchy(cl), get_config()['CACHE_TIMEOUT'])
+
+
+@register.tag(name='cached_date_hierarchy')
+def cached_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=cached_date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
@@ -1,3 +1,268 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import hashers, sessions, tracing
+from .changelist import EstimatedCountPaginator
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+class PostArchiveTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.old_date = timezone.now() - datetime.timedelta(days=200)
+        self.old = Post.objects.create(title='Old post', content='...', author=self.author)
+        self.old.tags.add('django', 'archive')
+        self.comment = Comment.objects.create(post=self.old, author=self.author, content='First!')
+        Post.objects.filter(pk=self.old.pk).update(published_date=self.old_date)
+        self.recent = Post.objects.create(title='Recent post', content='...', author=self.author)
+
+    def archive(self):
+        call_command('archive_posts', days=90, stdout=StringIO())
+
+    def test_archive_moves_post_comments_and_tags(self):
+        self.archive()
+
+        self.assertEqual(list(Post.objects.all()), [self.recent])
+        archived = ArchivedPost.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.tag_names, ['archive', 'django'])
+        self.assertEqual(ArchivedComment.objects.get(pk=self.comment.pk).post, archived)
+        self.assertFalse(Comment.objects.exists())
+
+    def test_old_links_redirect_to_archive(self):
+        self.archive()
+        response = self.client.get(reverse('post-detail', args=[self.old.pk]))
+        self.assertRedirects(response, reverse('archived-post-detail', args=[self.old.pk]))
+
+        response = self.client.get(reverse('archived-post-detail', args=[self.old.pk]))
+        self.assertContains(response, 'First!')
+
+    def test_month_view_lists_archived_posts(self):
+        self.archive()
+        month = timezone.localtime(self.old_date)
+        response = self.client.get(reverse('archive-month', args=[month.year, month.month]))
+        self.assertContains(response, 'Old post')
+        self.assertNotContains(response, 'Recent post')
+
+
+class MemoryExporter:
+    traces = []
+
+    def __init__(self, config):
+        pass
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+class BrokenExporter:
+    def __init__(self, config):
+        pass
+
+    def export(self, trace):
+        raise OSError('No space left on device')
+
+
+@override_settings(TRACING={'ENABLED': True, 'SAMPLE_RATE': 1, 'EXPORTER': 'blog.tests.MemoryExporter'})
+class TracingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tracing.install()
+
+    @classmethod
+    def tearDownClass(cls):
+        tracing.uninstall()
+        super().tearDownClass()
+
+    def setUp(self):
+        MemoryExporter.traces.clear()
+        author = User.objects.create_user(username='author', password='pass12345')
+        Post.objects.create(title='Traced', content='...', author=author)
+
+    @override_settings(TRACING={'ENABLED': True, 'SAMPLE_RATE': 1, 'EXPORTER': 'blog.tests.BrokenExporter'})
+    def test_failing_exporter_does_not_fail_the_request(self):
+        with self.assertLogs('blog.tracing', 'ERROR'):
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_page_request_records_view_template_and_query_spans(self):
+        response = self.client.get(reverse('post-list'))
+
+        (trace,) = MemoryExporter.traces
+        names = [span.name for span in trace.spans]
+        self.assertEqual(names[0], 'GET /posts/')
+        self.assertEqual(response[tracing.TRACE_HEADER], trace.trace_id)
+        self.assertIn('view PostListView', names)
+        self.assertIn('template blog/post_list.html', names)
+        self.assertIn('SELECT blog_post', names)
+        by_id = {span.span_id: span for span in trace.spans}
+        template = trace.spans[names.index('template blog/post_list.html')]
+        self.assertEqual(by_id[template.parent_id].name, 'resolve and call view')
+
+
+class ChangeListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        self.author = User.objects.create_user(username='author', password='pass12345')
+        self.posts = [Post.objects.create(title=f'Post {i}', content='...', author=self.author) for i in range(3)]
+        self.client.force_login(self.admin)
+
+    @override_settings(ADMIN_CHANGELIST={'ESTIMATE_ABOVE': 1})
+    def test_large_unfiltered_table_count_is_estimated(self):
+        self.posts[0].delete()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.create(title='After ANALYZE', content='...', author=self.author)
+
+        # The estimate is the row count ANALYZE saw, deleted rows not included.
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 10).count, 2)
+        self.assertEqual(EstimatedCountPaginator(Post.objects.filter(author=self.author), 10).count, 3)
+
+    @override_settings(ADMIN_CHANGELIST={'ESTIMATE_ABOVE': 1})
+    def test_count_without_statistics_is_exact(self):
+        self.posts[0].delete()
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 10).count, 2)
+
+    @override_settings(ADMIN_CHANGELIST={'COUNT_LIMIT': 2})
+    def test_filtered_count_stops_at_limit(self):
+        self.assertEqual(EstimatedCountPaginator(Post.objects.filter(author=self.author), 10).count, 2)
+
+    def test_author_filter_uses_autocomplete(self):
+        other = User.objects.create_user(username='other', password='pass12345')
+        Post.objects.create(title='Elsewhere', content='...', author=other)
+
+        response = self.client.get(reverse('admin:blog_post_changelist'), {'author__id__exact': other.pk})
+
+        self.assertContains(response, 'admin-autocomplete-filter')
+        self.assertContains(response, f'<option value="{other.pk}" selected>other</option>', html=True)
+        self.assertEqual([post.title for post in response.context['cl'].result_list], ['Elsewhere'])
+
+    def test_date_hierarchy_is_cached(self):
+        url = reverse('admin:blog_post_changelist')
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            response = self.client.get(url)
+
+        def date_queries(queries):
+            return [q['sql'] for q in queries.captured_queries if 'MIN("blog_post"."published_date")' in q['sql']]
+        self.assertEqual(len(date_queries(first)), 1)
+        self.assertEqual(date_queries(second), [])
+        self.assertLess(len(second), len(first))
+        self.assertContains(response, 'class="toplinks"')
+
+    def test_comment_changelist_query_count_does_not_grow(self):
+        url = reverse('admin:blog_comment_changelist')
+        Comment.objects.create(post=self.posts[0], author=self.author, content='One')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(url)
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.admin, content='More')
+        with CaptureQueriesContext(connection) as more:
+            self.client.get(url)
+
+        self.assertEqual(len(more), len(one))
+
+
+@override_settings(PASSWORD_HASHING={'ITERATIONS': 1000, 'MIN_ITERATIONS': 1000})
+class PasswordHashingTests(TestCase):
+    def test_login_upgrades_hash_to_current_iterations(self):
+        user = User.objects.create_user(username='reader', password='pass12345')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+
+        with self.settings(PASSWORD_HASHING={'ITERATIONS': 2000, 'MIN_ITERATIONS': 1000}):
+            response = self.client.post(reverse('login'), {'username': 'reader', 'password': 'pass12345'})
+
+        self.assertRedirects(response, reverse('profile'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(user.check_password('pass12345'))
+
+    def test_iterations_never_go_below_minimum(self):
+        with self.settings(PASSWORD_HASHING={'ITERATIONS': 10, 'MIN_ITERATIONS': 1000}):
+            self.assertEqual(hashers.current_iterations(), 1000)
+            self.assertEqual(hashers.calibrate(0.000001, runs=1, probe=1000)[0], 1000)
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sessions.local.clear()
+        store = sessions.SessionStore()
+        store['cart'] = [1]
+        store.save()
+        self.key = store.session_key
+
+    def test_read_within_local_timeout_skips_cache_and_database(self):
+        cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(sessions.SessionStore(self.key)['cart'], [1])
+
+    def test_unchanged_session_is_not_written(self):
+        store = sessions.SessionStore(self.key)
+        store.set_expiry(timezone.now() + datetime.timedelta(days=1))
+        store.save()
+        store = sessions.SessionStore(self.key)
+        store['cart'] = [1]
+        self.assertTrue(store.modified)
+        with self.assertNumQueries(0):
+            store.save()
+
+        store['cart'] = [1, 2]
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        self.assertIn('UPDATE "django_session"', ' '.join(q['sql'] for q in queries.captured_queries))
+        sessions.local.clear()
+        cache.clear()
+        self.assertEqual(sessions.SessionStore(self.key)['cart'], [1, 2])
+
+    def test_sliding_expiry_is_pushed_back_on_save(self):
+        model = sessions.SessionStore.get_model_class()
+        model.objects.update(expire_date=timezone.now() + datetime.timedelta(minutes=1))
+        sessions.local.clear()
+        cache.clear()
+
+        store = sessions.SessionStore(self.key)
+        store['cart'] = [1]
+        store.save()
+        self.assertGreater(model.objects.get().expire_date, timezone.now() + datetime.timedelta(days=1))
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_save_every_request_writes_unchanged_sessions(self):
+        store = sessions.SessionStore(self.key)
+        store.set_expiry(timezone.now() + datetime.timedelta(days=1))
+        store.save()
+        store = sessions.SessionStore(self.key)
+        store['cart'] = [1]
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        self.assertIn('UPDATE "django_session"', ' '.join(q['sql'] for q in queries.captured_queries))
+
+    def test_flush_drops_local_copy(self):
+        sessions.SessionStore(self.key).flush()
+
+        self.assertNotIn('cart', sessions.SessionStore(self.key))
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        expired = timezone.now() - datetime.timedelta(days=1)
+        for _ in range(5):
+            store = sessions.SessionStore()
+            store.set_expiry(expired)
+            store.create()
+        model = sessions.SessionStore.get_model_class()
+
+        self.assertEqual(sessions.SessionStore.clear_expired_batch(2), 2)
+        self.assertEqual(model.objects.count(), 4)
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(list(model.objects.values_list('session_key', flat=True)), [self.key])
@@ -3,7 +3,7 @@ from .views import (
     CustomLoginView, CustomLogoutView, RegisterView, profile_view, home_view,
     PostListView, PostDetailView, PostCreateView, PostUpdateView, PostDeleteView,
     CommentCreateView, CommentUpdateView, CommentDeleteView, add_comment_to_post,
-    SearchView, PostByTagListView
+    SearchView, PostByTagListView, ArchiveIndexView, ArchiveMonthView, ArchivedPostDetailView
 )
 
 urlpatterns = [
@@ -39,4 +39,9 @@ urlpatterns = [
     # Search and Tag URLs
     path('search/', SearchView.as_view(), name='search'),
     path('tags/<slug:tag_slug>/', PostByTagListView.as_view(), name='posts-by-tag'),
+    
+    # Archive URLs
+    path('archive/', ArchiveIndexView.as_view(), name='archive-index'),
+    path('archive/<int:year>/<int:month>/', ArchiveMonthView.as_view(), name='archive-month'),
+    path('archive/posts/<int:pk>/', ArchivedPostDetailView.as_view(), name='archived-post-detail'),
 ]
\ No newline at end of file
@@ -4,12 +4,15 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import CreateView, ListView, DetailView, UpdateView, DeleteView
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.shortcuts import get_object_or_404
 from .forms import CustomUserCreationForm, UserProfileForm, PostForm, CommentForm, SearchForm
-from .models import Post, Comment
-from django.db.models import Q
+from .models import Post, Comment, ArchivedPost
+from .archive import posts_for_month
+from django.db.models import Count, Q
+import datetime
 from taggit.models import Tag
 
 class CustomLoginView(LoginView):
@@ -61,6 +64,15 @@ class PostDetailView(DetailView):
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
     
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            # archived posts keep their id, so old links still resolve
+            if ArchivedPost.objects.filter(pk=kwargs['pk']).exists():
+                return redirect('archived-post-detail', pk=kwargs['pk'])
+            raise
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['comments'] = self.object.comments.all()
@@ -214,3 +226,39 @@ class PostByTagListView(ListView):
         context = super().get_context_data(**kwargs)
         context['tag'] = get_object_or_404(Tag, slug=self.kwargs.get('tag_slug'))
         return context
+
+
+# Archive Views
+class ArchiveIndexView(ListView):
+    template_name = 'blog/archive_index.html'
+    context_object_name = 'months'
+    
+    def get_queryset(self):
+        return ArchivedPost.objects.values('month').annotate(post_count=Count('id')).order_by('-month')
+
+class ArchiveMonthView(ListView):
+    template_name = 'blog/archive_month.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+    
+    def get_queryset(self):
+        try:
+            self.month = datetime.date(self.kwargs['year'], self.kwargs['month'], 1)
+        except ValueError:
+            raise Http404('Invalid month')
+        return posts_for_month(self.month)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['month'] = self.month
+        return context
+
+class ArchivedPostDetailView(DetailView):
+    model = ArchivedPost
+    template_name = 'blog/archived_post_detail.html'
+    context_object_name = 'post'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.object.comments.select_related('author')
+        return context
@@ -42,7 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.tracing.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "django_blog.db_routers.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -75,15 +77,42 @@ WSGI_APPLICATION = "django_blog.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
         "USER": "",
         "PASSWORD": "",
         "HOST": "",
         "PORT": "",
-    }
+    },
+    # Read replica (see django_blog.db_routers). In development it is the primary's
+    # own file; point it at a real replica and list it in
+    # DATABASE_ROUTING["REPLICAS"] to send reads there.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"NAME": BASE_DIR / "test_replica.sqlite3"},
+    },
+}
+
+DATABASE_ROUTERS = ["django_blog.db_routers.PrimaryReplicaRouter"]
+
+# Aliases that serve reads for safe requests; empty keeps everything on the
+# primary. Clients that just wrote keep reading from the primary for
+# PIN_SECONDS. Replicas are health checked every HEALTH_CHECK_INTERVAL seconds
+# and skipped for RETRY_AFTER seconds after a failure.
+DATABASE_ROUTING = {
+    "REPLICAS": [],
+    "PIN_SECONDS": 5,
+    "HEALTH_CHECK_INTERVAL": 5,
+    "RETRY_AFTER": 30,
 }
 
 
@@ -106,6 +135,24 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing (blog.hashers): PBKDF2 at the iteration count found by
+# `manage.py calibrate_hasher` for TIME_BUDGET seconds per hash, never below
+# MIN_ITERATIONS. Hashes with another count are upgraded at login.
+PASSWORD_HASHERS = [
+    "blog.hashers.TunedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+PASSWORD_HASHING = {
+    "ITERATIONS": None,
+    "MIN_ITERATIONS": 600000,
+    "TIME_BUDGET": 0.25,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -132,7 +179,46 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Sessions (blog.sessions): cached_db behind a per-process tier that holds
+# each session for LOCAL_TIMEOUT seconds. Unchanged sessions with a fixed
+# expiry date are not written back. clearsessions and purge_sessions delete
+# expired rows CLEANUP_BATCH_SIZE at a time.
+SESSION_ENGINE = "blog.sessions"
+
+SESSION_STORE = {
+    "LOCAL_TIMEOUT": 2,
+    "LOCAL_MAX_ENTRIES": 10000,
+    "CLEANUP_BATCH_SIZE": 1000,
+}
+
 # Authentication settings
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/profile/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Request tracing (blog.tracing): spans for middleware, views, templates and
+# SQL. EXPORTER is 'console', 'file' (JSON lines in FILE, summarized by
+# `manage.py trace_report`) or a dotted class path.
+TRACING = {
+    "ENABLED": False,
+    "SAMPLE_RATE": 0.01,
+    "EXPORTER": "file",
+    "FILE": BASE_DIR / "traces.jsonl",
+    "MAX_SPANS": 2000,
+}
+
+# Post archiving (blog.archive): archive_posts moves months older than
+# HOT_DAYS from the hot Post table into blog.ArchivedPost.
+BLOG_ARCHIVE = {
+    "HOT_DAYS": 90,
+    "BATCH_SIZE": 500,
+}
+
+# Admin changelists (blog.changelist): tables over ESTIMATE_ABOVE rows show
+# the database's row estimate, filtered lists count up to COUNT_LIMIT rows,
+# and filter choices and date links are cached for CACHE_TIMEOUT seconds.
+ADMIN_CHANGELIST = {
+    "ESTIMATE_ABOVE": 100000,
+    "COUNT_LIMIT": 100000,
+    "CACHE_TIMEOUT": 300,
+}
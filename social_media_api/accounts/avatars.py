@@ -0,0 +1,127 @@
+"""
+Profile picture processing.
+
+Uploads are stored under a content-hashed name, so identical images are
+stored once and a given URL never changes content (safe to serve with
+far-future cache headers). After the user row commits, a small worker pool
+resizes the original into fixed-size square variants in every format of
+VARIANT_FORMATS (AVATAR_PROCESSING sets the pool size). When an image's
+variants are all written the worker marks it ready in the cache, and
+`avatar_url()` reads that mark instead of asking the storage on every render.
+"""
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+VARIANT_SIZES = {'small': 48, 'medium': 128, 'large': 256}
+VARIANT_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+# How long avatar_url() trusts a storage lookup that found no variants.
+NOT_READY_TIMEOUT = 60
+
+_executor = None
+
+
+class ContentHashedStorage(FileSystemStorage):
+    """Stores every file under the SHA-256 of its content."""
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = hashlib.sha256()
+        for chunk in content.chunks():  # chunks() rewinds, so _save reads from the start again
+            digest.update(chunk)
+
+        digest = digest.hexdigest()
+        ext = posixpath.splitext(name)[1].lower()
+        name = posixpath.join(posixpath.dirname(name), digest[:2], digest + ext)
+        return self.save_as(name, content)
+
+    def save_as(self, name, content):
+        """Store `content` under exactly `name`, unless that file already exists."""
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+def get_avatar_storage():
+    return ContentHashedStorage()
+
+
+def variant_name(name, size, fmt):
+    return f'{posixpath.splitext(name)[0]}_{VARIANT_SIZES[size]}.{fmt}'
+
+
+def ready_key(name):
+    return 'avatars:ready:' + hashlib.md5(name.encode()).hexdigest()
+
+
+def generate_variants(name, storage=None):
+    """Write every size/format variant of the stored image `name`."""
+    storage = storage or get_avatar_storage()
+    with storage.open(name, 'rb') as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.load()
+
+    for size, pixels in VARIANT_SIZES.items():
+        thumb = ImageOps.fit(image, (pixels, pixels), Image.LANCZOS)
+        for fmt, pil_format in VARIANT_FORMATS.items():
+            target = variant_name(name, size, fmt)
+            if storage.exists(target):
+                continue
+            out = BytesIO()
+            frame = thumb.convert('RGB') if pil_format == 'JPEG' else thumb
+            frame.save(out, pil_format, quality=85)
+            storage.save_as(target, ContentFile(out.getvalue()))
+    cache.set(ready_key(name), True, None)
+
+
+def _run(name):
+    try:
+        generate_variants(name)
+    except Exception:
+        logger.exception('Could not generate avatar variants for %s', name)
+
+
+def schedule_variants(name):
+    """Generate the variants for `name` off the request thread."""
+    config = getattr(settings, 'AVATAR_PROCESSING', {})
+    if config.get('SYNC'):
+        _run(name)
+        return
+
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=config.get('WORKERS', 2), thread_name_prefix='avatars'
+        )
+    _executor.submit(_run, name)
+
+
+def avatar_url(image, size='medium', fmt='webp'):
+    """
+    URL of the `size`/`fmt` variant of an ImageField value, falling back to
+    the original upload while the variant hasn't been generated yet.
+    """
+    if not image:
+        return None
+    key = ready_key(image.name)
+    ready = cache.get(key)
+    if ready is None:
+        # Not marked yet, e.g. processed before the mark existed or cleared
+        # from the cache: ask the storage once for the last variant written.
+        last = variant_name(image.name, list(VARIANT_SIZES)[-1], list(VARIANT_FORMATS)[-1])
+        ready = image.storage.exists(last)
+        cache.set(key, ready, None if ready else NOT_READY_TIMEOUT)
+    if ready:
+        return image.storage.url(variant_name(image.name, size, fmt))
+    return image.url
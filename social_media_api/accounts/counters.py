@@ -0,0 +1,68 @@
+"""
+Denormalized follower/following/post counters for accounts.User.
+
+Writes never read-modify-write a Python value: every adjustment is a single
+UPDATE with an F() expression, so concurrent follows can't lose increments.
+With ACCOUNTS_COUNTER_SHARDS > 0 the deltas are spread over that many
+UserCounterShard rows per user and counter, and readers add the shards on
+top of the column value (`repair_counters --fold-shards` folds them back).
+"""
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+
+from .models import User, UserCounterShard
+
+COUNTER_FIELDS = ('followers_count', 'following_count', 'posts_count')
+
+
+def shard_count():
+    return getattr(settings, 'ACCOUNTS_COUNTER_SHARDS', 0)
+
+
+def adjust(user_ids, counter, delta):
+    """Add `delta` to `counter` for every user in `user_ids`."""
+    if counter not in COUNTER_FIELDS:
+        raise ValueError(f'Unknown counter: {counter}')
+    user_ids = list(user_ids)
+    if not user_ids or not delta:
+        return
+
+    shards = shard_count()
+    if shards <= 0:
+        User.objects.filter(pk__in=user_ids).update(
+            **{counter: Greatest(F(counter) + delta, Value(0))}
+        )
+        return
+
+    for user_id in user_ids:
+        _adjust_shard(user_id, counter, random.randrange(shards), delta)
+
+
+def _adjust_shard(user_id, counter, shard, delta):
+    rows = UserCounterShard.objects.filter(user_id=user_id, counter=counter, shard=shard)
+    if rows.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            UserCounterShard.objects.create(user_id=user_id, counter=counter, shard=shard, count=delta)
+    except IntegrityError:
+        # Another writer created the shard between our UPDATE and INSERT.
+        rows.update(count=F('count') + delta)
+
+
+def get_counts(user):
+    """Return the current value of every counter for `user`."""
+    counts = {field: getattr(user, field) for field in COUNTER_FIELDS}
+    if shard_count() > 0:
+        pending = (
+            UserCounterShard.objects.filter(user=user)
+            .values('counter')
+            .annotate(total=Sum('count'))
+        )
+        for row in pending:
+            counts[row['counter']] = max(counts[row['counter']] + row['total'], 0)
+    return counts
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from accounts.models import User, UserCounterShard
+from blog.models import ArchivedPost, Post
+
+Follow = User.followers.through
+
+
+def _count_subquery(queryset, column):
+    counted = (
+        queryset.filter(**{column: OuterRef('pk')})
+        .order_by()
+        .values(column)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized follower/following/post counters on accounts.User."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of users updated per UPDATE statement.')
+        parser.add_argument('--fold-shards', action='store_true',
+                            help='Only fold pending counter shards into the user columns, without recounting.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        step = self._fold_shards if options['fold_shards'] else self._recount
+
+        last_pk, updated = 0, 0
+        while True:
+            pks = list(
+                User.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                step(pks[0], pks[-1])
+            updated += len(pks)
+            last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Repaired counters for {updated} users.'))
+
+    def _recount(self, first_pk, last_pk):
+        User.objects.filter(pk__range=(first_pk, last_pk)).update(
+            followers_count=_count_subquery(Follow.objects.all(), 'from_user'),
+            following_count=_count_subquery(Follow.objects.all(), 'to_user'),
+            posts_count=(
+                _count_subquery(Post.objects.all(), 'author')
+                + _count_subquery(ArchivedPost.objects.all(), 'author')
+            ),
+        )
+        # The recount already includes whatever the shards were holding.
+        UserCounterShard.objects.filter(user_id__gte=first_pk, user_id__lte=last_pk).delete()
+
+    def _fold_shards(self, first_pk, last_pk):
+        shards = UserCounterShard.objects.select_for_update().filter(user_id__gte=first_pk, user_id__lte=last_pk)
+        totals = shards.values('user_id', 'counter').annotate(total=Sum('count')).order_by()
+        for row in totals:
+            counter = row['counter']
+            User.objects.filter(pk=row['user_id']).update(
+                **{counter: Greatest(F(counter) + row['total'], Value(0))}
+            )
+        shards.delete()
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-19 09:40
+
+import accounts.avatars
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="profile_picture",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=accounts.avatars.get_avatar_storage,
+                upload_to="profile_pics/",
+            ),
+        ),
+    ]
@@ -1,10 +1,42 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .avatars import avatar_url, get_avatar_storage
+
 class User(AbstractUser):
     bio = models.TextField(blank=True, null=True)
-    profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
+    profile_picture = models.ImageField(
+        upload_to='profile_pics/', storage=get_avatar_storage, blank=True, null=True
+    )
     followers = models.ManyToManyField('self', symmetrical=False, related_name='following', blank=True)
 
+    # Denormalized counters, kept in step by accounts.counters (see signals.py)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.username
+
+    def avatar_url(self, size='medium', fmt='webp'):
+        return avatar_url(self.profile_picture, size, fmt)
+
+
+class UserCounterShard(models.Model):
+    """
+    One slice of a sharded counter. When ACCOUNTS_COUNTER_SHARDS is enabled,
+    increments land on a random shard row instead of the user row, so a burst
+    of follows on a single account doesn't serialize on one row lock.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='counter_shards')
+    counter = models.CharField(max_length=32)
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'counter', 'shard'], name='unique_user_counter_shard'),
+        ]
+
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return f'{self.user_id}:{self.counter}[{self.shard}] = {self.count}'
@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.dispatch import receiver
+
+from . import avatars, counters
+from .models import User
+
+Follow = User.followers.through
+
+
+def _related_ids(instance, reverse, pk_set=None):
+    """IDs currently on the other side of `instance`'s follow relation."""
+    if reverse:
+        # instance is the follower: rows point *to* it
+        rows = Follow.objects.filter(to_user=instance)
+        column = 'from_user_id'
+    else:
+        rows = Follow.objects.filter(from_user=instance)
+        column = 'to_user_id'
+    if pk_set is not None:
+        rows = rows.filter(**{f'{column}__in': pk_set})
+    return set(rows.values_list(column, flat=True))
+
+
+def _apply(instance, reverse, other_ids, sign):
+    if not other_ids:
+        return
+    if reverse:
+        # instance.following changed: instance follows / unfollows others
+        counters.adjust([instance.pk], 'following_count', sign * len(other_ids))
+        counters.adjust(other_ids, 'followers_count', sign)
+    else:
+        # instance.followers changed: others follow / unfollow instance
+        counters.adjust([instance.pk], 'followers_count', sign * len(other_ids))
+        counters.adjust(other_ids, 'following_count', sign)
+
+
+@receiver(m2m_changed, sender=Follow)
+def update_follow_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        # Django only reports the rows it actually inserted for post_add.
+        _apply(instance, reverse, pk_set, +1)
+    elif action == 'pre_remove':
+        instance._removed_follow_ids = _related_ids(instance, reverse, pk_set)
+    elif action == 'post_remove':
+        _apply(instance, reverse, instance.__dict__.pop('_removed_follow_ids', set()), -1)
+    elif action == 'pre_clear':
+        instance._removed_follow_ids = _related_ids(instance, reverse)
+    elif action == 'post_clear':
+        _apply(instance, reverse, instance.__dict__.pop('_removed_follow_ids', set()), -1)
+
+
+@receiver(pre_save, sender=User)
+def note_new_profile_picture(sender, instance, **kwargs):
+    picture = instance.profile_picture
+    instance._new_profile_picture = bool(picture) and not picture._committed
+
+
+@receiver(post_save, sender=User)
+def process_profile_picture(sender, instance, **kwargs):
+    if instance.__dict__.pop('_new_profile_picture', False):
+        name = instance.profile_picture.name
+        transaction.on_commit(lambda: avatars.schedule_variants(name))
@@ -1,3 +1,144 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from blog.models import Post
+from . import avatars, counters
+from .models import User, UserCounterShard
+
+
+class UserCounterTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass12345')
+        self.bob = User.objects.create_user(username='bob', password='pass12345')
+        self.carol = User.objects.create_user(username='carol', password='pass12345')
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return counters.get_counts(user)
+
+    def test_follow_and_unfollow_update_both_sides(self):
+        self.alice.followers.add(self.bob, self.carol)
+        self.assertEqual(self.counts(self.alice)['followers_count'], 2)
+        self.assertEqual(self.counts(self.bob)['following_count'], 1)
+
+        # adding an existing follower again must not double count
+        self.alice.followers.add(self.bob)
+        self.assertEqual(self.counts(self.alice)['followers_count'], 2)
+
+        self.bob.following.remove(self.alice)
+        self.assertEqual(self.counts(self.alice)['followers_count'], 1)
+        self.assertEqual(self.counts(self.bob)['following_count'], 0)
+
+        self.alice.followers.clear()
+        self.assertEqual(self.counts(self.alice)['followers_count'], 0)
+        self.assertEqual(self.counts(self.carol)['following_count'], 0)
+
+    def test_removing_a_non_follower_is_a_no_op(self):
+        self.alice.followers.remove(self.bob)
+        self.assertEqual(self.counts(self.alice)['followers_count'], 0)
+        self.assertEqual(self.counts(self.bob)['following_count'], 0)
+
+    def test_post_create_and_delete(self):
+        post = Post.objects.create(title='Hello', content='World', author=self.alice)
+        self.assertEqual(self.counts(self.alice)['posts_count'], 1)
+        post.delete()
+        self.assertEqual(self.counts(self.alice)['posts_count'], 0)
+
+    @override_settings(ACCOUNTS_COUNTER_SHARDS=4)
+    def test_sharded_counters_leave_user_row_untouched(self):
+        self.alice.followers.add(self.bob, self.carol)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.followers_count, 0)
+        self.assertEqual(self.counts(self.alice)['followers_count'], 2)
+
+        call_command('repair_counters', '--fold-shards', stdout=None)
+        self.assertFalse(UserCounterShard.objects.exists())
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.followers_count, 2)
+
+    def test_repair_recomputes_drifted_counters(self):
+        self.alice.followers.add(self.bob)
+        Post.objects.create(title='Hello', content='World', author=self.bob)
+        User.objects.update(followers_count=40, following_count=40, posts_count=40)
+
+        call_command('repair_counters', '--batch-size', '2', stdout=None)
+
+        self.assertEqual(
+            self.counts(self.alice),
+            {'followers_count': 1, 'following_count': 0, 'posts_count': 0},
+        )
+        self.assertEqual(
+            self.counts(self.bob),
+            {'followers_count': 0, 'following_count': 1, 'posts_count': 1},
+        )
+
+
+def make_upload(color='red', name='me.png'):
+    out = BytesIO()
+    Image.new('RGB', (600, 400), color).save(out, 'PNG')
+    return SimpleUploadedFile(name, out.getvalue(), content_type='image/png')
+
+
+class ProfilePictureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, AVATAR_PROCESSING={'SYNC': True})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def upload(self, username, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return User.objects.create_user(
+                username=username, password='pass12345', profile_picture=make_upload(**kwargs)
+            )
+
+    def test_upload_is_stored_under_content_hash_and_deduplicated(self):
+        first = self.upload('alice')
+        second = self.upload('bob', name='other-name.png')
+        self.assertEqual(first.profile_picture.name, second.profile_picture.name)
+        self.assertRegex(first.profile_picture.name, r'^profile_pics/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+
+        third = self.upload('carol', color='blue')
+        self.assertNotEqual(first.profile_picture.name, third.profile_picture.name)
+
+    def test_variants_are_generated_at_fixed_sizes(self):
+        user = self.upload('alice')
+        storage = user.profile_picture.storage
+        for size, pixels in avatars.VARIANT_SIZES.items():
+            for fmt in avatars.VARIANT_FORMATS:
+                name = avatars.variant_name(user.profile_picture.name, size, fmt)
+                with storage.open(name) as fh:
+                    self.assertEqual(Image.open(fh).size, (pixels, pixels))
+
+        self.assertTrue(user.avatar_url('small', 'webp').endswith('_48.webp'))
+
+    def test_avatar_url_does_not_touch_storage_once_ready(self):
+        user = self.upload('alice')
+        with mock.patch.object(type(user.profile_picture.storage), 'exists') as exists:
+            self.assertTrue(user.avatar_url().endswith('_128.webp'))
+        exists.assert_not_called()
+
+        cache.clear()
+        self.assertTrue(user.avatar_url().endswith('_128.webp'))
+
+    def test_avatar_url_falls_back_to_original_until_variants_exist(self):
+        user = User.objects.create_user(username='dave', password='pass12345', profile_picture=make_upload())
+        self.assertEqual(user.avatar_url(), user.profile_picture.url)
+        self.assertIsNone(User(username='nobody').avatar_url())
+
+    def test_unchanged_picture_is_not_reprocessed(self):
+        user = self.upload('alice')
+        with self.captureOnCommitCallbacks() as callbacks:
+            user.bio = 'hello'
+            user.save()
+        self.assertEqual(callbacks, [])
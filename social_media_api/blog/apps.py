@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blog"
+
+    def ready(self):
+        # imports signals so the post counter receivers register
+        import blog.signals  # noqa
@@ -0,0 +1,125 @@
+"""
+Month partitioning for blog posts.
+
+Recent posts live in the small, hot Post table, which is all the feed and
+list queries read. The archive_posts command moves whole months older than
+HOT_DAYS into ArchivedPost, keyed by `month`, in small transactions.
+
+Months are archived oldest first, so every month before the newest archived
+one is entirely in the archive, every later month is entirely hot, and only
+that boundary month can be split between the tables (when a run stopped half
+way). partitions_for_month() compares a month against the oldest hot month
+and the newest archived month to query only the table(s) that can hold it.
+"""
+import contextvars
+import datetime
+from contextlib import contextmanager
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ArchivedPost, Post
+
+DEFAULTS = {
+    'HOT_DAYS': 90,
+    'BATCH_SIZE': 500,
+}
+
+_archiving = contextvars.ContextVar('blog_archiving', default=False)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BLOG_ARCHIVE', {})}
+
+
+def month_start(value):
+    """First day of the month `value` (a date or datetime) falls in."""
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+    return datetime.date(value.year, value.month, 1)
+
+
+def month_range(month):
+    """Aware [start, end) datetimes covering `month`."""
+    start = datetime.datetime(month.year, month.month, 1)
+    end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def archive_cutoff(days=None):
+    """Posts from months that started before this date are due for archiving."""
+    days = get_config()['HOT_DAYS'] if days is None else days
+    return month_start(timezone.now() - datetime.timedelta(days=days))
+
+
+def is_archiving():
+    return _archiving.get()
+
+
+@contextmanager
+def archiving():
+    """Mark Post deletes inside the block as moves to the archive."""
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def archive_batch(cutoff, batch_size):
+    """Move the oldest `batch_size` posts published before `cutoff`; return how many moved."""
+    before, _ = month_range(cutoff)
+    with transaction.atomic():
+        posts = list(
+            Post.objects.select_for_update()
+            .filter(published_date__lt=before)
+            .order_by('published_date', 'pk')[:batch_size]
+        )
+        if not posts:
+            return 0
+        ArchivedPost.objects.bulk_create([
+            ArchivedPost(
+                id=post.pk, month=month_start(post.published_date), title=post.title,
+                content=post.content, published_date=post.published_date, author_id=post.author_id,
+            )
+            for post in posts
+        ])
+        with archiving():
+            Post.objects.filter(pk__in=[post.pk for post in posts]).delete()
+    return len(posts)
+
+
+def partition_bounds():
+    """
+    (oldest hot month, newest archived month); either is None when that table
+    is empty. Both come from a single index lookup.
+    """
+    oldest = Post.objects.order_by('published_date').values_list('published_date', flat=True).first()
+    newest = ArchivedPost.objects.aggregate(newest=Max('month'))['newest']
+    return (month_start(oldest) if oldest else None), newest
+
+
+def partitions_for_month(month):
+    """Querysets (hot first) that together hold every post published in `month`."""
+    month = month_start(month)
+    hot_from, archived_through = partition_bounds()
+    querysets = []
+    if hot_from is not None and month >= hot_from:
+        start, end = month_range(month)
+        querysets.append(Post.objects.filter(published_date__gte=start, published_date__lt=end))
+    if archived_through is not None and month <= archived_through:
+        querysets.append(ArchivedPost.objects.filter(month=month))
+    return querysets
+
+
+def posts_for_month(month):
+    """Posts published in `month`, newest first, read from the tables that hold them."""
+    querysets = [qs.select_related('author') for qs in partitions_for_month(month)]
+    if not querysets:
+        return Post.objects.none()
+    if len(querysets) == 1:
+        return querysets[0]
+    return sorted(chain(*querysets), key=lambda post: post.published_date, reverse=True)
@@ -6,11 +6,34 @@ User = get_user_model()
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
-    published_date = models.DateTimeField(auto_now_add=True)
+    published_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts')
 
     def __str__(self):
         return self.title
 
     class Meta:
-        ordering = ['-published_date']
\ No newline at end of file
+        ordering = ['-published_date']
+
+
+class ArchivedPost(models.Model):
+    """
+    A post moved out of the hot Post table by the archive_posts command. Ids
+    are kept, and `month` (first day of the publication month) is the
+    partition key every archive query filters on; see blog.archive.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    month = models.DateField()
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    published_date = models.DateTimeField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_posts')
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        ordering = ['-published_date']
+        indexes = [
+            models.Index(fields=['month', '-published_date'], name='archivedpost_month_date'),
+        ]
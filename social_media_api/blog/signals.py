@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts import counters
+from .archive import is_archiving
+from .models import Post
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust([instance.author_id], 'posts_count', +1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    if is_archiving():
+        # the post still exists, it just moved to blog.ArchivedPost
+        return
+    counters.adjust([instance.author_id], 'posts_count', -1)
@@ -1,3 +1,72 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from . import archive
+from .models import ArchivedPost, Post
+
+User = get_user_model()
+
+
+class PostArchiveTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='pass12345')
+
+    def make_post(self, title, published):
+        post = Post.objects.create(title=title, content='...', author=self.author)
+        # published_date is auto_now_add, so backdate it afterwards
+        Post.objects.filter(pk=post.pk).update(published_date=published)
+        return post
+
+    def archive(self, **options):
+        call_command('archive_posts', stdout=StringIO(), **options)
+
+    def test_old_months_move_to_archive_with_same_ids(self):
+        now = timezone.now()
+        old = self.make_post('old', now - datetime.timedelta(days=200))
+        recent = self.make_post('recent', now)
+
+        self.archive(days=90, batch_size=1)
+
+        self.assertEqual(list(Post.objects.values_list('pk', flat=True)), [recent.pk])
+        archived = ArchivedPost.objects.get()
+        self.assertEqual(archived.pk, old.pk)
+        self.assertEqual(archived.month, archive.month_start(now - datetime.timedelta(days=200)))
+
+    def test_archiving_keeps_posts_count(self):
+        self.make_post('old', timezone.now() - datetime.timedelta(days=200))
+        self.archive(days=90)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.posts_count, 1)
+
+        call_command('repair_counters', stdout=StringIO())
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.posts_count, 1)
+
+    def test_month_router_reads_only_the_tables_it_needs(self):
+        now = timezone.now()
+        old = now - datetime.timedelta(days=200)
+        self.make_post('old', old)
+        self.make_post('recent', now)
+        self.archive(days=90)
+
+        old_month, this_month = archive.month_start(old), archive.month_start(now)
+        self.assertEqual([qs.model for qs in archive.partitions_for_month(old_month)], [ArchivedPost])
+        self.assertEqual([qs.model for qs in archive.partitions_for_month(this_month)], [Post])
+        self.assertEqual([p.title for p in archive.posts_for_month(old_month)], ['old'])
+
+    def test_boundary_month_reads_both_tables(self):
+        old = timezone.now() - datetime.timedelta(days=200)
+        first = self.make_post('first', old)
+        self.make_post('second', old + datetime.timedelta(minutes=1))
+        # a run that stopped after its first batch leaves the month split
+        archive.archive_batch(archive.archive_cutoff(90), batch_size=1)
 
-# Create your tests here.
\ No newline at end of file
+        posts = archive.posts_for_month(archive.month_start(old))
+        self.assertEqual([p.title for p in posts], ['second', 'first'])
+        self.assertIsInstance(posts[1], ArchivedPost)
+        self.assertEqual(posts[1].pk, first.pk)
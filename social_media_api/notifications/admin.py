@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'verb', 'last_actor', 'actor_count', 'unread', 'updated_at']
+    list_filter = ['verb', 'unread']
+    list_select_related = ['recipient', 'last_actor']
+    raw_id_fields = ['recipient', 'last_actor', 'post']
@@ -0,0 +1,185 @@
+"""
+Batched notification delivery.
+
+Request handlers never write notifications themselves: once their
+transaction commits they append lightweight events to an in-process queue.
+A background thread drains the queue every FLUSH_INTERVAL seconds (or as
+soon as BATCH_SIZE events are waiting) and writes them with a handful of
+bulk queries - coalescing into existing unread rows, bulk_create for new
+rows and F() updates for the unread counters.
+
+Delivery is best effort: events still queued when a process is killed are
+lost, which is acceptable for activity notifications.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Post
+from .models import Notification, UnreadCounter
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+Follow = User.followers.through
+
+# recipient_id is None for NEW_POST events; they fan out to the author's
+# followers at delivery time instead of inside the request.
+Event = namedtuple('Event', 'recipient_id verb actor_id post_id')
+
+DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 2.0,
+    'SYNC': False,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+def _expand(events):
+    authors = {e.actor_id for e in events if e.recipient_id is None}
+    followers = defaultdict(list)
+    if authors:
+        rows = Follow.objects.filter(from_user_id__in=authors).values_list('from_user_id', 'to_user_id')
+        for author_id, follower_id in rows:
+            followers[author_id].append(follower_id)
+
+    for event in events:
+        if event.recipient_id is not None:
+            yield event
+        else:
+            for follower_id in followers[event.actor_id]:
+                yield event._replace(recipient_id=follower_id)
+
+
+def _existing(model, ids):
+    return set(model.objects.filter(pk__in=ids).values_list('pk', flat=True)) if ids else set()
+
+
+def deliver(events):
+    """Write `events` to the database, coalescing per recipient and verb."""
+    groups = {}
+    for event in _expand(events):
+        if event.recipient_id == event.actor_id:
+            continue
+        group = groups.setdefault((event.recipient_id, event.verb), [0, None, None])
+        group[0] += 1
+        group[1] = event.actor_id
+        group[2] = event.post_id or group[2]
+
+    keys = list(groups)
+    batch_size = get_config()['BATCH_SIZE']
+    for start in range(0, len(keys), batch_size):
+        _deliver_batch({key: groups[key] for key in keys[start:start + batch_size]})
+    return len(keys)
+
+
+@transaction.atomic
+def _deliver_batch(groups):
+    # Rows may have been deleted between the request and this flush.
+    users = _existing(User, {r for r, _ in groups} | {g[1] for g in groups.values()})
+    posts = _existing(Post, {g[2] for g in groups.values() if g[2]})
+
+    existing = {
+        (n.recipient_id, n.verb): n
+        for n in Notification.objects.select_for_update().filter(
+            unread=True,
+            recipient_id__in={r for r, _ in groups},
+            verb__in={v for _, v in groups},
+        )
+    }
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for (recipient_id, verb), (count, actor_id, post_id) in groups.items():
+        if recipient_id not in users:
+            continue
+        actor_id = actor_id if actor_id in users else None
+        post_id = post_id if post_id in posts else None
+        notification = existing.get((recipient_id, verb))
+        if notification:
+            notification.actor_count += count
+            notification.last_actor_id = actor_id
+            notification.post_id = post_id or notification.post_id
+            notification.updated_at = now
+            to_update.append(notification)
+        else:
+            to_create.append(Notification(
+                recipient_id=recipient_id, verb=verb, last_actor_id=actor_id,
+                actor_count=count, post_id=post_id, updated_at=now,
+            ))
+
+    Notification.objects.bulk_update(to_update, ['actor_count', 'last_actor', 'post', 'updated_at'])
+    Notification.objects.bulk_create(to_create)
+
+    # Coalesced events don't add unread rows; only new rows bump the counter.
+    new_per_user = Counter(n.recipient_id for n in to_create)
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id) for user_id in new_per_user], ignore_conflicts=True
+    )
+    users_by_delta = defaultdict(list)
+    for user_id, delta in new_per_user.items():
+        users_by_delta[delta].append(user_id)
+    for delta, user_ids in users_by_delta.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(count=F('count') + delta)
+
+
+class NotificationQueue:
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def put(self, events):
+        config = get_config()
+        if config['SYNC']:
+            deliver(events)
+            return
+
+        with self._lock:
+            self._events.extend(events)
+            pending = len(self._events)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notifications', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        if pending >= config['BATCH_SIZE']:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return 0
+        close_old_connections()
+        try:
+            return deliver(events)
+        except Exception:
+            logger.exception('Dropped %d notification events', len(events))
+            return 0
+        finally:
+            close_old_connections()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(get_config()['FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            self.flush()
+
+
+queue = NotificationQueue()
+
+
+def enqueue(events):
+    """Queue `events` for delivery once the current transaction commits."""
+    transaction.on_commit(lambda: queue.put(events))
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+
+
+class Notification(models.Model):
+    """
+    An activity notification. Events of the same kind for the same recipient
+    are coalesced into one unread row ("alice and 14 others followed you")
+    until the recipient reads it.
+    """
+    FOLLOW = 'follow'
+    NEW_POST = 'new_post'
+    VERB_CHOICES = (
+        (FOLLOW, 'followed you'),
+        (NEW_POST, 'published a new post'),
+    )
+
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+    last_actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+')
+    actor_count = models.PositiveIntegerField(default=1)
+    post = models.ForeignKey('blog.Post', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    unread = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['recipient', 'unread', 'verb'], name='notif_recipient_unread_verb'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.message}'
+
+    @property
+    def message(self):
+        actor = self.last_actor.username if self.last_actor else 'Someone'
+        others = self.actor_count - 1
+        if others == 1:
+            actor = f'{actor} and 1 other'
+        elif others > 1:
+            actor = f'{actor} and {others} others'
+        return f'{actor} {self.get_verb_display()}'
+
+
+class UnreadCounter(models.Model):
+    """Number of unread notifications, so the badge never needs a COUNT query."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter'
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.count}'
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    last_actor = serializers.StringRelatedField()
+    message = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'verb', 'message', 'last_actor', 'actor_count', 'post', 'unread', 'created_at', 'updated_at']
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from blog.models import Post
+from .delivery import Event, enqueue
+from .models import Notification
+
+Follow = get_user_model().followers.through
+
+
+@receiver(m2m_changed, sender=Follow)
+def queue_follow_notifications(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # instance started following everyone in pk_set
+        events = [Event(pk, Notification.FOLLOW, instance.pk, None) for pk in pk_set]
+    else:
+        events = [Event(instance.pk, Notification.FOLLOW, pk, None) for pk in pk_set]
+    enqueue(events)
+
+
+@receiver(post_save, sender=Post)
+def queue_post_notifications(sender, instance, created, **kwargs):
+    if created:
+        enqueue([Event(None, Notification.NEW_POST, instance.author_id, instance.pk)])
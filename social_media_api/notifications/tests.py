@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from blog.models import Post
+from .delivery import queue
+from .models import Notification, UnreadCounter
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATIONS={'SYNC': True})
+class NotificationDeliveryTests(TestCase):
+    def setUp(self):
+        self.star = User.objects.create_user(username='star', password='pass12345')
+        self.fans = [User.objects.create_user(username=f'fan{i}', password='pass12345') for i in range(15)]
+
+    def unread(self, user):
+        return UnreadCounter.objects.get(user=user).count
+
+    def test_follows_are_coalesced_into_one_notification(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.star.followers.add(*self.fans[:10])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fans[14].following.add(self.star)
+
+        notification = Notification.objects.get(recipient=self.star)
+        self.assertEqual(notification.actor_count, 11)
+        self.assertEqual(notification.message, 'fan14 and 10 others followed you')
+        self.assertEqual(self.unread(self.star), 1)
+
+    def test_new_post_fans_out_to_followers(self):
+        self.star.followers.add(*self.fans[:3])
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(title='Hi', content='Hello fans', author=self.star)
+
+        notifications = Notification.objects.filter(verb=Notification.NEW_POST)
+        self.assertEqual(sorted(n.recipient_id for n in notifications), sorted(f.pk for f in self.fans[:3]))
+        self.assertTrue(all(n.post_id == post.pk for n in notifications))
+
+    def test_reading_starts_a_new_notification(self):
+        client = APIClient()
+        client.force_authenticate(self.star)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.star.followers.add(self.fans[0])
+
+        response = client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data, {'unread': 1})
+        client.post(reverse('notification-mark-read'))
+        self.assertEqual(client.get(reverse('notification-unread-count')).data, {'unread': 0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.star.followers.add(self.fans[1])
+        response = client.get(reverse('notification-list'))
+        self.assertEqual([n['message'] for n in response.data], ['fan1 followed you', 'fan0 followed you'])
+        self.assertEqual(self.unread(self.star), 1)
+
+    def test_unread_count_requires_no_count_query(self):
+        client = APIClient()
+        client.force_authenticate(self.star)
+        with self.assertNumQueries(1):
+            client.get(reverse('notification-unread-count'))
+
+
+@override_settings(NOTIFICATIONS={'SYNC': False, 'BATCH_SIZE': 1000, 'FLUSH_INTERVAL': 3600})
+class NotificationQueueTests(TestCase):
+    def test_events_wait_in_queue_until_flushed(self):
+        star = User.objects.create_user(username='star', password='pass12345')
+        fan = User.objects.create_user(username='fan', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=True):
+            star.followers.add(fan)
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(queue.flush(), 1)
+        self.assertEqual(Notification.objects.get().recipient, star)
@@ -0,0 +1,34 @@
+from django.db import transaction
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import UnreadCounter
+from .serializers import NotificationSerializer
+
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return self.request.user.notifications.select_related('last_actor')
+
+
+class UnreadCountView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        # Served from the counter row, never from COUNT(*) over notifications.
+        count = UnreadCounter.objects.filter(user=request.user).values_list('count', flat=True).first()
+        return Response({'unread': count or 0})
+
+
+class MarkAllReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        with transaction.atomic():
+            marked = request.user.notifications.filter(unread=True).update(unread=False)
+            UnreadCounter.objects.filter(user=request.user).update(count=0)
+        return Response({'marked_read': marked})
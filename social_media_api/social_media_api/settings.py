@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "rest_framework.authtoken",
     "accounts",
     "blog",
+    "notifications",
 ]
 
 MIDDLEWARE = [
@@ -78,10 +79,14 @@ WSGI_APPLICATION = "social_media_api.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Persistent connections: reuse a connection for up to CONN_MAX_AGE seconds
+# across requests, checking it is still usable before each reuse.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -130,3 +135,32 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Denormalized profile counters (accounts.counters). Set above 0 to spread
+# counter updates over that many shard rows per user, for very hot accounts.
+ACCOUNTS_COUNTER_SHARDS = 0
+
+MEDIA_URL = "media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Profile picture variants (accounts.avatars). SYNC processes uploads inline
+# instead of in the worker pool, which is handy for tests and scripts.
+AVATAR_PROCESSING = {
+    "WORKERS": 2,
+    "SYNC": False,
+}
+
+# Activity notifications (notifications.delivery): events are flushed to the
+# database in batches by a background thread. SYNC writes them on commit.
+NOTIFICATIONS = {
+    "BATCH_SIZE": 500,
+    "FLUSH_INTERVAL": 2.0,
+    "SYNC": False,
+}
+
+# Post archiving (blog.archive): archive_posts moves months older than
+# HOT_DAYS from the hot Post table into blog.ArchivedPost.
+BLOG_ARCHIVE = {
+    "HOT_DAYS": 90,
+    "BATCH_SIZE": 500,
+}